@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+import functools
+import json
+import sys
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable
+from urllib.parse import urlencode
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from playwright.sync_api import Page, sync_playwright  # noqa: E402
+
+from launch_profile import apply_context_profile, context_options, launch_options  # noqa: E402
+from metrics import get_metrics  # noqa: E402
+from outlook_common import (  # noqa: E402
+    OutlookConfig,
+    click_delete_and_confirm,
+    delete_many,
+    empty_folder,
+    log,
+    open_contact_list,
+    open_people,
+    reload_list,
+)
+
+
+MOCK_DIR = Path(__file__).resolve().parent / "mock_outlook"
+LIST_NAME = "Your contact lists"
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args) -> None:
+        pass
+
+
+def serve_mock() -> ThreadingHTTPServer:
+    handler = functools.partial(_QuietHandler, directory=str(MOCK_DIR))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, name="mock-outlook", daemon=True).start()
+    return server
+
+
+def _strategy_delete_many(**kwargs) -> Callable[[Page, int, int], int]:
+    def run(page: Page, items: int, timeout_ms: int) -> int:
+        return delete_many(
+            page,
+            list_name=LIST_NAME,
+            timeout_ms=timeout_ms,
+            max_total=items,
+            max_failures=5,
+            confirm_variant="contact_list",
+            **kwargs,
+        )
+
+    return run
+
+
+def _strategy_click_only(page: Page, items: int, timeout_ms: int) -> int:
+    """click_delete_and_confirm back to back; reload only after a failure."""
+    open_people(page, timeout_ms=timeout_ms)
+    open_contact_list(page, LIST_NAME, timeout_ms=timeout_ms)
+    deleted = 0
+    failures = 0
+    while deleted < items and failures < 5:
+        try:
+            click_delete_and_confirm(page, timeout_ms=timeout_ms, confirm_variant="contact_list")
+            deleted += 1
+            failures = 0
+        except Exception:
+            failures += 1
+            reload_list(page, LIST_NAME, timeout_ms=timeout_ms)
+    return deleted
+
+
+def _strategy_empty_folder(page: Page, items: int, timeout_ms: int) -> int:
+    """Folder-level "Empty folder" on Deleted (seeded with the same item count)."""
+    return empty_folder(page, "Deleted", timeout_ms=timeout_ms) or 0
+
+
+# name -> callable(page, items, timeout_ms) returning the number of deletes.
+STRATEGIES: dict[str, Callable[[Page, int, int], int]] = {
+    "delete_many": _strategy_delete_many(batch_size=5),
+    "delete_many_event": _strategy_delete_many(batch_size=5, reload_mode="event"),
+    "delete_many_bulk": _strategy_delete_many(batch_size=5, bulk=True),
+    "delete_many_adaptive": _strategy_delete_many(batch_size=5, adaptive=True),
+    "delete_many_keyboard": _strategy_delete_many(batch_size=5, delete_strategy="keyboard"),
+    "click_only": _strategy_click_only,
+    "empty_folder": _strategy_empty_folder,
+}
+
+
+def run_strategy(
+    browser,
+    base_url: str,
+    name: str,
+    *,
+    items: int,
+    timeout_ms: int,
+    mock_params: dict,
+    cfg: OutlookConfig | None = None,
+) -> dict:
+    metrics = get_metrics()
+    metrics.reset()
+
+    # Fresh context per strategy: the mock keeps its rows in localStorage.
+    context = browser.new_context(**(context_options(cfg) if cfg else {}))
+    if cfg is not None:
+        apply_context_profile(context, cfg)
+    page = context.new_page()
+    page.set_default_timeout(timeout_ms)
+    query = urlencode({"items": items, "deleted_items": items, **mock_params})
+    page.goto(f"{base_url}/people.html?{query}", wait_until="domcontentloaded")
+
+    started = time.perf_counter()
+    error = ""
+    deleted = 0
+    try:
+        deleted = STRATEGIES[name](page, items, timeout_ms)
+    except Exception as exc:
+        error = f"{type(exc).__name__}: {exc}"
+    elapsed = time.perf_counter() - started
+    context.close()
+
+    steps = metrics.snapshot()["steps"]
+    delete_step = steps.get("delete_and_confirm", {})
+    reload_step = steps.get("reload", {})
+    return {
+        "strategy": name,
+        "deleted": deleted,
+        "elapsed_s": round(elapsed, 3),
+        "deletes_per_min": round(deleted / elapsed * 60, 1) if elapsed > 0 else 0.0,
+        "delete_p50_s": delete_step.get("p50_s", 0.0),
+        "delete_p95_s": delete_step.get("p95_s", 0.0),
+        "delete_p99_s": delete_step.get("p99_s", 0.0),
+        "failures": delete_step.get("errors", 0),
+        "reloads": reload_step.get("count", 0),
+        # Recovery cost: time spent reloading and reopening the list.
+        "recovery_s": round(
+            reload_step.get("total_s", 0.0)
+            + steps.get("open_people", {}).get("total_s", 0.0)
+            + steps.get("open_contact_list", {}).get("total_s", 0.0),
+            3,
+        ),
+        "error": error,
+    }
+
+
+def print_report(results: list[dict]) -> None:
+    header = f"{'strategy':<22}{'deleted':>8}{'del/min':>10}{'p50':>8}{'p95':>8}{'p99':>8}{'fail':>6}{'reload':>8}{'recov_s':>9}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['strategy']:<22}{r['deleted']:>8}{r['deletes_per_min']:>10}"
+            f"{r['delete_p50_s']:>8.2f}{r['delete_p95_s']:>8.2f}{r['delete_p99_s']:>8.2f}"
+            f"{r['failures']:>6}{r['reloads']:>8}{r['recovery_s']:>9}"
+            + (f"  ERROR {r['error']}" if r["error"] else "")
+        )
+
+
+def main(
+    *,
+    strategies: list[str],
+    items: int,
+    browser_name: str,
+    headless: bool,
+    timeout_ms: int,
+    mock_params: dict,
+    json_path: str | None,
+    launch_profile: str = "default",
+) -> list[dict]:
+    server = serve_mock()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    log(f"Bench: mock Outlook at {base_url} strategies={','.join(strategies)} items={items} {mock_params}")
+    cfg = OutlookConfig(
+        email="bench",
+        password="bench",
+        browser_name=browser_name,
+        headless=headless,
+        timeout_ms=timeout_ms,
+        launch_profile=launch_profile,
+    )
+
+    results: list[dict] = []
+    try:
+        with sync_playwright() as p:
+            browser = getattr(p, browser_name).launch(**launch_options(cfg))
+            try:
+                for name in strategies:
+                    log(f"Bench: run {name}")
+                    results.append(
+                        run_strategy(
+                            browser,
+                            base_url,
+                            name,
+                            items=items,
+                            timeout_ms=timeout_ms,
+                            mock_params=mock_params,
+                            cfg=cfg,
+                        )
+                    )
+            finally:
+                browser.close()
+    finally:
+        server.shutdown()
+
+    print_report(results)
+    if json_path:
+        Path(json_path).write_text(json.dumps(results, indent=2), encoding="utf-8")
+    return results
+
+
+if __name__ == "__main__":
+    # python bench/run_bench.py
+    # --strategies delete_many,delete_many_event
+    # --items 50
+    # --browser chromium|firefox|webkit
+    # --headed
+    # --timeout-ms 3000
+    # --latency-ms 150 --boot-ms 800 --flaky 0.02 --stale 0.02 --seed 1
+    # --json bench_results.json
+    # --launch-profile default|lean
+    strategies = list(STRATEGIES)
+    items = 50
+    browser = "chromium"
+    headless = True
+    timeout_ms = 3000
+    json_path = None
+    launch_profile = "default"
+    mock_params = {"latency_ms": 150, "boot_ms": 800, "flaky": 0.02, "stale": 0.02, "seed": 1}
+
+    def _arg(flag: str) -> str | None:
+        if flag in sys.argv:
+            idx = sys.argv.index(flag)
+            if idx + 1 < len(sys.argv):
+                return sys.argv[idx + 1]
+        return None
+
+    if _arg("--strategies"):
+        strategies = [s.strip() for s in _arg("--strategies").split(",") if s.strip() in STRATEGIES]
+    if _arg("--items"):
+        items = int(_arg("--items"))
+    if _arg("--browser"):
+        browser = _arg("--browser")
+    if "--headed" in sys.argv:
+        headless = False
+    if _arg("--timeout-ms"):
+        timeout_ms = int(_arg("--timeout-ms"))
+    if _arg("--json"):
+        json_path = _arg("--json")
+    if _arg("--launch-profile"):
+        launch_profile = _arg("--launch-profile")
+    for key in mock_params:
+        value = _arg("--" + key.replace("_", "-"))
+        if value is not None:
+            mock_params[key] = float(value) if "." in value else int(value)
+
+    main(
+        strategies=strategies,
+        items=items,
+        browser_name=browser,
+        headless=headless,
+        timeout_ms=timeout_ms,
+        mock_params=mock_params,
+        json_path=json_path,
+        launch_profile=launch_profile,
+    )
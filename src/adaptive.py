@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from collections import deque
+
+from outlook_common import log
+
+
+class AdaptiveController:
+    """Tunes delete_many from recent outcomes instead of fixed knobs.
+
+    - reload interval: doubles after a healthy stretch, halves when failures cluster;
+    - per-step timeout: observed p99 of successful deletes times `safety`, clamped
+      to [`min_timeout_ms`, the configured timeout], doubled again when failures cluster;
+    - Delete-button retries: few while healthy, the full count while struggling.
+    Every change is logged with the numbers that triggered it.
+    """
+
+    def __init__(
+        self,
+        *,
+        batch_size: int,
+        timeout_ms: int,
+        window: int = 50,
+        min_interval: int = 1,
+        max_interval: int | None = None,
+        min_timeout_ms: int = 3000,
+        safety: float = 3.0,
+        min_samples: int = 20,
+        max_retries: int = 6,
+        healthy_retries: int = 2,
+    ) -> None:
+        self.reload_interval = batch_size
+        self.min_interval = min_interval
+        self.max_interval = max_interval or max(batch_size * 40, batch_size)
+        self.base_timeout_ms = timeout_ms
+        self.timeout_ms = timeout_ms
+        self.min_timeout_ms = min(min_timeout_ms, timeout_ms)
+        self.safety = safety
+        self.min_samples = min_samples
+        self.max_retries = max_retries
+        self.healthy_retries = healthy_retries
+        self.retries = max_retries
+        self._outcomes: deque[bool] = deque(maxlen=window)
+        self._latencies: deque[float] = deque(maxlen=window * 4)
+        self._streak = 0
+
+    def failure_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    def _recent_failures(self, n: int = 10) -> int:
+        return list(self._outcomes)[-n:].count(False)
+
+    def _p99_ms(self) -> float | None:
+        if len(self._latencies) < self.min_samples:
+            return None
+        values = sorted(self._latencies)
+        return values[min(len(values) - 1, int(0.99 * (len(values) - 1)))] * 1000
+
+    def record(self, ok: bool, latency_s: float | None = None) -> None:
+        self._outcomes.append(ok)
+        if ok and latency_s is not None:
+            self._latencies.append(latency_s)
+        self._streak = self._streak + 1 if ok else 0
+        self._adjust(ok)
+
+    def _adjust(self, ok: bool) -> None:
+        rate = self.failure_rate()
+
+        if not ok and self._recent_failures() >= 2:
+            new_interval = max(self.min_interval, self.reload_interval // 2)
+            if new_interval != self.reload_interval:
+                log(f"Adaptive: reload_interval {self.reload_interval} -> {new_interval} (failures clustered, rate={rate:.2f})")
+                self.reload_interval = new_interval
+            if self.retries != self.max_retries:
+                log(f"Adaptive: delete retries {self.retries} -> {self.max_retries}")
+                self.retries = self.max_retries
+            # Failures may be the tight timeout itself; give the next attempts more room.
+            relaxed = min(self.base_timeout_ms, self.timeout_ms * 2)
+            if relaxed != self.timeout_ms:
+                log(f"Adaptive: step timeout {self.timeout_ms}ms -> {relaxed}ms (failures clustered)")
+                self.timeout_ms = relaxed
+            return
+        elif ok and self._streak >= self.reload_interval * 2 and rate < 0.05:
+            new_interval = min(self.max_interval, self.reload_interval * 2)
+            if new_interval != self.reload_interval:
+                log(f"Adaptive: reload_interval {self.reload_interval} -> {new_interval} (healthy, rate={rate:.2f})")
+                self.reload_interval = new_interval
+                self._streak = 0
+            if self.retries != self.healthy_retries:
+                log(f"Adaptive: delete retries {self.retries} -> {self.healthy_retries}")
+                self.retries = self.healthy_retries
+
+        p99_ms = self._p99_ms()
+        if p99_ms is not None:
+            new_timeout = int(min(self.base_timeout_ms, max(self.min_timeout_ms, p99_ms * self.safety)))
+            # Ignore jitter; only log/apply moves of more than 20%.
+            if abs(new_timeout - self.timeout_ms) > 0.2 * self.timeout_ms:
+                log(f"Adaptive: step timeout {self.timeout_ms}ms -> {new_timeout}ms (p99={p99_ms:.0f}ms)")
+                self.timeout_ms = new_timeout
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+
+from playwright.sync_api import Browser, BrowserContext, Page, Playwright
+
+from launch_profile import launch_options
+from metrics import span
+from outlook_common import OUTLOOK_MAIL_URL, OutlookConfig, log
+from session_store import ensure_signed_in, new_session_context
+
+
+@dataclass
+class _Standby:
+    browser: Browser
+    context: BrowserContext
+    page: Page
+    has_state: bool
+    created: float = field(default_factory=time.monotonic)
+
+
+class StandbyPool:
+    """Keeps one pre-launched browser, already loading Outlook, next to the active one.
+
+    `acquire()` hands out the standby (finishing sign-in, which is usually just a check
+    because the page booted while the previous browser was working) and immediately
+    starts the next standby. The sync Playwright API is single-threaded, so the launch
+    itself runs inline; the Outlook boot of the standby page overlaps with the deletes.
+    Callers own what `acquire()` returns and close it as before.
+    """
+
+    def __init__(self, playwright: Playwright, cfg: OutlookConfig, *, max_idle_s: float = 1800.0) -> None:
+        self.playwright = playwright
+        self.cfg = cfg
+        # Standby sessions older than this are rebuilt rather than trusted.
+        self.max_idle_s = max_idle_s
+        self._standby: _Standby | None = None
+
+    def _launch(self) -> _Standby:
+        browser_type = getattr(self.playwright, self.cfg.browser_name)
+        with span("browser_launch"):
+            browser = browser_type.launch(**launch_options(self.cfg))
+        try:
+            context, page, has_state = new_session_context(browser, self.cfg)
+            if has_state:
+                # Start booting Outlook now; ensure_signed_in() only checks the result later.
+                page.goto(OUTLOOK_MAIL_URL, wait_until="commit")
+        except BaseException:
+            try:
+                browser.close()
+            except Exception:
+                pass
+            raise
+        return _Standby(browser=browser, context=context, page=page, has_state=has_state)
+
+    def _refill(self) -> None:
+        if self._standby is not None:
+            return
+        try:
+            self._standby = self._launch()
+            log("Pool: standby browser ready")
+        except Exception as exc:
+            # Next acquire() falls back to a cold launch.
+            log(f"Pool: standby launch failed ({type(exc).__name__}: {exc})")
+
+    @staticmethod
+    def _close(slot: _Standby) -> None:
+        for closer in (slot.context.close, slot.browser.close):
+            try:
+                closer()
+            except Exception:
+                pass
+
+    def acquire(self) -> tuple[Browser, BrowserContext, Page]:
+        """Signed-in (browser, context, page): the warm standby if usable, else a cold launch."""
+        slot, self._standby = self._standby, None
+        if slot is not None and (not slot.browser.is_connected() or time.monotonic() - slot.created > self.max_idle_s):
+            log("Pool: standby stale or disconnected; discarding")
+            self._close(slot)
+            slot = None
+
+        warm = slot is not None
+        if slot is None:
+            slot = self._launch()
+        try:
+            ensure_signed_in(slot.context, slot.page, self.cfg, has_state=slot.has_state, navigate=not warm)
+        except BaseException:
+            self._close(slot)
+            raise
+        log(f"Pool: handed out {'warm standby' if warm else 'cold'} browser")
+
+        # The session just signed in saved fresh state, so the next standby starts authenticated.
+        self._refill()
+        return slot.browser, slot.context, slot.page
+
+    def close(self) -> None:
+        slot, self._standby = self._standby, None
+        if slot is not None:
+            self._close(slot)
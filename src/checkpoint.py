@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import sys
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+from outlook_common import _env_flag, log
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS progress (
+    account TEXT NOT NULL,
+    day TEXT NOT NULL,
+    script TEXT NOT NULL,
+    list_name TEXT NOT NULL,
+    total_deleted INTEGER NOT NULL DEFAULT 0,
+    excel_total INTEGER NOT NULL DEFAULT 0,
+    done INTEGER NOT NULL DEFAULT 0,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (account, day, script, list_name)
+);
+CREATE TABLE IF NOT EXISTS deleted_items (
+    account TEXT NOT NULL,
+    day TEXT NOT NULL,
+    script TEXT NOT NULL,
+    list_name TEXT NOT NULL,
+    item TEXT NOT NULL,
+    deleted_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS deleted_items_by_list ON deleted_items (account, day, script, list_name);
+"""
+
+
+@dataclass(frozen=True)
+class ListCheckpoint:
+    total_deleted: int = 0
+    # How much of total_deleted already has a summary row (the old `last_excel_total`).
+    excel_total: int = 0
+    done: bool = False
+
+
+def checkpoint_path() -> Path:
+    env_path = (os.getenv("OUTLOOK_CHECKPOINT_PATH") or "").strip()
+    if env_path:
+        return Path(env_path)
+    return Path(__file__).resolve().parent.parent / ".checkpoint.sqlite3"
+
+
+def _account_key(email: str) -> str:
+    return hashlib.sha256(email.strip().lower().encode("utf-8")).hexdigest()[:16]
+
+
+def _today() -> str:
+    # Same day boundary as the daily summary workbook, so resumed totals never span two files.
+    return datetime.now().strftime("%Y-%m-%d")
+
+
+class CheckpointStore:
+    """Durable per-account, per-list progress for the current day (SQLite, WAL).
+
+    A rerun on the same day resumes `total_deleted`/`excel_total` and can skip lists
+    already marked done; a new day starts from zero like the summary workbook.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # NORMAL + WAL survives process crashes; only an OS crash may lose the last commits.
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def load(self, email: str, script: str, list_name: str) -> ListCheckpoint:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT total_deleted, excel_total, done FROM progress "
+                "WHERE account = ? AND day = ? AND script = ? AND list_name = ?",
+                (_account_key(email), _today(), script, list_name),
+            ).fetchone()
+        if row is None:
+            return ListCheckpoint()
+        return ListCheckpoint(total_deleted=int(row[0]), excel_total=int(row[1]), done=bool(row[2]))
+
+    def save(
+        self,
+        email: str,
+        script: str,
+        list_name: str,
+        *,
+        total_deleted: int,
+        excel_total: int,
+        done: bool = False,
+    ) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO progress (account, day, script, list_name, total_deleted, excel_total, done, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (account, day, script, list_name) DO UPDATE SET "
+                "total_deleted = excluded.total_deleted, excel_total = excluded.excel_total, "
+                "done = excluded.done, updated_at = excluded.updated_at",
+                (
+                    _account_key(email),
+                    _today(),
+                    script,
+                    list_name,
+                    int(total_deleted),
+                    int(excel_total),
+                    int(done),
+                    datetime.now().isoformat(timespec="seconds"),
+                ),
+            )
+
+    def add_item(self, email: str, script: str, list_name: str, item: str) -> None:
+        """Record one deleted row's label under today's day, like the progress rows."""
+        if not item:
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO deleted_items (account, day, script, list_name, item, deleted_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (_account_key(email), _today(), script, list_name, item, datetime.now().isoformat(timespec="seconds")),
+            )
+
+    def deleted_items(self, email: str, script: str, list_name: str) -> list[str]:
+        """Labels of the rows deleted today from `list_name` by `script`, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT item FROM deleted_items WHERE account = ? AND day = ? AND script = ? AND list_name = ? "
+                "ORDER BY rowid",
+                (_account_key(email), _today(), script, list_name),
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def reset(self, email: str, script: str) -> None:
+        """Forget today's progress and deleted items for `script` (used by --fresh)."""
+        with self._lock:
+            for table in ("progress", "deleted_items"):
+                self._conn.execute(
+                    f"DELETE FROM {table} WHERE account = ? AND day = ? AND script = ?",
+                    (_account_key(email), _today(), script),
+                )
+
+    def close(self) -> None:
+        with self._lock:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+
+
+def open_checkpoint() -> CheckpointStore | None:
+    """The checkpoint store, or None when disabled (OUTLOOK_CHECKPOINT=false) or unusable."""
+    if _env_flag("OUTLOOK_CHECKPOINT") is False:
+        return None
+    path = checkpoint_path()
+    try:
+        return CheckpointStore(path)
+    except Exception as exc:
+        log(f"Checkpoint: cannot open {path.name} ({type(exc).__name__}: {exc}); running without checkpoints")
+        return None
+
+
+class RunCheckpoint:
+    """One script's view of the store for one account and list; every call is best effort."""
+
+    def __init__(self, store: CheckpointStore | None, email: str, script: str, list_name: str) -> None:
+        self.store = store
+        self.email = email
+        self.script = script
+        self.list_name = list_name
+
+    def load(self) -> ListCheckpoint:
+        if self.store is None:
+            return ListCheckpoint()
+        try:
+            state = self.store.load(self.email, self.script, self.list_name)
+        except Exception as exc:
+            log(f"Checkpoint: load failed ({type(exc).__name__}: {exc})")
+            return ListCheckpoint()
+        if state.total_deleted or state.done:
+            log(
+                f"Checkpoint: resume {self.script} '{self.list_name}' total_deleted={state.total_deleted} "
+                f"excel_total={state.excel_total} done={state.done}"
+            )
+        return state
+
+    def save(self, *, total_deleted: int, excel_total: int, done: bool = False) -> None:
+        if self.store is None:
+            return
+        try:
+            self.store.save(
+                self.email, self.script, self.list_name, total_deleted=total_deleted, excel_total=excel_total, done=done
+            )
+        except Exception as exc:
+            log(f"Checkpoint: save failed ({type(exc).__name__}: {exc})")
+
+    def add_item(self, item: str) -> None:
+        if self.store is None:
+            return
+        try:
+            self.store.add_item(self.email, self.script, self.list_name, item)
+        except Exception:
+            pass
+
+    def reset(self) -> None:
+        if self.store is not None:
+            self.store.reset(self.email, self.script)
+
+    def close(self) -> None:
+        if self.store is not None:
+            self.store.close()
+
+
+if __name__ == "__main__":
+    # python src/checkpoint.py  -> today's progress rows
+    store = open_checkpoint()
+    if store is None:
+        sys.exit(0)
+    for row in store._conn.execute(
+        "SELECT account, script, list_name, total_deleted, excel_total, done, updated_at FROM progress "
+        "WHERE day = ? ORDER BY updated_at",
+        (_today(),),
+    ):
+        print(" ".join(str(v) for v in row))
+    for account, script, list_name, items in store._conn.execute(
+        "SELECT account, script, list_name, COUNT(*) FROM deleted_items WHERE day = ? "
+        "GROUP BY account, script, list_name",
+        (_today(),),
+    ):
+        print(f"{account} {script} {list_name} items={items}")
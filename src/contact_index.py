@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable
+
+from outlook_common import _env_flag, log
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS folders (
+    account TEXT NOT NULL,
+    id TEXT NOT NULL,
+    parent_id TEXT,
+    display_name TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (account, id)
+);
+CREATE TABLE IF NOT EXISTS contacts (
+    account TEXT NOT NULL,
+    id TEXT NOT NULL,
+    folder_id TEXT NOT NULL,
+    display_name TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (account, id)
+);
+CREATE INDEX IF NOT EXISTS contacts_by_folder ON contacts (account, folder_id);
+CREATE TABLE IF NOT EXISTS sync_state (
+    account TEXT NOT NULL,
+    scope TEXT NOT NULL,
+    delta_link TEXT NOT NULL,
+    synced_at TEXT NOT NULL,
+    PRIMARY KEY (account, scope)
+);
+CREATE TABLE IF NOT EXISTS accounts (
+    account TEXT NOT NULL PRIMARY KEY,
+    root_folder_id TEXT
+);
+"""
+
+# sync_state scopes: the folder hierarchy and "contacts:<folder id>".
+FOLDERS_SCOPE = "folders"
+
+
+def index_path() -> Path:
+    env_path = (os.getenv("GRAPH_INDEX_PATH") or "").strip()
+    if env_path:
+        return Path(env_path)
+    return Path(__file__).resolve().parent.parent / ".contact_index.sqlite3"
+
+
+def _account_key(email: str) -> str:
+    return hashlib.sha256(email.strip().lower().encode("utf-8")).hexdigest()[:16]
+
+
+def contacts_scope(folder_id: str) -> str:
+    return f"contacts:{folder_id}"
+
+
+class ContactIndex:
+    """Local copy of one account's contact folders and contacts (SQLite, WAL).
+
+    Kept current from Graph delta queries (`graph_api.sync_index`): the delta link of
+    every scope is stored next to the rows, so a later sync only transfers what
+    changed. Successful deletes are applied here right away.
+    """
+
+    def __init__(self, path: Path, email: str) -> None:
+        self.path = path
+        self.account = _account_key(email)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def delta_link(self, scope: str) -> str | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT delta_link FROM sync_state WHERE account = ? AND scope = ?", (self.account, scope)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_delta_link(self, scope: str, link: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO sync_state (account, scope, delta_link, synced_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (account, scope) DO UPDATE SET "
+                "delta_link = excluded.delta_link, synced_at = excluded.synced_at",
+                (self.account, scope, link, datetime.now().isoformat(timespec="seconds")),
+            )
+
+    def clear_scope(self, scope: str) -> None:
+        """Forget a delta link (expired sync state); the next sync of `scope` is a full one."""
+        with self._lock:
+            self._conn.execute("DELETE FROM sync_state WHERE account = ? AND scope = ?", (self.account, scope))
+
+    def root_folder_id(self) -> str | None:
+        """Id of the default Contacts folder, which the folder delta doesn't include."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT root_folder_id FROM accounts WHERE account = ?", (self.account,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_root_folder_id(self, folder_id: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO accounts (account, root_folder_id) VALUES (?, ?) "
+                "ON CONFLICT (account) DO UPDATE SET root_folder_id = excluded.root_folder_id",
+                (self.account, folder_id),
+            )
+
+    def upsert_folders(self, folders: Iterable[dict]) -> None:
+        rows = [
+            (self.account, f["id"], f.get("parentFolderId"), f.get("displayName") or "")
+            for f in folders
+            if f.get("id")
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO folders (account, id, parent_id, display_name) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (account, id) DO UPDATE SET "
+                "parent_id = COALESCE(excluded.parent_id, folders.parent_id), "
+                "display_name = CASE WHEN excluded.display_name != '' "
+                "THEN excluded.display_name ELSE folders.display_name END",
+                rows,
+            )
+
+    def remove_folders(self, folder_ids: Iterable[str]) -> None:
+        """Drop folders with their child folders, contacts and delta links."""
+        pending = [fid for fid in folder_ids if fid]
+        with self._lock:
+            while pending:
+                fid = pending.pop()
+                pending.extend(
+                    row[0]
+                    for row in self._conn.execute(
+                        "SELECT id FROM folders WHERE account = ? AND parent_id = ?", (self.account, fid)
+                    )
+                )
+                self._conn.execute("DELETE FROM folders WHERE account = ? AND id = ?", (self.account, fid))
+                self._conn.execute("DELETE FROM contacts WHERE account = ? AND folder_id = ?", (self.account, fid))
+                self._conn.execute(
+                    "DELETE FROM sync_state WHERE account = ? AND scope = ?", (self.account, contacts_scope(fid))
+                )
+
+    def replace_folders(self, folders: list[dict]) -> None:
+        """Make the indexed folders exactly `folders` (a full listing); dropped ones take their contacts along."""
+        listed = {f["id"] for f in folders if f.get("id")}
+        self.remove_folders([f["id"] for f in self.folders() if f["id"] not in listed])
+        self.upsert_folders(folders)
+
+    def folders(self) -> list[dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, parent_id, display_name FROM folders WHERE account = ? ORDER BY display_name",
+                (self.account,),
+            ).fetchall()
+        return [{"id": r[0], "parentFolderId": r[1], "displayName": r[2]} for r in rows]
+
+    def top_level_folder_ids(self) -> list[str]:
+        """User folders whose parent is not itself a user folder (deleting them takes the children along)."""
+        known = {f["id"] for f in self.folders()}
+        return [f["id"] for f in self.folders() if f["parentFolderId"] not in known]
+
+    def folder_id(self, name: str) -> str | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id FROM folders WHERE account = ? AND lower(display_name) = ?",
+                (self.account, name.strip().lower()),
+            ).fetchone()
+        return row[0] if row else None
+
+    def upsert_contacts(self, folder_id: str, contacts: Iterable[dict]) -> None:
+        rows = [(self.account, c["id"], folder_id, c.get("displayName") or "") for c in contacts if c.get("id")]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO contacts (account, id, folder_id, display_name) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (account, id) DO UPDATE SET "
+                "folder_id = excluded.folder_id, display_name = excluded.display_name",
+                rows,
+            )
+
+    def replace_contacts(self, folder_id: str, contacts: list[dict]) -> None:
+        """Make the contacts indexed in `folder_id` exactly `contacts` (a full listing)."""
+        rows = [(self.account, c["id"], folder_id, c.get("displayName") or "") for c in contacts if c.get("id")]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute(
+                    "DELETE FROM contacts WHERE account = ? AND folder_id = ?", (self.account, folder_id)
+                )
+                self._conn.executemany(
+                    "INSERT INTO contacts (account, id, folder_id, display_name) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (account, id) DO UPDATE SET "
+                    "folder_id = excluded.folder_id, display_name = excluded.display_name",
+                    rows,
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def remove_contacts(self, contact_ids: Iterable[str], folder_id: str | None = None) -> None:
+        """Drop contacts; with `folder_id`, only while they are still filed there (a move shows up
+        as removed from the old folder, possibly after it was added to the new one)."""
+        with self._lock:
+            if folder_id is None:
+                self._conn.executemany(
+                    "DELETE FROM contacts WHERE account = ? AND id = ?", [(self.account, cid) for cid in contact_ids]
+                )
+            else:
+                self._conn.executemany(
+                    "DELETE FROM contacts WHERE account = ? AND id = ? AND folder_id = ?",
+                    [(self.account, cid, folder_id) for cid in contact_ids],
+                )
+
+    def contact_ids(self, folder_id: str | None = None) -> list[str]:
+        """Contact ids in `folder_id`, or in every folder when None."""
+        with self._lock:
+            if folder_id is None:
+                rows = self._conn.execute("SELECT id FROM contacts WHERE account = ?", (self.account,))
+            else:
+                rows = self._conn.execute(
+                    "SELECT id FROM contacts WHERE account = ? AND folder_id = ?", (self.account, folder_id)
+                )
+            return [r[0] for r in rows]
+
+    def counts(self) -> tuple[int, int]:
+        """(folders, contacts) currently indexed for this account."""
+        with self._lock:
+            folders = self._conn.execute("SELECT COUNT(*) FROM folders WHERE account = ?", (self.account,)).fetchone()
+            contacts = self._conn.execute(
+                "SELECT COUNT(*) FROM contacts WHERE account = ?", (self.account,)
+            ).fetchone()
+        return int(folders[0]), int(contacts[0])
+
+    def reset(self) -> None:
+        """Drop everything indexed for this account (the next sync is a full enumeration)."""
+        with self._lock:
+            for table in ("folders", "contacts", "sync_state", "accounts"):
+                self._conn.execute(f"DELETE FROM {table} WHERE account = ?", (self.account,))
+
+    def close(self) -> None:
+        with self._lock:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+
+
+def open_index(email: str) -> ContactIndex | None:
+    """The contact index for `email`, or None when disabled (GRAPH_INDEX=false) or unusable."""
+    if _env_flag("GRAPH_INDEX") is False:
+        return None
+    path = index_path()
+    try:
+        return ContactIndex(path, email)
+    except Exception as exc:
+        log(f"Index: cannot open {path.name} ({type(exc).__name__}: {exc}); listing through Graph instead")
+        return None
+
+
+if __name__ == "__main__":
+    # python src/contact_index.py [email]  -> indexed folders/contacts for the account
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    email = sys.argv[1] if len(sys.argv) > 1 else (os.getenv("GRAPH_USER_ID") or os.getenv("OUTLOOK_EMAIL") or "")
+    index = open_index(email)
+    if index is None:
+        sys.exit(0)
+    n_folders, n_contacts = index.counts()
+    print(f"folders={n_folders} contacts={n_contacts}")
+    for folder in index.folders():
+        print(f"  {folder['displayName']}: {len(index.contact_ids(folder['id']))}")
+    root = index.root_folder_id()
+    if root:
+        print(f"  (default folder): {len(index.contact_ids(root))}")
@@ -1,24 +1,81 @@
+import os
 import sys
 
 from dotenv import load_dotenv
 from playwright.sync_api import sync_playwright
 
-from outlook_common import append_excel_summary, delete_many, load_config, log, login
-
-
-def run(*, headless: bool = False, browser_name: str | None = None, timeout_ms: int | None = None) -> None:
+from browser_pool import StandbyPool
+from checkpoint import RunCheckpoint, open_checkpoint
+from graph_api import run_graph_delete
+from inventory import ProgressReporter, start_progress
+from launch_profile import launch_options
+from metrics import get_metrics, span
+from outlook_common import (
+    _env_flag,
+    append_excel_summary,
+    compact_excel_summary,
+    delete_many,
+    empty_folder,
+    flush_excel_summary,
+    load_config,
+    log,
+    probe_list_state,
+)
+from run_log import dump_ring
+from session_api import api_delete
+from session_store import open_session
+
+
+def run(
+    *,
+    headless: bool = False,
+    browser_name: str | None = None,
+    timeout_ms: int | None = None,
+    engine: str | None = None,
+    bulk: bool | None = None,
+    fresh: bool = False,
+) -> None:
     load_dotenv()
     log("Run: start deleted_bin")
-    cfg = load_config(browser_name=browser_name, headless=headless, timeout_ms=timeout_ms)
+
+    resolved_engine = (engine or os.getenv("OUTLOOK_DELETE_ENGINE") or "ui").strip().lower()
+    if resolved_engine == "graph":
+        run_graph_delete(script_name="deleted_bin", list_name="Deleted", deleted_folder=True)
+        compact_excel_summary()
+        get_metrics().dump()
+        log("Run: finished")
+        return
+
+    cfg = load_config(browser_name=browser_name, headless=headless, timeout_ms=timeout_ms, bulk_select=bulk)
+
+    # Today's progress survives crashes; a rerun continues the counters instead of starting cold.
+    checkpoint = RunCheckpoint(open_checkpoint(), cfg.email, "deleted_bin", "Deleted")
+    if fresh:
+        checkpoint.reset()
+    resumed = checkpoint.load()
+    if resumed.done:
+        log("Run: 'Deleted' already finished today (checkpoint); skipping. Use --fresh to run again")
+        checkpoint.close()
+        log("Run: finished")
+        return
+
+    # The in-session API gets one pass per run; the UI loop handles whatever it leaves.
+    try_session_api = resolved_engine == "session"
 
     with sync_playwright() as p:
-        total_deleted = 0
-        last_excel_total = 0
+        total_deleted = resumed.total_deleted
+        last_excel_total = resumed.excel_total
+        # Rows known to be on disk; the checkpoint never claims more than this.
+        saved_excel_total = resumed.excel_total
         browser_restarts = 0
         max_browser_restarts = 1000
+        pool = StandbyPool(p, cfg) if cfg.warm_standby else None
+        progress: ProgressReporter | None = None
+        # Try the folder-level "Empty folder" action once; per-item deletes only mop up what it left.
+        try_empty_folder = _env_flag("OUTLOOK_EMPTY_FOLDER") is not False
 
         def flush_excel_partial() -> None:
-            nonlocal last_excel_total
+            nonlocal last_excel_total, saved_excel_total
             if total_deleted > last_excel_total:
                 append_excel_summary(
                     script_name="deleted_bin",
@@ -30,38 +87,85 @@ def run(*, headless: bool = False, browser_name: str | None = None, timeout_ms:
                     email=cfg.email,
                 )
                 last_excel_total = total_deleted
+                if flush_excel_summary():
+                    saved_excel_total = last_excel_total
+                    checkpoint.save(total_deleted=total_deleted, excel_total=saved_excel_total)
 
         while browser_restarts <= max_browser_restarts:
             browser = None
             context = None
             try:
                 log(f"Run: launch browser={cfg.browser_name} headless={cfg.headless} restart={browser_restarts}")
-                browser_type = getattr(p, cfg.browser_name)
-                browser = browser_type.launch(headless=cfg.headless)
-
-                context = browser.new_context()
-                page = context.new_page()
-                login(page, cfg.email, cfg.password, timeout_ms=cfg.timeout_ms)
+                if pool is not None:
+                    with span("session_open"):
+                        browser, context, page = pool.acquire()
+                else:
+                    browser_type = getattr(p, cfg.browser_name)
+                    with span("browser_launch"):
+                        browser = browser_type.launch(**launch_options(cfg))
+
+                    with span("session_open"):
+                        context, page = open_session(browser, cfg)
+
+                # Count once per run (not per browser restart) for progress/ETA.
+                if progress is None:
+                    progress = start_progress(
+                        page, email=cfg.email, list_name="Deleted", timeout_ms=cfg.timeout_ms
+                    )
+
+                if try_empty_folder:
+                    try_empty_folder = False
+                    emptied = empty_folder(page, "Deleted", timeout_ms=cfg.timeout_ms, known_count=progress.total)
+                    if emptied:
+                        total_deleted += emptied
+                        progress(emptied)
+                        flush_excel_partial()
 
                 def on_deleted() -> None:
                     nonlocal total_deleted, last_excel_total
                     total_deleted += 1
+                    progress()
+                    checkpoint.save(total_deleted=total_deleted, excel_total=saved_excel_total)
                     if total_deleted - last_excel_total >= 5:
                         flush_excel_partial()
 
+                if try_session_api:
+                    try_session_api = False
+                    api_deleted = api_delete(
+                        page,
+                        "Deleted",
+                        timeout_ms=cfg.timeout_ms,
+                        on_deleted=on_deleted,
+                        on_item=checkpoint.add_item if checkpoint.store is not None else None,
+                    )
+                    if api_deleted:
+                        flush_excel_partial()
+
                 deleted_this = delete_many(
                     page,
                     list_name="Deleted",
                     timeout_ms=cfg.timeout_ms,
                     batch_size=1000,
                     on_deleted=on_deleted,
+                    bulk=cfg.bulk_select,
+                    reload_mode=cfg.reload_mode,
+                    adaptive=cfg.adaptive,
+                    delete_strategy=cfg.delete_strategy,
+                    on_item=checkpoint.add_item if checkpoint.store is not None else None,
                 )
                 log(f"Run: deleted_this_session={deleted_this} total_deleted={total_deleted}")
 
                 flush_excel_partial()
 
                 if deleted_this == 0:
-                    log("Run: nothing left to delete; stopping")
+                    if probe_list_state(page, timeout_ms=min(cfg.timeout_ms, 5000)) == "empty":
+                        log("Run: nothing left to delete; stopping")
+                        checkpoint.save(total_deleted=total_deleted, excel_total=saved_excel_total, done=True)
+                    else:
+                        log(
+                            "Run: nothing deleted but 'Deleted' is not empty; stopping without marking it done",
+                            level="WARNING",
+                        )
                     break
 
                 # Continue in the same browser/session if it's healthy.
@@ -74,7 +178,9 @@ def run(*, headless: bool = False, browser_name: str | None = None, timeout_ms:
                 break
             except Exception as exc:
                 browser_restarts += 1
-                log(f"Run: restarting browser due to error ({type(exc).__name__}: {exc})")
+                get_metrics().record_retry("browser_launch")
+                log(f"Run: restarting browser due to error ({type(exc).__name__}: {exc})", level="ERROR")
+                dump_ring("browser restart")
                 flush_excel_partial()
                 continue
             finally:
@@ -89,6 +195,12 @@ def run(*, headless: bool = False, browser_name: str | None = None, timeout_ms:
                     except Exception:
                         pass
 
+        if pool is not None:
+            pool.close()
+
+        checkpoint.close()
+        compact_excel_summary()
+        get_metrics().dump()
         log("Run: finished")
 
 
@@ -96,6 +208,9 @@ if __name__ == "__main__":
     browser = None
     headless = False
     timeout_ms = None
+    engine = None
+    bulk = None
+    fresh = False
 
     if "--browser" in sys.argv:
         idx = sys.argv.index("--browser")
@@ -105,9 +220,20 @@ if __name__ == "__main__":
     if "--headless" in sys.argv:
         headless = True
 
+    if "--bulk" in sys.argv:
+        bulk = True
+
+    if "--fresh" in sys.argv:
+        fresh = True
+
     if "--timeout-ms" in sys.argv:
         idx = sys.argv.index("--timeout-ms")
         if idx + 1 < len(sys.argv):
             timeout_ms = int(sys.argv[idx + 1])
 
-    run(headless=headless, browser_name=browser, timeout_ms=timeout_ms)
+    if "--engine" in sys.argv:
+        idx = sys.argv.index("--engine")
+        if idx + 1 < len(sys.argv):
+            engine = sys.argv[idx + 1]
+
+    run(headless=headless, browser_name=browser, timeout_ms=timeout_ms, engine=engine, bulk=bulk, fresh=fresh)
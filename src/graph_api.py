@@ -0,0 +1,520 @@
+from __future__ import annotations
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Iterable
+
+from contact_index import FOLDERS_SCOPE, ContactIndex, contacts_scope, open_index
+from graph_auth import TokenProvider
+from graph_scheduler import GraphScheduler
+from inventory import ListInventory, ProgressReporter, record_inventory
+from outlook_common import _env_flag, _mask_email, append_excel_summary, log
+
+
+DEFAULT_GRAPH_BASE = "https://graph.microsoft.com"
+DEFAULT_API_VERSION = "v1.0"
+
+# Graph rejects JSON batches with more than 20 sub-requests.
+BATCH_LIMIT = 20
+
+# Item classes purged from the bin: contacts and contact lists, never mail.
+BIN_ITEM_CLASSES = ("IPM.Contact", "IPM.DistList")
+# PR_MESSAGE_CLASS, which Graph only exposes as an extended property.
+_ITEM_CLASS_PROP = "String 0x001A"
+
+
+@dataclass(frozen=True)
+class GraphConfig:
+    tenant_id: str
+    client_id: str | None
+    client_secret: str | None
+    user_id: str | None
+    access_token: str | None = None
+    graph_base: str = DEFAULT_GRAPH_BASE
+    api_version: str = DEFAULT_API_VERSION
+    # Mail folder holding deleted contacts: a well-known name or a folder id.
+    deleted_folder: str = "deleteditems"
+    # Graph can't address "Your contact lists"; the contacts engine wipes every contact only when set.
+    delete_all_contacts: bool = False
+    delete_action: str = "delete"
+    dry_run: bool = False
+    concurrency: int = 4
+    # Outlook allows ~10k requests per 10 minutes per mailbox; $batch sub-requests count individually.
+    rate_per_s: float = 16.0
+    account: str = ""
+
+    @property
+    def api_root(self) -> str:
+        return f"{self.graph_base.rstrip('/')}/{self.api_version}"
+
+    @property
+    def user_prefix(self) -> str:
+        # App-only tokens have no /me; address the mailbox explicitly.
+        return f"/users/{self.user_id}" if self.user_id else "/me"
+
+
+def load_graph_config() -> GraphConfig:
+    tenant_id = (os.getenv("GRAPH_TENANT_ID") or "").strip() or "common"
+    client_id = (os.getenv("GRAPH_CLIENT_ID") or "").strip() or None
+    client_secret = (os.getenv("GRAPH_CLIENT_SECRET") or "").strip() or None
+    user_id = (os.getenv("GRAPH_USER_ID") or "").strip() or None
+    access_token = (os.getenv("GRAPH_ACCESS_TOKEN") or "").strip() or None
+    graph_base = (os.getenv("GRAPH_BASE_URL") or "").strip() or DEFAULT_GRAPH_BASE
+    api_version = (os.getenv("GRAPH_API_VERSION") or "").strip() or DEFAULT_API_VERSION
+    deleted_folder = (os.getenv("OUTLOOK_DELETED_CONTACTS_FOLDER") or "").strip() or "deleteditems"
+    delete_action = (os.getenv("GRAPH_CONTACT_DELETE_ACTION") or "").strip() or "delete"
+    dry_run = (os.getenv("GRAPH_DRY_RUN") or "").strip().lower() in {"1", "true", "yes", "y"}
+    env_concurrency = (os.getenv("GRAPH_CONCURRENCY") or "").strip()
+    env_rate = (os.getenv("GRAPH_RATE_PER_S") or "").strip()
+
+    if api_version not in {"v1.0", "beta"}:
+        raise ValueError("GRAPH_API_VERSION must be 'v1.0' or 'beta'")
+    if delete_action not in {"delete", "permanentDelete"}:
+        raise ValueError("GRAPH_CONTACT_DELETE_ACTION must be 'delete' or 'permanentDelete'")
+    if not access_token and not client_id:
+        raise RuntimeError(
+            "Missing GRAPH_CLIENT_ID. Create an Azure AD app (Public client) and set GRAPH_CLIENT_ID in .env"
+        )
+    if client_secret and not user_id:
+        raise RuntimeError(
+            "GRAPH_CLIENT_SECRET is set, but GRAPH_USER_ID is missing. "
+            "Set GRAPH_USER_ID to the target user's UPN (email) or object id."
+        )
+
+    try:
+        concurrency = max(1, int(env_concurrency)) if env_concurrency else 4
+    except ValueError:
+        concurrency = 4
+    try:
+        rate_per_s = max(0.1, float(env_rate)) if env_rate else 16.0
+    except ValueError:
+        rate_per_s = 16.0
+
+    cfg = GraphConfig(
+        tenant_id=tenant_id,
+        client_id=client_id,
+        client_secret=client_secret,
+        user_id=user_id,
+        access_token=access_token,
+        graph_base=graph_base,
+        api_version=api_version,
+        deleted_folder=deleted_folder,
+        delete_all_contacts=_env_flag("GRAPH_DELETE_ALL_CONTACTS") is True,
+        delete_action=delete_action,
+        dry_run=dry_run,
+        concurrency=concurrency,
+        rate_per_s=rate_per_s,
+        account=(user_id or os.getenv("OUTLOOK_EMAIL") or "").strip(),
+    )
+    log(
+        "Graph config: "
+        f"tenant={cfg.tenant_id} base={cfg.api_root} user={_mask_email(cfg.account) or 'me'} "
+        f"action={cfg.delete_action} dry_run={cfg.dry_run} concurrency={cfg.concurrency} "
+        f"rate={cfg.rate_per_s}/s"
+    )
+    return cfg
+
+
+def token_provider(cfg: GraphConfig) -> TokenProvider:
+    """Static env token, or MSAL (client credentials / device code) with the persistent token cache."""
+    return TokenProvider(
+        tenant_id=cfg.tenant_id,
+        client_id=cfg.client_id,
+        client_secret=cfg.client_secret,
+        account=cfg.account,
+        static_token=cfg.access_token,
+    )
+
+
+def list_all(session: GraphScheduler, first_url: str) -> list[dict]:
+    """Follow @odata.nextLink until the collection is exhausted."""
+    items: list[dict] = []
+    next_url: str | None = first_url
+    while next_url:
+        resp = session.request("GET", next_url)
+        if resp.status_code != 200:
+            raise RuntimeError(f"Graph: GET failed {resp.status_code}: {resp.text[:300]}")
+        data = resp.json()
+        items.extend(data.get("value", []))
+        next_url = data.get("@odata.nextLink")
+    return items
+
+
+def list_contact_folders(session: GraphScheduler, cfg: GraphConfig) -> list[dict]:
+    """All contact folders, including nested child folders."""
+    base = f"{cfg.api_root}{cfg.user_prefix}"
+    pending = list_all(session, f"{base}/contactFolders?$top=200&$select=id,displayName")
+    folders: list[dict] = []
+    while pending:
+        folder = pending.pop(0)
+        folders.append(folder)
+        pending.extend(
+            list_all(session, f"{base}/contactFolders/{folder['id']}/childFolders?$top=200&$select=id,displayName")
+        )
+    return folders
+
+
+def list_contacts(session: GraphScheduler, cfg: GraphConfig, folder_id: str | None = None) -> list[dict]:
+    base = f"{cfg.api_root}{cfg.user_prefix}"
+    path = f"/contactFolders/{folder_id}/contacts" if folder_id else "/contacts"
+    return list_all(session, f"{base}{path}?$top=999&$select=id,displayName")
+
+
+def resolve_folder_id(session: GraphScheduler, cfg: GraphConfig, folder_name: str) -> str:
+    folders = list_contact_folders(session, cfg)
+    for folder in folders:
+        if (folder.get("displayName") or "").strip().lower() == folder_name.strip().lower():
+            return folder["id"]
+    available = ", ".join(sorted(f.get("displayName") or "" for f in folders)) or "(none)"
+    raise RuntimeError(f"Cannot find contact folder named '{folder_name}'. Available folders: {available}")
+
+
+def _delta_pages(session: GraphScheduler, url: str) -> tuple[list[dict], str] | None:
+    """Follow a delta round to its @odata.deltaLink; None when the stored sync state expired."""
+    items: list[dict] = []
+    next_url = url
+    while True:
+        resp = session.request("GET", next_url, headers={"Prefer": "odata.maxpagesize=999"})
+        if resp.status_code == 410 or (resp.status_code == 400 and "syncState" in resp.text):
+            return None
+        if resp.status_code != 200:
+            raise RuntimeError(f"Graph: delta GET failed {resp.status_code}: {resp.text[:300]}")
+        data = resp.json()
+        items.extend(data.get("value", []))
+        if data.get("@odata.nextLink"):
+            next_url = data["@odata.nextLink"]
+            continue
+        return items, data.get("@odata.deltaLink") or ""
+
+
+def _sync_scope(
+    session: GraphScheduler, index: ContactIndex, scope: str, full_url: str
+) -> tuple[list[dict], bool]:
+    """Changes in `scope` since its stored delta link, plus whether this was a full listing.
+
+    A full listing (first run, or the stored state expired) carries no removals, so the
+    caller must replace the scope's rows with it instead of merging.
+    """
+    link = index.delta_link(scope)
+    result = _delta_pages(session, link) if link else None
+    full = result is None
+    if full:
+        if link:
+            log(f"Graph: delta state for {scope} expired; full resync")
+            index.clear_scope(scope)
+        result = _delta_pages(session, full_url)
+        if result is None:
+            raise RuntimeError(f"Graph: delta query for {scope} rejected")
+    items, delta_link = result
+    if delta_link:
+        index.set_delta_link(scope, delta_link)
+    return items, full
+
+
+def sync_index(session: GraphScheduler, cfg: GraphConfig, index: ContactIndex) -> tuple[int, int]:
+    """Bring the local contact index up to date with delta queries. Returns (folders, contacts) indexed."""
+    base = f"{cfg.api_root}{cfg.user_prefix}"
+    started = time.monotonic()
+    changes = 0
+
+    folder_changes, full = _sync_scope(
+        session, index, FOLDERS_SCOPE, f"{base}/contactFolders/delta?$select=id,displayName,parentFolderId"
+    )
+    if full:
+        index.replace_folders([f for f in folder_changes if "@removed" not in f])
+    else:
+        index.remove_folders([f["id"] for f in folder_changes if "@removed" in f])
+        index.upsert_folders(f for f in folder_changes if "@removed" not in f)
+    changes += len(folder_changes)
+
+    # The default Contacts folder is not in the folder delta; learn its id from any contact in it.
+    root_id = index.root_folder_id()
+    if root_id is None:
+        resp = session.request("GET", f"{base}/contacts?$top=1&$select=id,parentFolderId")
+        if resp.status_code == 200:
+            first = (resp.json().get("value") or [{}])[0]
+            root_id = first.get("parentFolderId")
+            if root_id:
+                index.set_root_folder_id(root_id)
+
+    folder_ids = [f["id"] for f in index.folders()]
+    if root_id:
+        folder_ids.insert(0, root_id)
+    for folder_id in folder_ids:
+        contact_changes, full = _sync_scope(
+            session,
+            index,
+            contacts_scope(folder_id),
+            f"{base}/contactFolders/{folder_id}/contacts/delta?$select=id,displayName,parentFolderId",
+        )
+        if full:
+            index.replace_contacts(folder_id, [c for c in contact_changes if "@removed" not in c])
+        else:
+            index.remove_contacts((c["id"] for c in contact_changes if "@removed" in c), folder_id=folder_id)
+            index.upsert_contacts(folder_id, (c for c in contact_changes if "@removed" not in c))
+        changes += len(contact_changes)
+
+    n_folders, n_contacts = index.counts()
+    log(
+        f"Graph: index synced changes={changes} folders={n_folders} contacts={n_contacts} "
+        f"in {time.monotonic() - started:.1f}s"
+    )
+    return n_folders, n_contacts
+
+
+def list_bin_items(session: GraphScheduler, cfg: GraphConfig) -> list[dict]:
+    """Contacts and contact lists in the deleted-items mail folder (`cfg.deleted_folder`).
+
+    Graph returns every item of a mail folder as a message; the item class tells the
+    deleted contacts apart from deleted mail, which is left alone.
+    """
+    base = f"{cfg.api_root}{cfg.user_prefix}/mailFolders/{cfg.deleted_folder}/messages"
+    expand = f"singleValueExtendedProperties($filter=id eq '{_ITEM_CLASS_PROP}')"
+    items = list_all(session, f"{base}?$top=999&$select=id,subject&$expand={expand}")
+    picked = []
+    for item in items:
+        props = item.get("singleValueExtendedProperties") or []
+        item_class = next((str(p.get("value") or "") for p in props if p.get("id") == _ITEM_CLASS_PROP), "")
+        if item_class.startswith(BIN_ITEM_CLASSES):
+            picked.append(item)
+    log(f"Graph: {len(picked)} contacts of {len(items)} items in '{cfg.deleted_folder}'")
+    return picked
+
+
+def _delete_request(cfg: GraphConfig, kind: str, item_id: str) -> dict:
+    path = f"{cfg.user_prefix}/{kind}/{item_id}"
+    if kind == "contacts" and cfg.delete_action == "permanentDelete":
+        return {"method": "POST", "url": f"{path}/permanentDelete"}
+    return {"method": "DELETE", "url": path}
+
+
+def batch_delete(
+    session: GraphScheduler,
+    cfg: GraphConfig,
+    kind: str,
+    item_ids: Iterable[str],
+    *,
+    on_deleted: Callable[[], None] | None = None,
+    on_items: Callable[[list[str]], None] | None = None,
+) -> int:
+    """Delete items (`contacts`, `contactFolders` or `messages`) through /$batch in chunks of 20.
+
+    Returns how many were deleted; ids already gone (404) are logged apart and not
+    counted. `on_items` receives the ids of every chunk that are gone either way.
+    """
+    ids = list(item_ids)
+    if not ids:
+        return 0
+    if cfg.dry_run:
+        log(f"Graph: DRY_RUN would delete {len(ids)} {kind}")
+        return 0
+
+    chunks = [ids[i : i + BATCH_LIMIT] for i in range(0, len(ids), BATCH_LIMIT)]
+
+    def send(chunk: list[str]) -> tuple[list[str], list[str]]:
+        reqs = {str(n): _delete_request(cfg, kind, item_id) for n, item_id in enumerate(chunk, start=1)}
+        succeeded, missing = session.post_batch(f"{cfg.api_root}/$batch", reqs)
+        return [chunk[int(rid) - 1] for rid in succeeded], [chunk[int(rid) - 1] for rid in missing]
+
+    total = 0
+    already_gone = 0
+    with ThreadPoolExecutor(max_workers=cfg.concurrency) as pool:
+        for deleted_ids, missing_ids in pool.map(send, chunks):
+            total += len(deleted_ids)
+            already_gone += len(missing_ids)
+            if on_items is not None and (deleted_ids or missing_ids):
+                try:
+                    on_items(deleted_ids + missing_ids)
+                except Exception:
+                    pass
+            if on_deleted is not None:
+                for _ in range(len(deleted_ids)):
+                    try:
+                        on_deleted()
+                    except Exception:
+                        # Never let progress hook break deletion.
+                        pass
+    log(f"Graph: deleted {total}/{len(ids)} {kind}" + (f" ({already_gone} already gone)" if already_gone else ""))
+    return total
+
+
+def delete_contacts(
+    session: GraphScheduler,
+    cfg: GraphConfig,
+    *,
+    folder_name: str | None = None,
+    include_folders: bool = True,
+    on_deleted: Callable[[], None] | None = None,
+    on_total: Callable[[int], None] | None = None,
+    index: ContactIndex | None = None,
+) -> int:
+    """Delete every contact in `folder_name` (or the whole mailbox when None); returns contacts deleted.
+
+    With `include_folders`, user-created contact folders are removed afterwards; they
+    are logged on their own and not passed to `on_deleted` or counted, since
+    `on_total` receives the number of contacts found before anything is deleted.
+    With an `index`, targets come from the delta-synced local index instead of a
+    full listing, and every successful delete is applied to it.
+    """
+    if index is not None:
+        return _delete_from_index(
+            session,
+            cfg,
+            index,
+            folder_name=folder_name,
+            include_folders=include_folders,
+            on_deleted=on_deleted,
+            on_total=on_total,
+        )
+
+    total = 0
+    if folder_name:
+        folder_id = resolve_folder_id(session, cfg, folder_name)
+        log(f"Graph: resolved folder '{folder_name}' -> id={folder_id}")
+        contacts = list_contacts(session, cfg, folder_id)
+        log(f"Graph: {len(contacts)} contacts in '{folder_name}'")
+        if on_total is not None:
+            on_total(len(contacts))
+        return batch_delete(session, cfg, "contacts", [c["id"] for c in contacts], on_deleted=on_deleted)
+
+    contacts = list_contacts(session, cfg)
+    folders = list_contact_folders(session, cfg)
+    for folder in folders:
+        contacts.extend(list_contacts(session, cfg, folder["id"]))
+    log(f"Graph: {len(contacts)} contacts in {len(folders) + 1} folders")
+    if on_total is not None:
+        on_total(len(contacts))
+    total += batch_delete(session, cfg, "contacts", [c["id"] for c in contacts], on_deleted=on_deleted)
+
+    if include_folders and folders:
+        # Child folders go with their parent; only delete the top-level ones.
+        top_level = list_all(session, f"{cfg.api_root}{cfg.user_prefix}/contactFolders?$top=200&$select=id")
+        removed = batch_delete(session, cfg, "contactFolders", [f["id"] for f in top_level])
+        log(f"Graph: removed {removed} contact folders")
+    return total
+
+
+def _delete_from_index(
+    session: GraphScheduler,
+    cfg: GraphConfig,
+    index: ContactIndex,
+    *,
+    folder_name: str | None,
+    include_folders: bool,
+    on_deleted: Callable[[], None] | None,
+    on_total: Callable[[int], None] | None,
+) -> int:
+    sync_index(session, cfg, index)
+    if folder_name:
+        folder_id = index.folder_id(folder_name)
+        if folder_id is None:
+            available = ", ".join(sorted(f["displayName"] for f in index.folders())) or "(none)"
+            raise RuntimeError(f"Cannot find contact folder named '{folder_name}'. Available folders: {available}")
+        contact_ids = index.contact_ids(folder_id)
+        log(f"Graph: {len(contact_ids)} indexed contacts in '{folder_name}'")
+    else:
+        contact_ids = index.contact_ids()
+        log(f"Graph: {len(contact_ids)} indexed contacts in {len(index.folders()) + 1} folders")
+    if on_total is not None:
+        on_total(len(contact_ids))
+
+    # Dry runs report what would go but keep the index as it is.
+    on_items = None if cfg.dry_run else index.remove_contacts
+    total = batch_delete(session, cfg, "contacts", contact_ids, on_deleted=on_deleted, on_items=on_items)
+    if not folder_name and include_folders:
+        top_level = index.top_level_folder_ids()
+        on_items = None if cfg.dry_run else index.remove_folders
+        removed = batch_delete(session, cfg, "contactFolders", top_level, on_items=on_items)
+        log(f"Graph: removed {removed} contact folders")
+    return total
+
+
+def run_graph_delete(*, script_name: str, list_name: str, deleted_folder: bool = False) -> int:
+    """Graph counterpart of the browser `run()` loops, with the same Excel summary rows.
+
+    `deleted_folder` purges the contacts in the deleted-items mail folder
+    (OUTLOOK_DELETED_CONTACTS_FOLDER, default `deleteditems`). Otherwise every contact
+    and contact folder in the mailbox is removed, which Graph offers in place of
+    "Your contact lists" (contact lists aren't exposed); that needs
+    GRAPH_DELETE_ALL_CONTACTS=true and raises RuntimeError without it.
+    """
+    cfg = load_graph_config()
+    if not deleted_folder and not cfg.delete_all_contacts:
+        raise RuntimeError(
+            f"Graph: '{list_name}' can't be targeted through Graph; the graph engine would delete every contact "
+            "and contact folder in the mailbox instead. Set GRAPH_DELETE_ALL_CONTACTS=true to allow that."
+        )
+    tokens = token_provider(cfg)
+    session = GraphScheduler(
+        tokens.token(),
+        rate_per_s=cfg.rate_per_s,
+        max_concurrency=cfg.concurrency,
+        renew_token=None if cfg.access_token else (lambda: tokens.token(force_refresh=True)),
+    )
+    # The bin is a mail folder, outside the contact index.
+    index = None if deleted_folder else open_index(cfg.account or "me")
+
+    total_deleted = 0
+    last_excel_total = 0
+
+    def flush_excel_partial() -> None:
+        nonlocal last_excel_total
+        if total_deleted > last_excel_total:
+            append_excel_summary(
+                script_name=script_name,
+                list_name=list_name,
+                deleted_this_session=(total_deleted - last_excel_total),
+                total_deleted=total_deleted,
+                browser_name="graph",
+                headless=True,
+                email=cfg.account,
+            )
+            last_excel_total = total_deleted
+
+    progress = ProgressReporter(list_name)
+
+    def on_total(count: int) -> None:
+        progress.total = count
+        record_inventory(
+            cfg.account,
+            [
+                ListInventory(
+                    list_name=list_name,
+                    count=count,
+                    complete=True,
+                    source="graph",
+                    scanned_at=datetime.now().isoformat(timespec="seconds"),
+                )
+            ],
+        )
+
+    def on_deleted() -> None:
+        nonlocal total_deleted
+        total_deleted += 1
+        progress()
+        # Batches finish hundreds at a time; keep the summary coarse.
+        if total_deleted - last_excel_total >= 500:
+            flush_excel_partial()
+
+    started = time.monotonic()
+    try:
+        if deleted_folder:
+            items = list_bin_items(session, cfg)
+            on_total(len(items))
+            batch_delete(session, cfg, "messages", [item["id"] for item in items], on_deleted=on_deleted)
+        else:
+            delete_contacts(session, cfg, on_deleted=on_deleted, on_total=on_total, index=index)
+    except KeyboardInterrupt:
+        log("Graph: interrupted by user")
+    finally:
+        flush_excel_partial()
+        session.close()
+        if index is not None:
+            index.close()
+
+    elapsed = max(time.monotonic() - started, 1e-6)
+    log(f"Graph: finished total_deleted={total_deleted} rate={total_deleted / elapsed:.1f}/s")
+    return total_deleted
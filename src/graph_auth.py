@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import hashlib
+import os
+from pathlib import Path
+
+import msal
+import requests
+
+from outlook_common import _mask_email, log
+from session_store import _fernet
+
+
+DEFAULT_AUTHORITY_HOST = "https://login.microsoftonline.com"
+DEVICE_SCOPES = ["Contacts.ReadWrite"]
+APP_SCOPES = ["https://graph.microsoft.com/.default"]
+
+
+def _cache_dir() -> Path:
+    env_dir = (os.getenv("GRAPH_TOKEN_CACHE_DIR") or "").strip()
+    if env_dir:
+        return Path(env_dir)
+    return Path(__file__).resolve().parent.parent / ".token_cache"
+
+
+def token_cache_path(key: str) -> Path:
+    """One MSAL cache file per account (or app, for client credentials); the name is a hash."""
+    digest = hashlib.sha256(key.strip().lower().encode("utf-8")).hexdigest()[:16]
+    return _cache_dir() / f"msal_{digest}.bin"
+
+
+def load_token_cache(key: str) -> msal.SerializableTokenCache:
+    cache = msal.SerializableTokenCache()
+    path = token_cache_path(key)
+    if not path.exists():
+        return cache
+    try:
+        raw = path.read_bytes()
+        cipher = _fernet()
+        if cipher is not None:
+            raw = cipher.decrypt(raw)
+        cache.deserialize(raw.decode("utf-8"))
+    except Exception as exc:
+        log(f"Auth: cannot read token cache ({type(exc).__name__}: {exc}); ignoring")
+    return cache
+
+
+def save_token_cache(key: str, cache: msal.SerializableTokenCache) -> None:
+    if not cache.has_state_changed:
+        return
+    path = token_cache_path(key)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.chmod(path.parent, 0o700)
+        except OSError:
+            pass
+        raw = cache.serialize().encode("utf-8")
+        cipher = _fernet()
+        if cipher is not None:
+            raw = cipher.encrypt(raw)
+
+        # Same as the browser session files: 0600 from the start, atomic replace.
+        tmp = path.with_suffix(".tmp")
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(raw)
+        os.replace(tmp, path)
+        cache.has_state_changed = False
+    except Exception as exc:
+        log(f"Auth: failed to save token cache ({type(exc).__name__}: {exc})")
+
+
+def _authority(tenant_id: str) -> tuple[str, dict]:
+    """Authority URL plus extra MSAL app kwargs.
+
+    GRAPH_AUTHORITY_HOST points MSAL at another identity endpoint (e.g. a local mock
+    served over https); GRAPH_AUTH_CA_BUNDLE is the CA file that endpoint's cert chains to.
+    """
+    host = (os.getenv("GRAPH_AUTHORITY_HOST") or "").strip().rstrip("/") or DEFAULT_AUTHORITY_HOST
+    kwargs: dict = {}
+    if host != DEFAULT_AUTHORITY_HOST:
+        # Instance discovery only knows Microsoft's clouds.
+        kwargs["instance_discovery"] = False
+    ca_bundle = (os.getenv("GRAPH_AUTH_CA_BUNDLE") or "").strip()
+    if ca_bundle:
+        # MSAL's own `verify=` loses to REQUESTS_CA_BUNDLE; a dedicated session doesn't.
+        session = requests.Session()
+        session.trust_env = False
+        session.verify = ca_bundle
+        kwargs["http_client"] = session
+    return f"{host}/{tenant_id}", kwargs
+
+
+class TokenProvider:
+    """Bearer tokens for one Graph identity, backed by a persistent MSAL token cache.
+
+    The first run signs in (device code, or client credentials with a secret); the
+    cache file keeps the refresh token, so later runs and mid-run renewals go through
+    `acquire_token_silent` without any interactive step.
+    """
+
+    def __init__(
+        self,
+        *,
+        tenant_id: str,
+        client_id: str | None,
+        client_secret: str | None = None,
+        account: str = "",
+        static_token: str | None = None,
+    ) -> None:
+        self.static_token = static_token
+        self.account = account
+        # App-only and delegated tokens for the same account live in separate files.
+        self.cache_key = f"{client_id}:{'app' if client_secret else 'user'}:{account or 'me'}"
+        self.app = None
+        if static_token:
+            return
+        self.cache = load_token_cache(self.cache_key)
+        authority, kwargs = _authority(tenant_id)
+        if client_secret:
+            self.app = msal.ConfidentialClientApplication(
+                client_id, authority=authority, client_credential=client_secret, token_cache=self.cache, **kwargs
+            )
+            self.scopes = APP_SCOPES
+        else:
+            self.app = msal.PublicClientApplication(client_id, authority=authority, token_cache=self.cache, **kwargs)
+            self.scopes = DEVICE_SCOPES
+
+    def _silent(self, *, force_refresh: bool = False) -> dict | None:
+        if isinstance(self.app, msal.ConfidentialClientApplication):
+            # App tokens are looked up in (and written to) the cache by MSAL itself, which has
+            # no force_refresh here: drop the rejected access token so a new one is requested.
+            if force_refresh:
+                for item in list(self.cache.search(msal.TokenCache.CredentialType.ACCESS_TOKEN, target=self.scopes)):
+                    self.cache.remove_at(item)
+            return self.app.acquire_token_for_client(scopes=self.scopes)
+        accounts = self.app.get_accounts(username=self.account or None) or self.app.get_accounts()
+        if not accounts:
+            return None
+        return self.app.acquire_token_silent(self.scopes, account=accounts[0], force_refresh=force_refresh)
+
+    def _interactive(self) -> dict:
+        if isinstance(self.app, msal.ConfidentialClientApplication):
+            return self.app.acquire_token_for_client(scopes=self.scopes)
+        flow = self.app.initiate_device_flow(scopes=self.scopes)
+        if "user_code" not in flow:
+            raise RuntimeError(f"Failed to initiate device flow: {flow}")
+        log(flow.get("message", "Graph: complete device code sign-in"))
+        return self.app.acquire_token_by_device_flow(flow)
+
+    def token(self, *, force_refresh: bool = False) -> str:
+        """A valid access token; `force_refresh` skips the cached access token (after a 401)."""
+        if self.static_token:
+            return self.static_token
+
+        result = self._silent(force_refresh=force_refresh)
+        if result and "access_token" in result:
+            if result.get("token_source") == "cache":
+                source = "cache"
+            elif isinstance(self.app, msal.ConfidentialClientApplication):
+                source = "client credentials"
+            else:
+                source = "refresh"
+        else:
+            result = self._interactive()
+            source = "sign-in"
+        save_token_cache(self.cache_key, self.cache)
+
+        if "access_token" not in result:
+            raise RuntimeError(f"Failed to acquire token: {result.get('error_description') or result}")
+        log(f"Auth: token for {_mask_email(self.account) or 'app'} via {source}")
+        return result["access_token"]
@@ -0,0 +1,291 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Callable
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import get_metrics
+from outlook_common import log
+
+
+# Throttling proper: back everyone off. 504/502 are transient but not a rate signal.
+THROTTLE_STATUSES = {429, 503}
+RETRY_STATUSES = THROTTLE_STATUSES | {500, 502, 504}
+
+
+def new_session(token: str, *, pool_size: int = 8) -> requests.Session:
+    """Keep-alive session sized for concurrent batch posts."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Authorization": f"Bearer {token}", "Accept": "application/json"})
+    return session
+
+
+def retry_after_seconds(headers: dict | None) -> float | None:
+    """Retry-After as seconds (delta or HTTP date), or None when absent/unparseable."""
+    headers = headers or {}
+    value = str(headers.get("Retry-After") or headers.get("retry-after") or "").strip()
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, at most `burst` banked."""
+
+    def __init__(self, rate: float, burst: float) -> None:
+        self.rate = max(rate, 0.001)
+        self.burst = max(burst, 1.0)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, cost: float = 1.0) -> None:
+        cost = min(cost, self.burst)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= cost:
+                    self._tokens -= cost
+                    return
+                wait_s = (cost - self._tokens) / self.rate
+            time.sleep(wait_s)
+
+
+class ConcurrencyLimiter:
+    """In-flight cap that adapts AIMD-style: halves on throttling, +1 after `grow_after` clean responses."""
+
+    def __init__(self, max_limit: int, *, min_limit: int = 1, grow_after: int = 20) -> None:
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.grow_after = grow_after
+        self.limit = self.max_limit
+        self.in_flight = 0
+        self._clean = 0
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def slot(self):
+        with self._cond:
+            while self.in_flight >= self.limit:
+                self._cond.wait()
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self.in_flight -= 1
+                self._cond.notify_all()
+
+    def record(self, *, throttled: bool) -> None:
+        with self._cond:
+            if throttled:
+                self._clean = 0
+                new_limit = max(self.min_limit, self.limit // 2)
+                if new_limit != self.limit:
+                    log(f"Graph: concurrency {self.limit} -> {new_limit} (throttled)")
+                    self.limit = new_limit
+                return
+            self._clean += 1
+            if self._clean >= self.grow_after and self.limit < self.max_limit:
+                log(f"Graph: concurrency {self.limit} -> {self.limit + 1} ({self._clean} clean responses)")
+                self.limit += 1
+                self._clean = 0
+                self._cond.notify_all()
+
+
+class GraphScheduler:
+    """Owns one account's pooled Graph session and paces every request through it.
+
+    - a token bucket caps the request rate across threads (a $batch costs one token per
+      sub-request, which is how Graph counts it);
+    - an adaptive limiter caps in-flight requests, halving on throttling;
+    - 429/503 honor Retry-After by pausing *all* threads until it passes, so a throttled
+      mailbox isn't hit again mid-penalty; other transient failures back off with jitter;
+    - `post_batch` retries only the failed sub-requests and splits a batch the service
+      can't process as a whole.
+    """
+
+    def __init__(
+        self,
+        token: str,
+        *,
+        rate_per_s: float = 16.0,
+        burst: float = 20.0,
+        max_concurrency: int = 4,
+        timeout_s: float = 60.0,
+        base_backoff_s: float = 1.0,
+        max_backoff_s: float = 60.0,
+        renew_token: Callable[[], str] | None = None,
+    ) -> None:
+        self.session = new_session(token, pool_size=max(2, max_concurrency * 2))
+        # Called once on a 401 (access token expired mid-run); None keeps the 401.
+        self.renew_token = renew_token
+        self._renew_lock = threading.Lock()
+        self.bucket = TokenBucket(rate_per_s, burst)
+        self.limiter = ConcurrencyLimiter(max_concurrency)
+        self.timeout_s = timeout_s
+        self.base_backoff_s = base_backoff_s
+        self.max_backoff_s = max_backoff_s
+        self._pause_until = 0.0
+        self._pause_lock = threading.Lock()
+
+    def _backoff(self, headers: dict | None, attempt: int) -> float:
+        server_s = retry_after_seconds(headers)
+        if server_s is not None:
+            # A little spread so the waiting threads don't return in lockstep.
+            return server_s * random.uniform(1.0, 1.1)
+        cap = min(self.max_backoff_s, self.base_backoff_s * (2**attempt))
+        return random.uniform(cap / 2, cap)
+
+    def _pause(self, seconds: float) -> None:
+        with self._pause_lock:
+            self._pause_until = max(self._pause_until, time.monotonic() + seconds)
+
+    def _wait_pause(self) -> None:
+        while True:
+            with self._pause_lock:
+                remaining = self._pause_until - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(remaining)
+
+    def _renew(self, sent_auth: str | None) -> bool:
+        """Swap in a fresh token after a 401; True when the request is worth resending."""
+        if self.renew_token is None:
+            return False
+        with self._renew_lock:
+            if self.session.headers.get("Authorization") != sent_auth:
+                # Another thread already renewed it.
+                return True
+            try:
+                token = self.renew_token()
+            except Exception as exc:
+                log(f"Graph: token renewal failed ({type(exc).__name__}: {exc})", level="WARNING")
+                return False
+            if f"Bearer {token}" == sent_auth:
+                return False
+            self.session.headers["Authorization"] = f"Bearer {token}"
+            log("Graph: access token renewed after 401")
+            return True
+
+    def request(self, method: str, url: str, *, cost: float = 1.0, retries: int = 6, **kwargs) -> requests.Response:
+        """One paced request; transient failures are retried, the last response is returned."""
+        resp: requests.Response | None = None
+        error: Exception | None = None
+        for attempt in range(retries):
+            self._wait_pause()
+            self.bucket.acquire(cost)
+            sent_auth = self.session.headers.get("Authorization")
+            with self.limiter.slot():
+                try:
+                    resp = self.session.request(method, url, timeout=self.timeout_s, **kwargs)
+                    error = None
+                except (requests.ConnectionError, requests.Timeout) as exc:
+                    resp, error = None, exc
+
+            if resp is not None and resp.status_code == 401 and self._renew(sent_auth):
+                continue
+            if resp is not None and resp.status_code not in RETRY_STATUSES:
+                self.limiter.record(throttled=False)
+                return resp
+
+            throttled = resp is not None and resp.status_code in THROTTLE_STATUSES
+            if throttled:
+                self.limiter.record(throttled=True)
+            get_metrics().record_retry("graph_request")
+            if attempt + 1 >= retries:
+                break
+            delay = self._backoff(resp.headers if resp is not None else None, attempt)
+            reason = str(resp.status_code) if resp is not None else type(error).__name__
+            log(f"Graph: {method} retry in {delay:.1f}s ({reason})", level="WARNING" if throttled else "INFO")
+            if throttled:
+                self._pause(delay)
+            else:
+                time.sleep(delay)
+
+        if resp is None:
+            assert error is not None
+            raise error
+        return resp
+
+    def post_batch(
+        self, batch_url: str, requests_by_id: dict[str, dict], *, max_rounds: int = 6
+    ) -> tuple[list[str], list[str]]:
+        """POST a JSON batch; resubmit failed sub-requests.
+
+        Returns (succeeded, missing): the ids that succeeded, and the ids answered 404
+        (already gone, e.g. removed elsewhere or by an earlier round), kept apart so
+        they are not reported as deletes.
+        """
+        pending = dict(requests_by_id)
+        succeeded: list[str] = []
+        missing: list[str] = []
+        for round_no in range(max_rounds):
+            body = {"requests": [{"id": rid, **req} for rid, req in pending.items()]}
+            # A batch that keeps failing as a whole is split soon rather than retried at full size.
+            retries = 2 if len(pending) > 1 else 6
+            resp = self.request("POST", batch_url, cost=len(pending), retries=retries, json=body)
+            if resp.status_code != 200:
+                if resp.status_code >= 500 or resp.status_code == 413:
+                    if len(pending) > 1:
+                        items = list(pending.items())
+                        half = len(items) // 2
+                        log(f"Graph: $batch of {len(items)} failed {resp.status_code}; splitting")
+                        for part in (dict(items[:half]), dict(items[half:])):
+                            part_ok, part_missing = self.post_batch(batch_url, part, max_rounds=max_rounds)
+                            succeeded += part_ok
+                            missing += part_missing
+                        return succeeded, missing
+                    log(f"Graph: {next(iter(pending.values())).get('url')} failed {resp.status_code}", level="WARNING")
+                    return succeeded, missing
+                raise RuntimeError(f"Graph: $batch failed {resp.status_code}: {resp.text[:300]}")
+
+            retry: dict[str, dict] = {}
+            throttled = False
+            wait_s = 0.0
+            for sub in resp.json().get("responses", []):
+                rid = str(sub.get("id"))
+                status = int(sub.get("status", 0))
+                if status in {200, 204}:
+                    succeeded.append(rid)
+                elif status == 404:
+                    missing.append(rid)
+                elif status in RETRY_STATUSES and rid in pending:
+                    retry[rid] = pending[rid]
+                    throttled = throttled or status in THROTTLE_STATUSES
+                    wait_s = max(wait_s, self._backoff(sub.get("headers"), round_no))
+                else:
+                    log(f"Graph: delete {pending.get(rid, {}).get('url')} failed status={status}", level="WARNING")
+            if not retry:
+                return succeeded, missing
+
+            if throttled:
+                self.limiter.record(throttled=True)
+                self._pause(wait_s)
+            log(f"Graph: {len(retry)}/{len(pending)} sub-requests to retry in {wait_s:.1f}s")
+            if not throttled:
+                time.sleep(wait_s)
+            pending = retry
+        log(f"Graph: giving up on {len(pending)} sub-requests", level="WARNING")
+        return succeeded, missing
+
+    def close(self) -> None:
+        self.session.close()
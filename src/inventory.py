@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sys
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+
+from playwright.sync_api import Page
+
+from outlook_common import LIST_ROW_SELECTOR, _env_flag, log, open_contact_list, open_people, probe_list_state
+from run_journal import journal_lock
+
+
+# Walks the (virtualized) list pane once and returns how many distinct rows it saw.
+# Outlook exposes aria-setsize on virtualized rows; when present that is the answer
+# without scrolling at all.
+_COUNT_ROWS_JS = """
+async ([selector, maxMs]) => {
+  const rows = () => Array.from(document.querySelectorAll(selector));
+  const first = rows()[0];
+  if (!first) return {count: 0, complete: true, source: "ui"};
+
+  const setSize = Math.max(0, ...rows().map((r) => Number(r.getAttribute("aria-setsize") || 0)));
+  if (setSize > 0) return {count: setSize, complete: true, source: "aria-setsize"};
+
+  let scroller = first.parentElement;
+  while (scroller && scroller !== document.body) {
+    const style = getComputedStyle(scroller);
+    if (/(auto|scroll)/.test(style.overflowY) && scroller.scrollHeight > scroller.clientHeight) break;
+    scroller = scroller.parentElement;
+  }
+  const key = (r) => r.getAttribute("data-convid") || r.getAttribute("id") || r.dataset.name
+    || r.getAttribute("aria-label") || r.textContent.trim();
+  const seen = new Set(rows().map(key));
+  if (!scroller || scroller === document.body) return {count: seen.size, complete: true, source: "ui"};
+
+  const started = performance.now();
+  let idle = 0;
+  while (performance.now() - started < maxMs) {
+    const before = scroller.scrollTop;
+    const sizeBefore = seen.size;
+    scroller.scrollTop = before + Math.max(scroller.clientHeight - 20, 20);
+    await new Promise((r) => setTimeout(r, 150));
+    rows().forEach((r) => seen.add(key(r)));
+    // Bottom reached and nothing new rendered twice in a row -> done.
+    idle = scroller.scrollTop === before && seen.size === sizeBefore ? idle + 1 : 0;
+    if (idle >= 2) {
+      scroller.scrollTop = 0;
+      return {count: seen.size, complete: true, source: "ui"};
+    }
+  }
+  scroller.scrollTop = 0;
+  return {count: seen.size, complete: false, source: "ui"};
+}
+"""
+
+
+@dataclass(frozen=True)
+class ListInventory:
+    list_name: str
+    count: int
+    # False when the scan hit its time budget; `count` is then a lower bound.
+    complete: bool
+    source: str
+    scanned_at: str
+
+
+def _max_scan_s() -> float:
+    try:
+        return float((os.getenv("OUTLOOK_INVENTORY_MAX_S") or "").strip() or 60)
+    except ValueError:
+        return 60.0
+
+
+def inventory_path() -> Path:
+    env_path = (os.getenv("OUTLOOK_INVENTORY_PATH") or "").strip()
+    if env_path:
+        return Path(env_path)
+    return Path(__file__).resolve().parent.parent / ".inventory.json"
+
+
+def _account_key(email: str) -> str:
+    return hashlib.sha256(email.strip().lower().encode("utf-8")).hexdigest()[:16]
+
+
+def load_inventory(email: str) -> dict[str, dict]:
+    """Last recorded counts for an account: {list_name: ListInventory as dict}."""
+    try:
+        data = json.loads(inventory_path().read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+    return data.get(_account_key(email), {})
+
+
+def record_inventory(email: str, entries: list[ListInventory]) -> None:
+    """Merge `entries` into the inventory file (atomic replace; never breaks the run).
+
+    The read-modify-write runs under a lock file, so parallel workers recording
+    different accounts don't drop each other's entries.
+    """
+    path = inventory_path()
+    with journal_lock(path):
+        try:
+            data = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+        except Exception:
+            data = {}
+        account = data.setdefault(_account_key(email), {})
+        for entry in entries:
+            account[entry.list_name] = asdict(entry)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(path.suffix + f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(data, indent=2), encoding="utf-8")
+            os.replace(tmp, path)
+        except Exception as exc:
+            log(f"Inventory: cannot write {path.name} ({type(exc).__name__}: {exc})")
+
+
+def count_list_items(page: Page, *, timeout_ms: int, max_seconds: float | None = None) -> tuple[int, bool, str]:
+    """Count rows in the list that is already open: (count, complete, source)."""
+    state = probe_list_state(page, timeout_ms=min(timeout_ms, 5000))
+    if state == "empty":
+        return 0, True, "empty-state"
+    if state == "broken":
+        raise RuntimeError("Inventory: list pane did not render")
+    max_ms = int((max_seconds if max_seconds is not None else _max_scan_s()) * 1000)
+    result = page.evaluate(_COUNT_ROWS_JS, [LIST_ROW_SELECTOR, max_ms])
+    return int(result["count"]), bool(result["complete"]), str(result["source"])
+
+
+def scan_list(page: Page, list_name: str, *, timeout_ms: int, max_seconds: float | None = None) -> ListInventory:
+    """Open `list_name` once and count its items."""
+    started = time.monotonic()
+    open_people(page, timeout_ms=timeout_ms)
+    open_contact_list(page, list_name, timeout_ms=timeout_ms)
+    count, complete, source = count_list_items(page, timeout_ms=timeout_ms, max_seconds=max_seconds)
+    entry = ListInventory(
+        list_name=list_name,
+        count=count,
+        complete=complete,
+        source=source,
+        scanned_at=datetime.now().isoformat(timespec="seconds"),
+    )
+    log(
+        f"Inventory: '{list_name}' {'' if complete else '>='}{count} items "
+        f"(source={source}, {time.monotonic() - started:.1f}s)"
+    )
+    return entry
+
+
+def _fmt_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+class ProgressReporter:
+    """Call once per deleted item; logs done/total, deletes per minute and ETA.
+
+    Logs at most every `every_s` seconds (and on the last item), so it is cheap
+    enough to sit inside the existing `on_deleted` hooks.
+    """
+
+    def __init__(self, label: str, total: int | None = None, *, every_s: float = 15.0) -> None:
+        self.label = label
+        self.total = total
+        self.every_s = every_s
+        self.done = 0
+        self.started = time.monotonic()
+        self._last_log = self.started
+
+    def rate_per_min(self) -> float:
+        elapsed = time.monotonic() - self.started
+        return self.done / elapsed * 60 if elapsed > 0 else 0.0
+
+    def eta_s(self) -> float | None:
+        rate = self.rate_per_min()
+        if self.total is None or rate <= 0:
+            return None
+        return max(0, self.total - self.done) / rate * 60
+
+    def __call__(self, n: int = 1) -> None:
+        self.done += n
+        now = time.monotonic()
+        if now - self._last_log >= self.every_s or (self.total is not None and self.done >= self.total):
+            self._last_log = now
+            self.log()
+
+    def log(self) -> None:
+        rate = self.rate_per_min()
+        if self.total:
+            eta = self.eta_s()
+            pct = min(100.0, self.done / self.total * 100)
+            log(
+                f"Progress: {self.label} {self.done}/{self.total} ({pct:.1f}%) {rate:.1f}/min "
+                f"ETA {_fmt_duration(eta) if eta is not None else '?'}"
+            )
+        else:
+            log(f"Progress: {self.label} {self.done} deleted {rate:.1f}/min")
+
+
+def start_progress(page: Page, *, email: str, list_name: str, timeout_ms: int) -> ProgressReporter:
+    """Inventory phase for the browser runs: scan, record, and return a reporter for `on_deleted`.
+
+    Disabled with OUTLOOK_INVENTORY=false; a failed scan only costs the ETA.
+    """
+    total = None
+    if _env_flag("OUTLOOK_INVENTORY") is not False:
+        try:
+            entry = scan_list(page, list_name, timeout_ms=timeout_ms)
+            record_inventory(email, [entry])
+            total = entry.count if entry.complete else None
+        except Exception as exc:
+            log(f"Inventory: scan of '{list_name}' failed ({type(exc).__name__}: {exc}); no ETA")
+    return ProgressReporter(list_name, total)
+
+
+def account_workload(email: str) -> int | None:
+    """Recorded items left across all lists for an account, or None if never scanned."""
+    entries = load_inventory(email)
+    if not entries:
+        return None
+    return sum(int(e.get("count", 0)) for e in entries.values())
+
+
+if __name__ == "__main__":
+    # python src/inventory.py  -> print recorded counts for OUTLOOK_EMAIL
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    email = sys.argv[1] if len(sys.argv) > 1 else (os.getenv("OUTLOOK_EMAIL") or "")
+    for name, entry in load_inventory(email).items():
+        print(f"{name}: {entry['count']}{'' if entry['complete'] else '+'} ({entry['source']}, {entry['scanned_at']})")
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from outlook_common import LAUNCH_PROFILES, OutlookConfig
+
+
+# Chromium switches that trim background work and memory without touching Outlook itself.
+# Background throttling is turned *off* so a warm standby tab keeps booting at full speed.
+CHROMIUM_LEAN_ARGS = [
+    "--disable-extensions",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--disable-background-networking",
+    "--disable-background-timer-throttling",
+    "--disable-backgrounding-occluded-windows",
+    "--disable-renderer-backgrounding",
+    "--disable-features=Translate,MediaRouter,OptimizationHints,AutofillServerCommunication",
+    "--no-first-run",
+    "--mute-audio",
+]
+
+FIREFOX_LEAN_PREFS = {
+    "ui.prefersReducedMotion": 1,
+    "toolkit.cosmeticAnimations.enabled": False,
+    "media.autoplay.default": 5,
+    "network.prefetch-next": False,
+    "network.dns.disablePrefetch": True,
+    "network.http.speculative-parallel-limit": 0,
+    "browser.tabs.remote.warmup.enabled": False,
+    "browser.sessionstore.resume_from_crash": False,
+    "browser.shell.checkDefaultBrowser": False,
+    "extensions.update.enabled": False,
+    "app.update.auto": False,
+    "datareporting.policy.dataSubmissionEnabled": False,
+    "toolkit.telemetry.enabled": False,
+    # One content process per tab is plenty for a single Outlook page.
+    "dom.ipc.processCount": 1,
+    # Keep the repeatedly reloaded Outlook bundles in a generous memory cache.
+    "browser.cache.memory.capacity": 262144,
+}
+
+# Big enough that Outlook keeps the folder pane and toolbar expanded.
+LEAN_VIEWPORT = {"width": 1280, "height": 720}
+
+# Kills transitions/animations so dialogs are "visible" the moment they mount.
+NO_ANIMATION_CSS = (
+    "*, *::before, *::after {"
+    " transition: none !important; transition-duration: 0s !important;"
+    " animation: none !important; animation-duration: 0s !important;"
+    " scroll-behavior: auto !important; caret-color: transparent !important; }"
+)
+NO_ANIMATION_SCRIPT = (
+    "(() => {"
+    " const add = () => { const s = document.createElement('style');"
+    f" s.textContent = {NO_ANIMATION_CSS!r}; (document.head || document.documentElement).appendChild(s); }};"
+    " if (document.documentElement) add(); else document.addEventListener('DOMContentLoaded', add);"
+    "})();"
+)
+
+
+def _check(profile: str) -> None:
+    if profile not in LAUNCH_PROFILES:
+        raise ValueError("launch_profile must be one of: " + ", ".join(sorted(LAUNCH_PROFILES)))
+
+
+def launch_options(cfg: OutlookConfig) -> dict:
+    """Keyword arguments for `browser_type.launch()` under `cfg.launch_profile`."""
+    _check(cfg.launch_profile)
+    options: dict = {"headless": cfg.headless}
+    if cfg.launch_profile != "lean":
+        return options
+    if cfg.browser_name == "chromium":
+        options["args"] = list(CHROMIUM_LEAN_ARGS)
+    elif cfg.browser_name == "firefox":
+        options["firefox_user_prefs"] = dict(FIREFOX_LEAN_PREFS)
+    return options
+
+
+def context_options(cfg: OutlookConfig) -> dict:
+    """Keyword arguments for `browser.new_context()` under `cfg.launch_profile`."""
+    _check(cfg.launch_profile)
+    if cfg.launch_profile != "lean":
+        return {}
+    return {
+        "viewport": LEAN_VIEWPORT,
+        "device_scale_factor": 1,
+        "reduced_motion": "reduce",
+        # Service workers would bypass context.route() and keep extra workers alive.
+        "service_workers": "block",
+    }
+
+
+def apply_context_profile(context, cfg: OutlookConfig) -> None:
+    """Per-context tweaks that can't be passed to new_context() (sync contexts)."""
+    if cfg.launch_profile == "lean":
+        context.add_init_script(script=NO_ANIMATION_SCRIPT)
+
+
+async def apply_context_profile_async(context, cfg: OutlookConfig) -> None:
+    """Same as apply_context_profile, for playwright.async_api contexts."""
+    if cfg.launch_profile == "lean":
+        await context.add_init_script(script=NO_ANIMATION_SCRIPT)
+
@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import atexit
+import functools
+import json
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+
+# Percentiles are computed over the most recent samples per step.
+RESERVOIR_SIZE = 5000
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+    return sorted_values[idx]
+
+
+class StepStats:
+    def __init__(self) -> None:
+        self.count = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.retries = 0
+        self.total_s = 0.0
+        self.samples: deque[float] = deque(maxlen=RESERVOIR_SIZE)
+
+    def snapshot(self) -> dict:
+        values = sorted(self.samples)
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "retries": self.retries,
+            "total_s": round(self.total_s, 6),
+            "p50_s": round(_percentile(values, 0.50), 6),
+            "p95_s": round(_percentile(values, 0.95), 6),
+            "p99_s": round(_percentile(values, 0.99), 6),
+            "max_s": round(values[-1], 6) if values else 0.0,
+        }
+
+
+class Metrics:
+    """Per-step latency/outcome registry with JSON and Prometheus text export."""
+
+    def __init__(self, out_dir: Path, *, interval_s: float = 60.0) -> None:
+        self.out_dir = out_dir
+        self.interval_s = interval_s
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._steps: dict[str, StepStats] = {}
+        self._local = threading.local()
+        self._exporter: threading.Thread | None = None
+
+    def _step(self, name: str) -> StepStats:
+        stats = self._steps.get(name)
+        if stats is None:
+            stats = self._steps.setdefault(name, StepStats())
+        return stats
+
+    def observe(self, step: str, seconds: float, *, error: BaseException | None = None) -> None:
+        with self._lock:
+            stats = self._step(step)
+            stats.count += 1
+            stats.total_s += seconds
+            stats.samples.append(seconds)
+            if error is not None:
+                stats.errors += 1
+                if "Timeout" in type(error).__name__:
+                    stats.timeouts += 1
+
+    def record_retry(self, step: str | None = None) -> None:
+        """Count a retry against `step`, or against the innermost open span."""
+        step = step or self.current_step()
+        if not step:
+            return
+        with self._lock:
+            self._step(step).retries += 1
+
+    def current_step(self) -> str | None:
+        stack = getattr(self._local, "stack", None)
+        return stack[-1] if stack else None
+
+    @contextmanager
+    def span(self, step: str):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        stack.append(step)
+        started = time.perf_counter()
+        error: BaseException | None = None
+        try:
+            yield
+        except BaseException as exc:
+            error = exc
+            raise
+        finally:
+            stack.pop()
+            self.observe(step, time.perf_counter() - started, error=error)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._steps.clear()
+            self.started = time.time()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            steps = {name: stats.snapshot() for name, stats in sorted(self._steps.items())}
+        return {
+            "generated_at": datetime.now().isoformat(timespec="seconds"),
+            "uptime_s": round(time.time() - self.started, 3),
+            "pid": os.getpid(),
+            "steps": steps,
+        }
+
+    def to_prometheus(self, snapshot: dict | None = None) -> str:
+        snap = snapshot or self.snapshot()
+        lines = [
+            "# HELP outlook_step_latency_seconds Latency of automation steps.",
+            "# TYPE outlook_step_latency_seconds summary",
+        ]
+        for step, s in snap["steps"].items():
+            for q, key in (("0.5", "p50_s"), ("0.95", "p95_s"), ("0.99", "p99_s")):
+                lines.append(f'outlook_step_latency_seconds{{step="{step}",quantile="{q}"}} {s[key]}')
+            lines.append(f'outlook_step_latency_seconds_sum{{step="{step}"}} {s["total_s"]}')
+            lines.append(f'outlook_step_latency_seconds_count{{step="{step}"}} {s["count"]}')
+        for metric, key, help_text in (
+            ("outlook_step_errors_total", "errors", "Steps that raised."),
+            ("outlook_step_timeouts_total", "timeouts", "Steps that raised a timeout."),
+            ("outlook_step_retries_total", "retries", "Retries inside steps."),
+        ):
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} counter")
+            for step, s in snap["steps"].items():
+                lines.append(f'{metric}{{step="{step}"}} {s[key]}')
+        return "\n".join(lines) + "\n"
+
+    def dump(self) -> None:
+        """Write outlook_metrics.json and outlook_metrics.prom (atomic replace).
+
+        Pool workers (multi_account) write outlook_metrics_<pid>.* instead, so they
+        don't overwrite the parent's files or each other's.
+        """
+        snap = self.snapshot()
+        if not snap["steps"]:
+            return
+        stem = "outlook_metrics" if multiprocessing.parent_process() is None else f"outlook_metrics_{os.getpid()}"
+        try:
+            self.out_dir.mkdir(parents=True, exist_ok=True)
+            for name, content in (
+                (f"{stem}.json", json.dumps(snap, indent=2)),
+                (f"{stem}.prom", self.to_prometheus(snap)),
+            ):
+                target = self.out_dir / name
+                tmp = target.with_suffix(target.suffix + ".tmp")
+                tmp.write_text(content, encoding="utf-8")
+                os.replace(tmp, target)
+        except Exception:
+            # Metrics must never break the run.
+            pass
+
+    def start_exporter(self) -> None:
+        if self._exporter is not None or self.interval_s <= 0:
+            return
+
+        def loop() -> None:
+            while True:
+                time.sleep(self.interval_s)
+                self.dump()
+
+        self._exporter = threading.Thread(target=loop, name="metrics-exporter", daemon=True)
+        self._exporter.start()
+
+
+_metrics: Metrics | None = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> Metrics:
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            env_dir = (os.getenv("OUTLOOK_METRICS_DIR") or "").strip()
+            out_dir = Path(env_dir) if env_dir else Path(__file__).resolve().parent.parent / "metrics"
+            try:
+                interval_s = float((os.getenv("OUTLOOK_METRICS_INTERVAL_S") or "").strip() or 60)
+            except ValueError:
+                interval_s = 60.0
+            _metrics = Metrics(out_dir, interval_s=interval_s)
+            _metrics.start_exporter()
+        return _metrics
+
+
+def _dump_at_exit() -> None:
+    if _metrics is not None:
+        _metrics.dump()
+
+
+def _reset_after_fork() -> None:
+    # A forked child has no exporter thread and would report the parent's samples; start fresh.
+    global _metrics, _metrics_lock
+    _metrics = None
+    _metrics_lock = threading.Lock()
+
+
+atexit.register(_dump_at_exit)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def span(step: str):
+    return get_metrics().span(step)
+
+
+def timed(step: str):
+    """Decorator form of `span`."""
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with get_metrics().span(step):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import csv
+import hashlib
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from inventory import account_workload
+from outlook_common import _mask_email, compact_excel_summary, log, merge_excel_summaries
+
+
+# Rough resident size of one Outlook tab plus its browser process.
+BROWSER_RAM_MB = 1200
+SCRIPTS = ("contacts", "deleted")
+
+
+@dataclass(frozen=True)
+class Account:
+    email: str
+    password: str = field(repr=False)
+
+
+def load_accounts(path: str) -> list[Account]:
+    """Read `email,password` rows; blank lines and lines starting with '#' are skipped."""
+    accounts: list[Account] = []
+    with open(path, newline="", encoding="utf-8") as fh:
+        for row in csv.reader(fh):
+            if not row or not row[0].strip() or row[0].strip().startswith("#"):
+                continue
+            if row[0].strip().lower() == "email":
+                continue
+            if len(row) < 2 or not row[1].strip():
+                raise ValueError(f"Account '{_mask_email(row[0])}' has no password in {path}")
+            accounts.append(Account(email=row[0].strip(), password=row[1].strip()))
+    return accounts
+
+
+def _available_ram_mb() -> int | None:
+    try:
+        return int(os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024))
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def resolve_workers(requested: int | None, n_accounts: int) -> int:
+    """Requested worker count, else min(cores, free RAM / browser footprint)."""
+    if requested is not None and requested > 0:
+        return min(requested, max(1, n_accounts))
+    cores = os.cpu_count() or 1
+    ram_mb = _available_ram_mb()
+    by_ram = max(1, ram_mb // BROWSER_RAM_MB) if ram_mb else cores
+    return max(1, min(cores, by_ram, n_accounts))
+
+
+def plan_accounts(accounts: list[Account]) -> list[Account]:
+    """Largest recorded workload first so big mailboxes don't start last and stretch the run.
+
+    Accounts never scanned are treated as large; ones recorded empty go last.
+    """
+    workloads = {a.email: account_workload(a.email) for a in accounts}
+    known = [w for w in workloads.values() if w is not None]
+    if known:
+        log(
+            f"Multi: inventory known for {len(known)}/{len(accounts)} accounts, "
+            f"{sum(known)} items recorded, largest={max(known)}"
+        )
+    return sorted(accounts, key=lambda a: -(workloads[a.email] if workloads[a.email] is not None else float("inf")))
+
+
+def _work_dir() -> Path:
+    """Per-run folder for the workers' workbooks; it survives a failed merge."""
+    root = Path(__file__).resolve().parent.parent / ".multi_runs"
+    return root / f"run_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}"
+
+
+def _run_account(account: Account, scripts: tuple[str, ...], options: dict, excel_path: str) -> dict:
+    """Worker entry point: one process, one browser session for every stage (pipeline.run)."""
+    # The scripts read credentials from env; load_dotenv() will not override these.
+    os.environ["OUTLOOK_EMAIL"] = account.email
+    os.environ["OUTLOOK_PASSWORD"] = account.password
+    # Each worker writes its own workbook; the parent merges them at the end.
+    os.environ["OUTLOOK_EXCEL_PATH"] = excel_path
+
+    import pipeline
+
+    result = {"account": _mask_email(account.email), "ok": True, "error": ""}
+    try:
+        pipeline.run(stages=scripts, **options)
+    except Exception as exc:
+        result["ok"] = False
+        result["error"] = f"{','.join(scripts)}: {type(exc).__name__}: {exc}"
+        log(f"Multi: {result['account']} {result['error']}")
+    return result
+
+
+def run(
+    accounts_file: str,
+    *,
+    workers: int | None = None,
+    scripts: tuple[str, ...] = SCRIPTS,
+    headless: bool = True,
+    browser_name: str | None = None,
+    timeout_ms: int | None = None,
+) -> None:
+    unknown = [s for s in scripts if s not in SCRIPTS]
+    if unknown or not scripts:
+        raise ValueError(f"scripts must be a non-empty subset of {','.join(SCRIPTS)} (got {','.join(scripts)})")
+    load_dotenv()
+    accounts = load_accounts(accounts_file)
+    if not accounts:
+        log(f"Multi: no accounts in {accounts_file}")
+        return
+
+    accounts = plan_accounts(accounts)
+    n_workers = resolve_workers(workers, len(accounts))
+    options = {"headless": headless, "browser_name": browser_name, "timeout_ms": timeout_ms}
+    log(f"Multi: start accounts={len(accounts)} workers={n_workers} scripts={','.join(scripts)}")
+
+    work_dir = _work_dir()
+    work_dir.mkdir(parents=True, exist_ok=True)
+    worker_files: list[Path] = []
+    results: list[dict] = []
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        futures = []
+        for account in accounts:
+            digest = hashlib.sha256(account.email.lower().encode("utf-8")).hexdigest()[:12]
+            excel_path = work_dir / f"summary_{digest}.xlsx"
+            worker_files.append(excel_path)
+            futures.append(pool.submit(_run_account, account, scripts, options, str(excel_path)))
+
+        try:
+            for future in as_completed(futures):
+                try:
+                    results.append(future.result())
+                except Exception as exc:
+                    results.append({"account": "?", "ok": False, "error": f"{type(exc).__name__}: {exc}"})
+        except KeyboardInterrupt:
+            log("Multi: interrupted by user; waiting for workers to flush")
+            for future in futures:
+                future.cancel()
+
+    # Rows of a worker that died before compacting are still in its journal.
+    for excel_path in worker_files:
+        if excel_path.with_suffix(".jsonl").exists():
+            compact_excel_summary(str(excel_path))
+
+    # Single writer: only the parent touches the consolidated daily workbook.
+    existing = [f for f in worker_files if f.exists()]
+    if existing and merge_excel_summaries(existing) == 0:
+        log(f"Multi: merge failed; worker summaries kept in {work_dir}", level="WARNING")
+    else:
+        for f in existing:
+            f.unlink(missing_ok=True)
+        try:
+            work_dir.rmdir()
+        except OSError:
+            # A journal whose workbook stayed locked; its rows are not in the merge.
+            log(f"Multi: uncompacted worker journals kept in {work_dir}", level="WARNING")
+
+    failed = [r for r in results if not r["ok"]]
+    for r in failed:
+        log(f"Multi: failed {r['account']} ({r['error']})")
+    log(f"Multi: finished accounts={len(results)} failed={len(failed)}")
+
+
+if __name__ == "__main__":
+    # python src/multi_account.py accounts.csv
+    # --workers 4
+    # --scripts contacts,deleted
+    # --browser chromium|firefox|webkit
+    # --headed
+    # --timeout-ms 60000
+    if len(sys.argv) < 2 or sys.argv[1].startswith("--"):
+        print("usage: multi_account.py ACCOUNTS_CSV [--workers N] [--scripts contacts,deleted] [--headed]")
+        sys.exit(2)
+
+    accounts_file = sys.argv[1]
+    workers = None
+    scripts = SCRIPTS
+    browser = None
+    headless = True
+    timeout_ms = None
+
+    if "--workers" in sys.argv:
+        idx = sys.argv.index("--workers")
+        if idx + 1 < len(sys.argv):
+            workers = int(sys.argv[idx + 1])
+
+    if "--scripts" in sys.argv:
+        idx = sys.argv.index("--scripts")
+        if idx + 1 < len(sys.argv):
+            scripts = tuple(s.strip() for s in sys.argv[idx + 1].split(",") if s.strip())
+        unknown = [s for s in scripts if s not in SCRIPTS]
+        if unknown or not scripts:
+            print(f"multi_account.py: unknown --scripts {','.join(unknown) or '(none)'}; choose from {','.join(SCRIPTS)}")
+            sys.exit(2)
+
+    if "--browser" in sys.argv:
+        idx = sys.argv.index("--browser")
+        if idx + 1 < len(sys.argv):
+            browser = sys.argv[idx + 1]
+
+    if "--headed" in sys.argv:
+        headless = False
+
+    if "--timeout-ms" in sys.argv:
+        idx = sys.argv.index("--timeout-ms")
+        if idx + 1 < len(sys.argv):
+            timeout_ms = int(sys.argv[idx + 1])
+
+    run(
+        accounts_file,
+        workers=workers,
+        scripts=scripts,
+        headless=headless,
+        browser_name=browser,
+        timeout_ms=timeout_ms,
+    )
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from urllib.parse import urlparse
+
+from outlook_common import NETWORK_PROFILES, log
+
+
+# Resource types the People/contact-list flow never needs to render its buttons.
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font"}
+
+# Hosts the login + People flow actually talks to (suffix match).
+ALLOWED_HOST_SUFFIXES = (
+    "outlook.office.com",
+    "outlook.office365.com",
+    "outlook.live.com",
+    "live.com",
+    "login.microsoftonline.com",
+    "login.microsoft.com",
+    "msauth.net",
+    "msftauth.net",
+    "res.cdn.office.net",
+    "substrate.office.com",
+    "office.net",
+)
+
+# Telemetry, ads, avatars and mail-pane prefetches; blocked even on allowed hosts.
+BLOCKED_URL_PATTERNS = [
+    re.compile(p, re.I)
+    for p in (
+        r"events\.data\.microsoft\.com",
+        r"\.events\.data\.msn\.com",
+        r"onecollector",
+        r"aria\.microsoft\.com",
+        r"clarity\.ms",
+        r"doubleclick\.net",
+        r"adsdk|/ads/|[./]ads?\.",
+        r"/GetPersonaPhoto|/GetUserPhoto|/photos?/",
+        r"/owa/.*action=(GetConversationItems|FindConversation|GetItem)\b",
+        r"/ows/.*/(telemetry|clientlog)",
+    )
+]
+
+
+@dataclass
+class RouteStats:
+    profile: str
+    allowed: int = 0
+    blocked: int = 0
+    blocked_by_reason: dict[str, int] = field(default_factory=dict)
+
+    def log_summary(self) -> None:
+        reasons = " ".join(f"{k}={v}" for k, v in sorted(self.blocked_by_reason.items()))
+        log(f"Network: profile={self.profile} allowed={self.allowed} blocked={self.blocked} {reasons}".rstrip())
+
+
+def block_reason(url: str, resource_type: str) -> str | None:
+    """Why the lean profile would abort this request, or None to let it through."""
+    for pattern in BLOCKED_URL_PATTERNS:
+        if pattern.search(url):
+            return "pattern"
+    if resource_type in BLOCKED_RESOURCE_TYPES:
+        return resource_type
+
+    host = (urlparse(url).hostname or "").lower()
+    if not host or url.startswith(("data:", "blob:")):
+        return None
+    if not any(host == suffix or host.endswith("." + suffix) for suffix in ALLOWED_HOST_SUFFIXES):
+        return "host"
+    return None
+
+
+def _decide(stats: RouteStats, url: str, resource_type: str) -> bool:
+    reason = block_reason(url, resource_type)
+    if reason is None:
+        stats.allowed += 1
+        return True
+    stats.blocked += 1
+    stats.blocked_by_reason[reason] = stats.blocked_by_reason.get(reason, 0) + 1
+    return False
+
+
+def install_route_profile(context, profile: str) -> RouteStats | None:
+    """Attach the routing profile to a sync BrowserContext (no-op for 'off')."""
+    if profile not in NETWORK_PROFILES:
+        raise ValueError("network_profile must be one of: " + ", ".join(sorted(NETWORK_PROFILES)))
+    if profile == "off":
+        return None
+    stats = RouteStats(profile=profile)
+
+    def handler(route) -> None:
+        request = route.request
+        try:
+            if _decide(stats, request.url, request.resource_type):
+                route.continue_()
+            else:
+                route.abort("blockedbyclient")
+        except Exception:
+            # Page/context closing while a request is in flight.
+            pass
+
+    context.route("**/*", handler)
+    context.on("close", lambda _ctx: stats.log_summary())
+    log(f"Network: routing profile '{profile}' installed")
+    return stats
+
+
+async def install_route_profile_async(context, profile: str) -> RouteStats | None:
+    """Same as install_route_profile, for playwright.async_api contexts."""
+    if profile not in NETWORK_PROFILES:
+        raise ValueError("network_profile must be one of: " + ", ".join(sorted(NETWORK_PROFILES)))
+    if profile == "off":
+        return None
+    stats = RouteStats(profile=profile)
+
+    async def handler(route) -> None:
+        request = route.request
+        try:
+            if _decide(stats, request.url, request.resource_type):
+                await route.continue_()
+            else:
+                await route.abort("blockedbyclient")
+        except Exception:
+            pass
+
+    await context.route("**/*", handler)
+    context.on("close", lambda _ctx: stats.log_summary())
+    log(f"Network: routing profile '{profile}' installed")
+    return stats
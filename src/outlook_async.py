@@ -0,0 +1,454 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+from dataclasses import dataclass, field
+
+from dotenv import load_dotenv
+from playwright.async_api import BrowserContext, Locator, Page, async_playwright
+
+from launch_profile import apply_context_profile_async, context_options, launch_options
+from network_profile import install_route_profile_async
+from outlook_common import (
+    CONFIRM_CONTACT_LIST_SELECTOR,
+    CONFIRM_DELETE_SELECTOR,
+    DELETE_FALLBACK_SELECTOR,
+    EMPTY_STATE_SELECTOR,
+    LIST_ROW_SELECTOR,
+    OUTLOOK_MAIL_URL,
+    PEOPLE_BUTTON_SELECTOR,
+    OutlookConfig,
+    _ui_variant,
+    append_excel_summary,
+    compact_excel_summary,
+    contact_list_selectors,
+    load_config,
+    log,
+)
+from run_log import dump_ring
+from selector_cache import get_cache
+from session_store import LOGIN_HOSTS, SIGNED_IN_SELECTOR, load_session_state, refresh_session_state
+
+
+async def _robust_click(locator: Locator, *, timeout_ms: int, retries: int = 3) -> None:
+    last_err: Exception | None = None
+    for attempt in range(retries):
+        try:
+            await locator.wait_for(state="visible", timeout=timeout_ms)
+            await locator.click(timeout=timeout_ms, force=(attempt >= retries - 1), no_wait_after=True)
+            return
+        except Exception as exc:
+            last_err = exc
+
+    if last_err:
+        raise last_err
+
+
+async def _click_first_visible(page: Page, selectors: list[str], *, timeout_ms: int, action: str) -> None:
+    """Async mirror of outlook_common._click_first_visible (shares the selector cache)."""
+    variant = _ui_variant(page)
+    cache = get_cache()
+    ordered = cache.order(action, variant, selectors)
+    locators = [page.locator(sel).first for sel in ordered]
+
+    combined = locators[0]
+    for loc in locators[1:]:
+        combined = combined.or_(loc)
+    await combined.first.wait_for(state="visible", timeout=timeout_ms)
+
+    target = combined.first
+    for sel, loc in zip(ordered, locators):
+        try:
+            if await loc.is_visible():
+                cache.record(action, variant, sel)
+                target = loc
+                break
+        except Exception:
+            continue
+    await target.click(timeout=timeout_ms, no_wait_after=True)
+
+
+async def open_people(page: Page, *, timeout_ms: int) -> None:
+    log("UI: open People", level="DEBUG")
+    people_btn = page.locator(PEOPLE_BUTTON_SELECTOR).first
+    await people_btn.wait_for(state="visible", timeout=timeout_ms)
+    try:
+        pressed = await people_btn.get_attribute("aria-pressed")
+        if pressed and pressed.lower() == "true":
+            log("UI: People already selected", level="DEBUG")
+            return
+    except Exception:
+        pass
+
+    await _robust_click(people_btn, timeout_ms=timeout_ms, retries=3)
+
+
+async def open_contact_list(page: Page, list_name: str, *, timeout_ms: int) -> None:
+    log(f"UI: open list '{list_name}'", level="DEBUG")
+    await _click_first_visible(
+        page, contact_list_selectors(list_name), timeout_ms=timeout_ms, action=f"open_list:{list_name}"
+    )
+
+
+async def click_delete_and_confirm(page: Page, *, timeout_ms: int, confirm_variant: str = "default") -> None:
+    log("UI: click Delete", level="DEBUG")
+    delete_button = page.get_by_role("button", name="Delete").first
+    delete_fallback = page.locator(DELETE_FALLBACK_SELECTOR).first
+
+    try:
+        await _robust_click(delete_button, timeout_ms=timeout_ms, retries=6)
+    except Exception:
+        await _robust_click(delete_fallback, timeout_ms=timeout_ms, retries=6)
+
+    if confirm_variant == "contact_list":
+        confirm_contact_list = page.locator(CONFIRM_CONTACT_LIST_SELECTOR).first
+        try:
+            log("UI: confirm Delete (contact_list Dialog button[text()='Delete'])", level="DEBUG")
+            await _robust_click(confirm_contact_list, timeout_ms=min(timeout_ms, 8000), retries=3)
+            log("UI: delete confirmed", level="DEBUG")
+            return
+        except Exception:
+            pass
+
+    confirm_span_exact = page.locator(CONFIRM_DELETE_SELECTOR).first
+    log("UI: confirm Delete (exact Dialog span xpath)", level="DEBUG")
+    await _robust_click(confirm_span_exact, timeout_ms=min(timeout_ms, 8000), retries=3)
+    log("UI: delete confirmed", level="DEBUG")
+
+
+@dataclass
+class SharedProgress:
+    """Counters shared by every page task (single event loop, so no locking needed).
+
+    `exhausted` holds the lists a page found empty.
+    """
+
+    deleted: dict[str, int] = field(default_factory=dict)
+    failures: dict[str, int] = field(default_factory=dict)
+    exhausted: set[str] = field(default_factory=set)
+
+    def total(self) -> int:
+        return sum(self.deleted.values())
+
+
+async def probe_list_state(page: Page, *, timeout_ms: int = 3000) -> str:
+    """Async mirror of outlook_common.probe_list_state: 'ready', 'empty' or 'broken'."""
+    rows = page.locator(LIST_ROW_SELECTOR)
+    empty = page.locator(EMPTY_STATE_SELECTOR)
+    try:
+        await rows.first.or_(empty.first).wait_for(state="visible", timeout=timeout_ms)
+    except Exception:
+        pass
+
+    try:
+        if await rows.count() > 0:
+            return "ready"
+        if await empty.first.is_visible():
+            return "empty"
+    except Exception:
+        pass
+
+    button = page.get_by_role("button", name="Delete").first
+    try:
+        if not await button.is_visible():
+            return "broken"
+        disabled = await button.is_disabled() or (await button.get_attribute("aria-disabled") or "").lower() == "true"
+    except Exception:
+        return "broken"
+    return "empty" if disabled else "ready"
+
+
+async def delete_many(
+    page: Page,
+    *,
+    list_name: str,
+    timeout_ms: int,
+    batch_size: int = 5,
+    max_total: int | None = None,
+    max_failures: int = 100,
+    confirm_variant: str = "default",
+    on_deleted: callable | None = None,
+    semaphore: asyncio.Semaphore | None = None,
+    progress: SharedProgress | None = None,
+    tag: str = "",
+) -> int:
+    """Async mirror of outlook_common.delete_many.
+
+    `semaphore` caps how many pages run a Delete/confirm round trip at once; `progress`
+    collects the per-list counts of every page. Each list gets one page (see run_pages):
+    pages racing on one list would select and delete the same rows.
+    """
+    if batch_size <= 0:
+        raise ValueError("batch_size must be >= 1")
+
+    prefix = f"DeleteMany[{tag or list_name}]"
+    log(f"{prefix}: start list='{list_name}' batch_size={batch_size} max_total={max_total}")
+    await open_people(page, timeout_ms=timeout_ms)
+    await open_contact_list(page, list_name, timeout_ms=timeout_ms)
+
+    if await probe_list_state(page, timeout_ms=min(timeout_ms, 5000)) == "empty":
+        log(f"{prefix}: list is empty; nothing to delete")
+        if progress is not None:
+            progress.exhausted.add(list_name)
+        return 0
+
+    total_deleted = 0
+    deleted_since_reload = 0
+    consecutive_failures = 0
+
+    async def recover() -> None:
+        try:
+            await page.reload(wait_until="domcontentloaded")
+        except Exception:
+            pass
+        try:
+            await open_people(page, timeout_ms=timeout_ms)
+            await open_contact_list(page, list_name, timeout_ms=timeout_ms)
+        except Exception:
+            pass
+
+    while True:
+        if max_total is not None and total_deleted >= max_total:
+            log(f"{prefix}: reached max_total={max_total}")
+            return total_deleted
+
+        try:
+            if semaphore is not None:
+                async with semaphore:
+                    await click_delete_and_confirm(page, timeout_ms=timeout_ms, confirm_variant=confirm_variant)
+            else:
+                await click_delete_and_confirm(page, timeout_ms=timeout_ms, confirm_variant=confirm_variant)
+            total_deleted += 1
+            deleted_since_reload += 1
+            consecutive_failures = 0
+            if progress is not None:
+                progress.deleted[list_name] = progress.deleted.get(list_name, 0) + 1
+            log(f"{prefix}: deleted {total_deleted}", level="DEBUG")
+            if on_deleted is not None:
+                try:
+                    on_deleted()
+                except Exception:
+                    pass
+        except Exception as exc:
+            consecutive_failures += 1
+            if progress is not None:
+                progress.failures[list_name] = progress.failures.get(list_name, 0) + 1
+            log(
+                f"{prefix}: failure {consecutive_failures}/{max_failures} ({type(exc).__name__}: {exc})",
+                level="WARNING",
+            )
+            dump_ring(f"{prefix} failure")
+            await recover()
+
+            state = await probe_list_state(page, timeout_ms=min(timeout_ms, 5000))
+            if state == "empty":
+                log(f"{prefix}: list is empty after {total_deleted} deletes; stopping")
+                if progress is not None:
+                    progress.exhausted.add(list_name)
+                return total_deleted
+
+            if consecutive_failures >= max_failures:
+                if state == "broken" and total_deleted == 0:
+                    log(f"{prefix}: {max_failures} failures, no deletes and the list did not render; stopping")
+                    return 0
+                # Not empty (that returned above), so returning 0 would read as "done".
+                raise RuntimeError(
+                    f"{prefix}: too many consecutive failures after {total_deleted} deletes "
+                    f"(list state={state}); restart browser"
+                ) from exc
+
+        if deleted_since_reload >= batch_size:
+            deleted_since_reload = 0
+            log(f"{prefix}: batch completed ({batch_size}); reload", level="DEBUG")
+            await recover()
+
+
+@dataclass(frozen=True)
+class PageTask:
+    list_name: str
+    confirm_variant: str = "default"
+    batch_size: int = 5
+
+
+async def _open_context(browser, cfg: OutlookConfig) -> BrowserContext:
+    """One authenticated context, reusing the saved storage_state from session_store.
+
+    A missing or expired state is renewed by session_store.refresh_session_state (the
+    sync login flow, in a worker thread), then loaded into a new context.
+    """
+    for attempt in range(2):
+        state = load_session_state(cfg.email)
+        context = await browser.new_context(storage_state=state, **context_options(cfg))
+        await apply_context_profile_async(context, cfg)
+        await install_route_profile_async(context, cfg.network_profile)
+        if state is not None:
+            page = await context.new_page()
+            try:
+                await page.goto(OUTLOOK_MAIL_URL, wait_until="domcontentloaded")
+                await page.locator(SIGNED_IN_SELECTOR).first.wait_for(
+                    state="visible", timeout=min(cfg.timeout_ms, 15000)
+                )
+                if not any(host in page.url for host in LOGIN_HOSTS):
+                    log("Session: reused saved state (login skipped)")
+                    return context
+            except Exception:
+                pass
+            finally:
+                await page.close()
+        await context.close()
+        if attempt:
+            break
+        log("Session: no valid saved state; login")
+        await asyncio.to_thread(refresh_session_state, cfg)
+    raise RuntimeError("Session: signed in, but the saved state was not accepted")
+
+
+async def run_pages(
+    cfg: OutlookConfig,
+    tasks: list[PageTask],
+    *,
+    concurrency: int = 2,
+    script_name: str = "outlook_async",
+    progress: SharedProgress | None = None,
+) -> SharedProgress:
+    """Run every task on its own page inside one logged-in context.
+
+    Each task must target a different list. The per-list summary is written even when
+    the run is cancelled or interrupted; pass `progress` to read the counts afterwards
+    in that case too.
+    """
+    names = [task.list_name for task in tasks]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"one page per list; more than one task for: {', '.join(duplicates)}")
+
+    progress = progress if progress is not None else SharedProgress()
+    # One page per list, so more slots than pages would never be used.
+    effective = max(1, min(concurrency, len(tasks)))
+    if effective != concurrency:
+        log(f"Async: concurrency {concurrency} -> {effective} (one page per list, {len(tasks)} lists)")
+    semaphore = asyncio.Semaphore(effective)
+
+    try:
+        async with async_playwright() as p:
+            browser_type = getattr(p, cfg.browser_name)
+            log(
+                f"Async: launch browser={cfg.browser_name} headless={cfg.headless} "
+                f"pages={len(tasks)} concurrency={effective}"
+            )
+            browser = await browser_type.launch(**launch_options(cfg))
+            try:
+                context = await _open_context(browser, cfg)
+
+                async def worker(idx: int, task: PageTask) -> None:
+                    page = await context.new_page()
+                    page.set_default_timeout(cfg.timeout_ms)
+                    try:
+                        await page.goto(OUTLOOK_MAIL_URL, wait_until="domcontentloaded")
+                        await delete_many(
+                            page,
+                            list_name=task.list_name,
+                            timeout_ms=cfg.timeout_ms,
+                            batch_size=task.batch_size,
+                            confirm_variant=task.confirm_variant,
+                            semaphore=semaphore,
+                            progress=progress,
+                            tag=f"{task.list_name}#{idx}",
+                        )
+                    except Exception as exc:
+                        log(f"Async: page {idx} stopped ({type(exc).__name__}: {exc})", level="ERROR")
+                        dump_ring(f"page {idx} stopped")
+                    finally:
+                        try:
+                            await page.close()
+                        except Exception:
+                            pass
+
+                await asyncio.gather(*(worker(idx, task) for idx, task in enumerate(tasks, start=1)))
+                await context.close()
+            finally:
+                await browser.close()
+    finally:
+        # Ctrl+C cancels the run; what was deleted until then still goes to the summary.
+        for list_name, deleted in progress.deleted.items():
+            append_excel_summary(
+                script_name=script_name,
+                list_name=list_name,
+                deleted_this_session=deleted,
+                total_deleted=deleted,
+                browser_name=cfg.browser_name,
+                headless=cfg.headless,
+                email=cfg.email,
+            )
+        log(f"Async: finished total_deleted={progress.total()} per_list={progress.deleted}")
+    return progress
+
+
+def run(
+    *,
+    headless: bool = False,
+    browser_name: str | None = None,
+    timeout_ms: int | None = None,
+    contacts: bool = True,
+    deleted: bool = True,
+    concurrency: int = 2,
+) -> None:
+    """One tab per list: "Your contact lists" and/or "Deleted", side by side."""
+    load_dotenv()
+    log("Run: start outlook_async")
+    cfg = load_config(browser_name=browser_name, headless=headless, timeout_ms=timeout_ms)
+
+    tasks = []
+    if contacts:
+        tasks.append(PageTask("Your contact lists", confirm_variant="contact_list", batch_size=5))
+    if deleted:
+        tasks.append(PageTask("Deleted", batch_size=1000))
+    if not tasks:
+        log("Run: no lists selected")
+        return
+
+    try:
+        asyncio.run(run_pages(cfg, tasks, concurrency=concurrency))
+    except KeyboardInterrupt:
+        log("Run: interrupted by user")
+    compact_excel_summary()
+    log("Run: finished")
+
+
+if __name__ == "__main__":
+    # --browser chromium|firefox|webkit
+    # --headless
+    # --timeout-ms 60000
+    # --no-contacts | --no-deleted
+    # --concurrency 2   (at most one per list; 1 takes turns between the tabs)
+    browser = None
+    headless = False
+    timeout_ms = None
+    concurrency = 2
+
+    if "--browser" in sys.argv:
+        idx = sys.argv.index("--browser")
+        if idx + 1 < len(sys.argv):
+            browser = sys.argv[idx + 1]
+
+    if "--headless" in sys.argv:
+        headless = True
+
+    if "--timeout-ms" in sys.argv:
+        idx = sys.argv.index("--timeout-ms")
+        if idx + 1 < len(sys.argv):
+            timeout_ms = int(sys.argv[idx + 1])
+
+    if "--concurrency" in sys.argv:
+        idx = sys.argv.index("--concurrency")
+        if idx + 1 < len(sys.argv):
+            concurrency = int(sys.argv[idx + 1])
+
+    run(
+        headless=headless,
+        browser_name=browser,
+        timeout_ms=timeout_ms,
+        contacts="--no-contacts" not in sys.argv,
+        deleted="--no-deleted" not in sys.argv,
+        concurrency=concurrency,
+    )
@@ -1,22 +1,34 @@
 from __future__ import annotations
 
 import os
+import re
+import time
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
+from urllib.parse import urlparse
 
 from playwright.sync_api import Locator, Page, TimeoutError as PlaywrightTimeoutError
 
+from metrics import get_metrics, span, timed
+from run_journal import claim_journal, get_writer, read_journal, release_claim
+from run_log import dump_ring, get_logger
+from selector_cache import get_cache
+
 
 OUTLOOK_MAIL_URL = "https://outlook.office.com/mail/0/?deeplink=mail%2F0%2F"
+NETWORK_PROFILES = {"off", "lean"}
+LAUNCH_PROFILES = {"default", "lean"}
+DELETE_STRATEGIES = {"click", "keyboard"}
 
 
 def _ts() -> str:
     return datetime.now().isoformat(timespec="seconds")
 
 
-def log(message: str) -> None:
-    print(f"[{_ts()}] {message}", flush=True)
+def log(message: str, *, level: str = "INFO", **fields) -> None:
+    """Enqueue a log event (see run_log); DEBUG events only surface in failure dumps."""
+    get_logger().emit(level, message, fields or None)
 
 
 def _mask_email(value: str) -> str:
@@ -30,29 +42,29 @@ def _mask_email(value: str) -> str:
     return (value[:2] + "***") if len(value) >= 2 else "***"
 
 
-def append_excel_summary(
-    *,
-    script_name: str,
-    list_name: str,
-    deleted_this_session: int,
-    total_deleted: int,
-    browser_name: str,
-    headless: bool,
-    email: str,
-    excel_path: str | None = None,
-) -> None:
-    """Append one row to an Excel summary file.
+SUMMARY_HEADERS = [
+    "timestamp",
+    "script",
+    "list",
+    "deleted_this_session",
+    "total_deleted",
+    "browser",
+    "headless",
+    "account",
+]
 
-    Designed for quick run-level totals across multiple scripts.
-    """
 
+def _summary_path(excel_path: str | None = None) -> Path:
+    excel_path = excel_path or (os.getenv("OUTLOOK_EXCEL_PATH") or "").strip() or None
     if excel_path:
-        path = Path(excel_path)
-    else:
-        # One file per day. If the run crosses midnight, new appends go to a new file.
-        day = datetime.now().strftime("%Y-%m-%d")
-        filename = f"outlook_delete_summary_{day}.xlsx"
-        path = Path(__file__).resolve().parent.parent / filename
+        return Path(excel_path)
+    # One file per day. If the run crosses midnight, new appends go to a new file.
+    day = datetime.now().strftime("%Y-%m-%d")
+    filename = f"outlook_delete_summary_{day}.xlsx"
+    return Path(__file__).resolve().parent.parent / filename
+
+
+def _append_excel_rows(path: Path, rows: list[list]) -> bool:
     try:
         path.parent.mkdir(parents=True, exist_ok=True)
     except Exception:
@@ -62,29 +74,7 @@ def append_excel_summary(
         from openpyxl import Workbook, load_workbook
     except Exception as exc:
         log(f"Excel: openpyxl not available ({type(exc).__name__}: {exc})")
-        return
-
-    headers = [
-        "timestamp",
-        "script",
-        "list",
-        "deleted_this_session",
-        "total_deleted",
-        "browser",
-        "headless",
-        "account",
-    ]
-
-    row = [
-        _ts(),
-        script_name,
-        list_name,
-        int(deleted_this_session),
-        int(total_deleted),
-        browser_name,
-        bool(headless),
-        _mask_email(email),
-    ]
+        return False
 
     try:
         if path.exists():
@@ -94,20 +84,131 @@ def append_excel_summary(
                 ws.title = "Summary"
             # If file exists but is empty/no header, write header.
             if ws.max_row < 1:
-                ws.append(headers)
+                ws.append(SUMMARY_HEADERS)
         else:
             wb = Workbook()
             ws = wb.active
             ws.title = "Summary"
-            ws.append(headers)
+            ws.append(SUMMARY_HEADERS)
 
-        ws.append(row)
+        for row in rows:
+            ws.append(row)
         wb.save(path)
-        log(f"Excel: appended summary row -> {path}")
+        return True
     except PermissionError:
-        log(f"Excel: cannot write (file open/locked): {path}")
+        log(f"Excel: cannot write (file open/locked): {path}", level="WARNING")
+    except Exception as exc:
+        log(f"Excel: failed to write ({type(exc).__name__}: {exc})", level="WARNING")
+    return False
+
+
+def append_excel_summary(
+    *,
+    script_name: str,
+    list_name: str,
+    deleted_this_session: int,
+    total_deleted: int,
+    browser_name: str,
+    headless: bool,
+    email: str,
+    excel_path: str | None = None,
+) -> None:
+    """Record one summary row.
+
+    Designed for quick run-level totals across multiple scripts. The row goes to an
+    append-only JSONL journal next to the workbook (written on a background thread);
+    `compact_excel_summary` folds the journal into the xlsx at run end.
+    `OUTLOOK_EXCEL_PATH` overrides the daily file (used by the multi-account runner).
+    """
+    path = _summary_path(excel_path)
+    row = [
+        _ts(),
+        script_name,
+        list_name,
+        int(deleted_this_session),
+        int(total_deleted),
+        browser_name,
+        bool(headless),
+        _mask_email(email),
+    ]
+    get_writer().append(path.with_suffix(".jsonl"), dict(zip(SUMMARY_HEADERS, row)))
+
+
+def flush_excel_summary(timeout: float | None = 10.0) -> bool:
+    """Wait until queued summary rows are on disk; False if the journal writer didn't get there in time.
+
+    A checkpoint may only count rows as recorded (`excel_total`) after this returns True.
+    """
+    try:
+        return get_writer().flush(timeout)
+    except Exception:
+        return False
+
+
+def compact_excel_summary(excel_path: str | None = None) -> int:
+    """Fold pending journal rows into their workbooks; returns rows written.
+
+    Without an explicit path, every daily journal in the project root is compacted
+    (covers runs that crossed midnight or crashed before compacting), including ones
+    other scripts are still appending to: `claim_journal` locks them against their
+    writers. Claims left by a crashed compaction are folded in as well. If a workbook
+    is locked, its rows stay in the journal for the next attempt.
+    """
+    if excel_path or (os.getenv("OUTLOOK_EXCEL_PATH") or "").strip():
+        journals = [_summary_path(excel_path).with_suffix(".jsonl")]
+    else:
+        root = Path(__file__).resolve().parent.parent
+        names = {j.name for j in root.glob("outlook_delete_summary_*.jsonl")}
+        for claim in root.glob("outlook_delete_summary_*.jsonl.*.compacting"):
+            names.add(claim.name.split(".jsonl.", 1)[0] + ".jsonl")
+        journals = [root / name for name in sorted(names)]
+
+    written = 0
+    for journal in journals:
+        claimed = claim_journal(journal)
+        if claimed is None:
+            continue
+        rows = [[record.get(h) for h in SUMMARY_HEADERS] for record in read_journal(claimed)]
+        target = journal.with_suffix(".xlsx")
+        if not rows or _append_excel_rows(target, rows):
+            claimed.unlink(missing_ok=True)
+            if rows:
+                written += len(rows)
+                log(f"Excel: compacted {len(rows)} journal rows -> {target}")
+        else:
+            release_claim(claimed, journal)
+            log(f"Excel: kept {len(rows)} rows in journal {journal}")
+    return written
+
+
+def merge_excel_summaries(sources: list[Path], *, excel_path: str | None = None) -> int:
+    """Copy the data rows of several summary workbooks into one, in a single save."""
+    try:
+        from openpyxl import load_workbook
     except Exception as exc:
-        log(f"Excel: failed to write ({type(exc).__name__}: {exc})")
+        log(f"Excel: openpyxl not available ({type(exc).__name__}: {exc})")
+        return 0
+
+    rows: list[list] = []
+    for source in sources:
+        if not source.exists():
+            continue
+        try:
+            wb = load_workbook(source, read_only=True)
+            ws = wb["Summary"] if "Summary" in wb.sheetnames else wb.active
+            rows.extend(list(r) for r in ws.iter_rows(min_row=2, values_only=True) if any(v is not None for v in r))
+            wb.close()
+        except Exception as exc:
+            log(f"Excel: cannot read {source} ({type(exc).__name__}: {exc})")
+
+    if not rows:
+        return 0
+    rows.sort(key=lambda r: str(r[0] or ""))
+    path = _summary_path(excel_path)
+    if not _append_excel_rows(path, rows):
+        return 0
+    log(f"Excel: merged {len(rows)} rows from {len(sources)} files -> {path}")
+    return len(rows)
 
 
 @dataclass(frozen=True)
@@ -117,9 +218,35 @@ class OutlookConfig:
     browser_name: str = "firefox"
     headless: bool = False
     timeout_ms: int = 30000
+    bulk_select: bool = False
+    reload_mode: str = "batch"
+    network_profile: str = "off"
+    adaptive: bool = False
+    warm_standby: bool = False
+    delete_strategy: str = "click"
+    launch_profile: str = "default"
 
 
-def load_config(*, browser_name: str | None = None, headless: bool | None = None, timeout_ms: int | None = None) -> OutlookConfig:
+def _env_flag(name: str) -> bool | None:
+    value = (os.getenv(name) or "").strip().lower()
+    if not value:
+        return None
+    return value in {"1", "true", "yes", "y"}
+
+
+def load_config(
+    *,
+    browser_name: str | None = None,
+    headless: bool | None = None,
+    timeout_ms: int | None = None,
+    bulk_select: bool | None = None,
+    reload_mode: str | None = None,
+    network_profile: str | None = None,
+    adaptive: bool | None = None,
+    warm_standby: bool | None = None,
+    delete_strategy: str | None = None,
+    launch_profile: str | None = None,
+) -> OutlookConfig:
     email = (os.getenv("OUTLOOK_EMAIL") or "").strip()
     password = (os.getenv("OUTLOOK_PASSWORD") or "").strip()
     if not email or not password:
@@ -128,6 +255,7 @@ def load_config(*, browser_name: str | None = None, headless: bool | None = None
     env_browser = (os.getenv("PLAYWRIGHT_BROWSER") or "").strip().lower() or None
     env_headless = (os.getenv("PLAYWRIGHT_HEADLESS") or "").strip().lower() or None
     env_timeout = (os.getenv("PLAYWRIGHT_TIMEOUT_MS") or "").strip() or None
+    env_network = (os.getenv("PLAYWRIGHT_NETWORK_PROFILE") or "").strip().lower() or None
 
     resolved_browser = (browser_name or env_browser or "firefox").strip().lower()
     if resolved_browser not in {"chromium", "firefox", "webkit"}:
@@ -150,18 +278,48 @@ def load_config(*, browser_name: str | None = None, headless: bool | None = None
     if resolved_timeout is None:
         resolved_timeout = 30000
 
+    resolved_bulk = bulk_select if bulk_select is not None else bool(_env_flag("OUTLOOK_BULK_SELECT"))
+    resolved_adaptive = adaptive if adaptive is not None else bool(_env_flag("OUTLOOK_ADAPTIVE"))
+    resolved_standby = warm_standby if warm_standby is not None else bool(_env_flag("OUTLOOK_WARM_STANDBY"))
+
+    resolved_reload = (reload_mode or os.getenv("OUTLOOK_RELOAD_MODE") or "batch").strip().lower()
+    if resolved_reload not in {"batch", "event"}:
+        raise ValueError("reload_mode must be one of: batch, event")
+
+    resolved_strategy = (delete_strategy or os.getenv("OUTLOOK_DELETE_STRATEGY") or "click").strip().lower()
+    if resolved_strategy not in DELETE_STRATEGIES:
+        raise ValueError("delete_strategy must be one of: " + ", ".join(sorted(DELETE_STRATEGIES)))
+
+    resolved_launch = (launch_profile or os.getenv("PLAYWRIGHT_LAUNCH_PROFILE") or "default").strip().lower()
+    if resolved_launch not in LAUNCH_PROFILES:
+        raise ValueError("launch_profile must be one of: " + ", ".join(sorted(LAUNCH_PROFILES)))
+
+    resolved_network = (network_profile or env_network or "off").strip().lower()
+    if resolved_network not in NETWORK_PROFILES:
+        raise ValueError("network_profile must be one of: " + ", ".join(sorted(NETWORK_PROFILES)))
+
     cfg = OutlookConfig(
         email=email,
         password=password,
         browser_name=resolved_browser,
         headless=resolved_headless,
         timeout_ms=resolved_timeout,
+        bulk_select=resolved_bulk,
+        reload_mode=resolved_reload,
+        network_profile=resolved_network,
+        adaptive=resolved_adaptive,
+        warm_standby=resolved_standby,
+        delete_strategy=resolved_strategy,
+        launch_profile=resolved_launch,
     )
 
     log(
         "Config loaded: "
         f"email={_mask_email(cfg.email)} browser={cfg.browser_name} "
-        f"headless={cfg.headless} timeout_ms={cfg.timeout_ms}"
+        f"headless={cfg.headless} timeout_ms={cfg.timeout_ms} bulk_select={cfg.bulk_select} "
+        f"reload_mode={cfg.reload_mode} network_profile={cfg.network_profile} adaptive={cfg.adaptive} "
+        f"warm_standby={cfg.warm_standby} delete_strategy={cfg.delete_strategy} "
+        f"launch_profile={cfg.launch_profile}"
     )
     return cfg
 
@@ -176,39 +334,60 @@ def _robust_click(locator: Locator, *, timeout_ms: int, retries: int = 3) -> Non
             return
         except Exception as exc:
             last_err = exc
+            if attempt < retries - 1:
+                get_metrics().record_retry()
 
     if last_err:
         raise last_err
 
 
-def _fill_first_visible(page: Page, selectors: list[str], value: str, *, timeout_ms: int) -> None:
-    last_err: Exception | None = None
-    for sel in selectors:
-        loc = page.locator(sel).first
-        try:
-            loc.wait_for(state="visible", timeout=timeout_ms)
-            loc.fill(value, timeout=timeout_ms)
-            return
-        except Exception as exc:
-            last_err = exc
-    if last_err:
-        raise last_err
+def _ui_variant(page: Page) -> str:
+    # Outlook/login hosts differ per account type and serve different markup.
+    try:
+        return urlparse(page.url).hostname or "unknown"
+    except Exception:
+        return "unknown"
 
 
-def _click_first_visible(page: Page, selectors: list[str], *, timeout_ms: int) -> None:
-    last_err: Exception | None = None
-    for sel in selectors:
-        loc = page.locator(sel).first
+def _resolve_first_visible(page: Page, selectors: list[str], *, timeout_ms: int, action: str) -> Locator:
+    """Race every candidate as one combined locator instead of one full timeout each.
+
+    The winner is remembered per (action, UI variant) in the selector cache, so later
+    runs prefer it when several candidates are visible at once. `action` names the
+    step: different steps can share candidates (Next and Sign in are both #idSIButton9).
+    """
+    variant = _ui_variant(page)
+    cache = get_cache()
+    ordered = cache.order(action, variant, selectors)
+    locators = [page.locator(sel).first for sel in ordered]
+
+    combined = locators[0]
+    for loc in locators[1:]:
+        combined = combined.or_(loc)
+    combined.first.wait_for(state="visible", timeout=timeout_ms)
+
+    for sel, loc in zip(ordered, locators):
         try:
-            loc.wait_for(state="visible", timeout=timeout_ms)
-            loc.click(timeout=timeout_ms, no_wait_after=True)
-            return
-        except Exception as exc:
-            last_err = exc
-    if last_err:
-        raise last_err
+            if loc.is_visible():
+                cache.record(action, variant, sel)
+                return loc
+        except Exception:
+            continue
+    # Visible a moment ago but re-rendered since; let the caller's action wait on it.
+    return combined.first
+
+
+def _fill_first_visible(page: Page, selectors: list[str], value: str, *, timeout_ms: int, action: str) -> None:
+    loc = _resolve_first_visible(page, selectors, timeout_ms=timeout_ms, action=action)
+    loc.fill(value, timeout=timeout_ms)
 
 
+def _click_first_visible(page: Page, selectors: list[str], *, timeout_ms: int, action: str) -> None:
+    loc = _resolve_first_visible(page, selectors, timeout_ms=timeout_ms, action=action)
+    loc.click(timeout=timeout_ms, no_wait_after=True)
+
+
+@timed("login")
 def login(page: Page, email: str, password: str, *, timeout_ms: int) -> None:
     """Login to Microsoft/Outlook with common flow fallbacks."""
     log(f"Login: goto {OUTLOOK_MAIL_URL}")
@@ -244,6 +423,7 @@ def login(page: Page, email: str, password: str, *, timeout_ms: int) -> None:
         ],
         value=email,
         timeout_ms=timeout_ms,
+        action="login_email",
     )
     _click_first_visible(
         page,
@@ -253,6 +433,7 @@ def login(page: Page, email: str, password: str, *, timeout_ms: int) -> None:
             "input[type='submit']",
         ],
         timeout_ms=timeout_ms,
+        action="login_next",
     )
 
     log("Login: email submitted (Next)")
@@ -272,6 +453,7 @@ def login(page: Page, email: str, password: str, *, timeout_ms: int) -> None:
                 page,
                 selectors=["#idSIButton9", "button:has-text('Next')", "input[type='submit']"],
                 timeout_ms=min(timeout_ms, 8000),
+                action="login_next",
             )
         except Exception:
             pass
@@ -288,6 +470,7 @@ def login(page: Page, email: str, password: str, *, timeout_ms: int) -> None:
         ],
         value=password,
         timeout_ms=timeout_ms,
+        action="login_password",
     )
     _click_first_visible(
         page,
@@ -297,6 +480,7 @@ def login(page: Page, email: str, password: str, *, timeout_ms: int) -> None:
             "input[type='submit']",
         ],
         timeout_ms=timeout_ms,
+        action="login_signin",
     )
 
     log("Login: password submitted (Sign in)")
@@ -317,27 +501,24 @@ def login(page: Page, email: str, password: str, *, timeout_ms: int) -> None:
     log(f"Login: done (url={page.url})")
 
 
-def open_people(page: Page, *, timeout_ms: int) -> None:
-    log("UI: open People")
-    people_btn = page.locator("xpath=//button[@aria-label='People']").first
-    people_btn.wait_for(state="visible", timeout=timeout_ms)
-    try:
-        pressed = people_btn.get_attribute("aria-pressed")
-        if pressed and pressed.lower() == "true":
-            log("UI: People already selected")
-            return
-    except Exception:
-        pass
-
-    _robust_click(people_btn, timeout_ms=timeout_ms, retries=3)
+# People-pane locators shared with the async mirrors in outlook_async.
+PEOPLE_BUTTON_SELECTOR = "xpath=//button[@aria-label='People']"
+DELETE_FALLBACK_SELECTOR = "xpath=//span[normalize-space(.)='Delete']"
+# Contact list deletion confirm button can be a plain <button> with direct text.
+# User-provided working selector:
+#   //div[contains(@class,'Dialog')]//button[text()='Delete']
+# Use normalize-space to handle whitespace.
+CONFIRM_CONTACT_LIST_SELECTOR = "xpath=//div[contains(@class,'Dialog')]//button[normalize-space(.)='Delete']"
+# Default confirm (Deleted Bin): keep ONLY this selector/behavior.
+CONFIRM_DELETE_SELECTOR = (
+    "xpath=//div[contains(@class,'Dialog') or contains(@class,'ms-Dialog')]//button//span[normalize-space(.)='Delete']"
+)
 
 
-def open_contact_list(page: Page, list_name: str, *, timeout_ms: int) -> None:
+def contact_list_selectors(list_name: str) -> list[str]:
     # Outlook UI varies; prefer left navigation items (treeitem/button/link) to avoid
     # matching non-clickable headers in the main pane.
-    log(f"UI: open list '{list_name}'")
-
-    selectors = [
+    return [
         f"role=treeitem[name='{list_name}']",
         f"role=button[name='{list_name}']",
         f"role=link[name='{list_name}']",
@@ -348,11 +529,36 @@ def open_contact_list(page: Page, list_name: str, *, timeout_ms: int) -> None:
         f"xpath=//span[normalize-space(.)='{list_name}']",
     ]
 
-    _click_first_visible(page, selectors=selectors, timeout_ms=timeout_ms)
+
+@timed("open_people")
+def open_people(page: Page, *, timeout_ms: int) -> None:
+    log("UI: open People", level="DEBUG")
+    people_btn = page.locator(PEOPLE_BUTTON_SELECTOR).first
+    people_btn.wait_for(state="visible", timeout=timeout_ms)
+    try:
+        pressed = people_btn.get_attribute("aria-pressed")
+        if pressed and pressed.lower() == "true":
+            log("UI: People already selected", level="DEBUG")
+            return
+    except Exception:
+        pass
+
+    _robust_click(people_btn, timeout_ms=timeout_ms, retries=3)
+
+
+@timed("open_contact_list")
+def open_contact_list(page: Page, list_name: str, *, timeout_ms: int) -> None:
+    log(f"UI: open list '{list_name}'", level="DEBUG")
+    _click_first_visible(
+        page, selectors=contact_list_selectors(list_name), timeout_ms=timeout_ms, action=f"open_list:{list_name}"
+    )
 
 
-def click_delete_and_confirm(page: Page, *, timeout_ms: int, confirm_variant: str = "default") -> None:
-    log("UI: click Delete")
+@timed("delete_and_confirm")
+def click_delete_and_confirm(
+    page: Page, *, timeout_ms: int, confirm_variant: str = "default", retries: int = 6
+) -> None:
+    log("UI: click Delete", level="DEBUG")
 
     # Ensure something is selected; otherwise Outlook may show a dialog that can't proceed
     # or disable the Delete action.
@@ -365,40 +571,403 @@ def click_delete_and_confirm(page: Page, *, timeout_ms: int, confirm_variant: st
     # except Exception:
     #     pass
 
+    _click_delete(page, timeout_ms=timeout_ms, retries=retries)
+    _confirm_delete(page, timeout_ms=timeout_ms, confirm_variant=confirm_variant)
+
+
+def _click_delete(page: Page, *, timeout_ms: int, retries: int = 6) -> None:
+    """Click the toolbar Delete button (locator path)."""
     delete_button = page.get_by_role("button", name="Delete").first
-    delete_fallback = page.locator("xpath=//span[normalize-space(.)='Delete']").first
+    delete_fallback = page.locator(DELETE_FALLBACK_SELECTOR).first
 
-    try:
-        _robust_click(delete_button, timeout_ms=timeout_ms, retries=6)
-    except Exception:
-        _robust_click(delete_fallback, timeout_ms=timeout_ms, retries=6)
+    with span("delete_click"):
+        try:
+            _robust_click(delete_button, timeout_ms=timeout_ms, retries=retries)
+        except Exception:
+            _robust_click(delete_fallback, timeout_ms=timeout_ms, retries=retries)
 
-    # Contact list deletion confirm button can be a plain <button> with direct text.
-    # User-provided working selector:
-    #   //div[contains(@class,'Dialog')]//button[text()='Delete']
-    # Use normalize-space to handle whitespace.
+
+def _confirm_delete(page: Page, *, timeout_ms: int, confirm_variant: str = "default") -> None:
+    """Click the confirm button of the Delete dialog (locator path)."""
     if confirm_variant == "contact_list":
-        confirm_contact_list = page.locator(
-            "xpath=//div[contains(@class,'Dialog')]//button[normalize-space(.)='Delete']"
-        ).first
+        confirm_contact_list = page.locator(CONFIRM_CONTACT_LIST_SELECTOR).first
         try:
-            log("UI: confirm Delete (contact_list Dialog button[text()='Delete'])")
-            _robust_click(confirm_contact_list, timeout_ms=min(timeout_ms, 8000), retries=3)
-            log("UI: delete confirmed")
+            log("UI: confirm Delete (contact_list Dialog button[text()='Delete'])", level="DEBUG")
+            with span("confirm_click"):
+                _robust_click(confirm_contact_list, timeout_ms=min(timeout_ms, 8000), retries=3)
+            log("UI: delete confirmed", level="DEBUG")
             return
         except Exception:
             # Fall back to the default strategies.
             pass
 
-    # Default confirm (Deleted Bin): keep ONLY this selector/behavior.
-    confirm_span_exact = page.locator(
-        "xpath=//div[contains(@class,'Dialog') or contains(@class,'ms-Dialog')]//button//span[normalize-space(.)='Delete']"
-    ).first
+    confirm_span_exact = page.locator(CONFIRM_DELETE_SELECTOR).first
+
+    log("UI: confirm Delete (exact Dialog span xpath)", level="DEBUG")
+    with span("confirm_click"):
+        _robust_click(confirm_span_exact, timeout_ms=min(timeout_ms, 8000), retries=3)
+
+    log("UI: delete confirmed", level="DEBUG")
+
+
+# Rows of the People list pane (listbox variant first, then grid variant).
+LIST_ROW_SELECTOR = (
+    "div[role='main'] [role='listbox'] [role='option'], "
+    "div[role='main'] [role='grid'] [role='row']:has([role='gridcell'])"
+)
+
+
+def _count_selected(rows: Locator) -> int:
+    try:
+        return int(
+            rows.evaluate_all(
+                "els => els.filter(e => e.getAttribute('aria-selected') === 'true'"
+                " || e.querySelector(\"[role='checkbox'][aria-checked='true'], input[type='checkbox']:checked\")).length"
+            )
+        )
+    except Exception:
+        return 0
+
+
+_SELECTED_LABELS_JS = """
+els => els
+  .filter(e => e.getAttribute('aria-selected') === 'true'
+    || e.querySelector("[role='checkbox'][aria-checked='true'], input[type='checkbox']:checked"))
+  .map(e => {
+    if (e.getAttribute('aria-label')) return e.getAttribute('aria-label').trim();
+    const parts = Array.from(e.children)
+      .filter(c => c.getAttribute('role') !== 'checkbox' && !c.querySelector("[role='checkbox'], input"))
+      .map(c => (c.innerText || '').trim())
+      .filter(Boolean);
+    const text = parts.length ? parts[0] : (e.innerText || '');
+    return text.split('\\n').map(l => l.trim()).find(l => /\\p{L}/u.test(l)) || '';
+  })
+"""
+
+
+def selected_row_labels(page: Page) -> list[str]:
+    """Visible labels of the selected rows, in one round trip; [] if they can't be read."""
+    try:
+        return page.locator(LIST_ROW_SELECTOR).evaluate_all(_SELECTED_LABELS_JS)
+    except Exception:
+        return []
+
+
+def _list_set_size(rows: Locator) -> int | None:
+    """Real item count of a virtualized list (aria-setsize), or None when rows don't expose it."""
+    try:
+        sizes = rows.evaluate_all(
+            "els => els.map(e => parseInt(e.getAttribute('aria-setsize') || '', 10)).filter(n => n > 0)"
+        )
+    except Exception:
+        return None
+    return max(sizes) if sizes else None
+
+
+def select_many(page: Page, *, timeout_ms: int, max_rows: int | None = None) -> int:
+    """Select many rows in the list pane at once; return how many are actually selected.
+
+    Strategies in order: select-all checkbox, per-row checkboxes, shift-click range.
+    Select-all covers the whole (virtualized) list, not only the rendered rows, so it
+    is used only when `max_rows` allows the list's real size (aria-setsize). The count
+    is always the rows seen checked; aria-setsize is only logged as an estimate.
+    """
+    rows = page.locator(LIST_ROW_SELECTOR)
+    try:
+        rows.first.wait_for(state="visible", timeout=min(timeout_ms, 8000))
+    except PlaywrightTimeoutError:
+        log("UI: no rows visible to select")
+        return 0
+
+    row_count = rows.count()
+    set_size = _list_set_size(rows)
+    list_size = max(set_size or 0, row_count)
+    if max_rows is not None and max_rows <= 0:
+        return 0
+
+    if max_rows is None or max_rows >= list_size:
+        select_all = page.get_by_role("checkbox", name=re.compile(r"select all", re.I)).first
+        try:
+            if select_all.is_visible(timeout=1500):
+                log("UI: select all rows (checkbox)", level="DEBUG")
+                if not select_all.is_checked():
+                    _robust_click(select_all, timeout_ms=min(timeout_ms, 3000), retries=2)
+                selected = _count_selected(rows)
+                if selected > 0:
+                    # Only the rendered rows can be counted, though the selection may span the whole list.
+                    if set_size and set_size > selected:
+                        log(f"UI: select all checked {selected} rows (list reports ~{set_size})", level="DEBUG")
+                    return selected
+        except Exception:
+            pass
+
+    limit = row_count if max_rows is None else min(row_count, max_rows)
+    first_checkbox = rows.first.get_by_role("checkbox")
+    try:
+        has_checkboxes = first_checkbox.count() > 0
+    except Exception:
+        has_checkboxes = False
+
+    if has_checkboxes:
+        log(f"UI: select {limit} rows (row checkboxes)", level="DEBUG")
+        picked = 0
+        for idx in range(row_count):
+            if picked >= limit:
+                break
+            checkbox = rows.nth(idx).get_by_role("checkbox").first
+            try:
+                # A click on an already checked row would clear it again.
+                if not checkbox.is_checked():
+                    # Row checkboxes are often only rendered visible on hover.
+                    checkbox.click(timeout=min(timeout_ms, 3000), force=True)
+                picked += 1
+            except Exception:
+                break
+    else:
+        log(f"UI: select {limit} rows (shift-click range)", level="DEBUG")
+        try:
+            rows.first.click(timeout=min(timeout_ms, 3000))
+            if limit > 1:
+                rows.nth(limit - 1).click(timeout=min(timeout_ms, 3000), modifiers=["Shift"])
+        except Exception:
+            pass
+
+    selected = _count_selected(rows)
+    log(f"UI: selected {selected}/{list_size} rows", level="DEBUG")
+    return selected
+
+
+CONFIRM_DIALOG_SELECTOR = "div[role='dialog'], div[role='alertdialog'], div.ms-Dialog"
+
+# Labels of a focused dialog button that Enter may safely press.
+CONFIRM_KEY_PATTERN = re.compile(r"^\s*(delete|ok|yes)\s*$", re.I)
+
+_FOCUS_SELECTED_ROW_JS = """
+rows => {
+  const row = rows.find(r => r.getAttribute('aria-selected') === 'true') || rows[0];
+  if (!row) return false;
+  row.focus();
+  if (document.activeElement === row || row.contains(document.activeElement)) return true;
+  const list = row.closest("[role='listbox'], [role='grid']");
+  if (!list) return false;
+  list.focus();
+  return document.activeElement === list;
+}
+"""
+
+
+@timed("delete_and_confirm")
+def keyboard_delete_and_confirm(
+    page: Page, *, timeout_ms: int, confirm_variant: str = "default", retries: int = 6
+) -> None:
+    """Delete the selected row with Outlook's shortcuts: Delete (or Ctrl+D), then Enter.
+
+    No button lookups on the happy path; the dialog is only inspected to make sure
+    Enter lands on its Delete button. Any mismatch falls back to the locator path.
+    """
+    log("UI: press Delete", level="DEBUG")
+    dialog = page.locator(CONFIRM_DIALOG_SELECTOR).first
+    short_ms = min(timeout_ms, 3000)
+
+    try:
+        opened = bool(page.locator(LIST_ROW_SELECTOR).evaluate_all(_FOCUS_SELECTED_ROW_JS))
+    except Exception:
+        opened = False
+    if opened:
+        opened = False
+        with span("delete_key"):
+            for key in ("Delete", "Control+d"):
+                page.keyboard.press(key)
+                try:
+                    dialog.wait_for(state="visible", timeout=short_ms)
+                    opened = True
+                    break
+                except PlaywrightTimeoutError:
+                    continue
+    if not opened:
+        log("UI: keyboard Delete did not open the dialog; click path", level="WARNING")
+        get_metrics().record_retry()
+        _click_delete(page, timeout_ms=timeout_ms, retries=retries)
+        _confirm_delete(page, timeout_ms=timeout_ms, confirm_variant=confirm_variant)
+        return
+
+    with span("confirm_key"):
+        try:
+            focused = page.evaluate("() => ((document.activeElement && document.activeElement.innerText) || '').trim()")
+        except Exception:
+            focused = ""
+        if CONFIRM_KEY_PATTERN.match(focused or ""):
+            page.keyboard.press("Enter")
+            try:
+                dialog.wait_for(state="hidden", timeout=short_ms)
+                log("UI: delete confirmed (keyboard)", level="DEBUG")
+                return
+            except PlaywrightTimeoutError:
+                pass
+            # Enter went through but the dialog closed late: clicking a confirm button
+            # that is gone would only time out and count a confirmed delete as a failure.
+            try:
+                still_open = dialog.is_visible()
+            except Exception:
+                still_open = True
+            if not still_open:
+                log("UI: delete confirmed (keyboard, dialog closed late)", level="DEBUG")
+                return
+            log("UI: dialog still open after Enter; click path for confirm", level="WARNING")
+        else:
+            log(f"UI: dialog focus is on '{focused}', not Delete; click path for confirm", level="WARNING")
+
+    get_metrics().record_retry()
+    _confirm_delete(page, timeout_ms=timeout_ms, confirm_variant=confirm_variant)
+
 
-    log("UI: confirm Delete (exact Dialog span xpath)")
-    _robust_click(confirm_span_exact, timeout_ms=min(timeout_ms, 8000), retries=3)
+# Empty-list placeholders seen in the People pane across UI variants. The text variant must
+# match an element's whole text, so a row like "Juno Contacts" never counts; callers also
+# check for rows first, since a placeholder can't coexist with them.
+EMPTY_STATE_SELECTOR = (
+    "div[role='main'] .empty-state, "
+    "div[role='main'] [data-testid*='empty' i], "
+    "div[role='main'] :text-matches("
+    "'^\\s*(nothing to show|no contacts|no contact lists|this folder is empty|no items)\\s*$', 'i')"
+)
 
-    log("UI: delete confirmed")
+
+def _delete_button_disabled(page: Page) -> bool | None:
+    """Instant check of the toolbar Delete button: True/False, or None if not shown."""
+    button = page.get_by_role("button", name="Delete").first
+    try:
+        if not button.is_visible():
+            return None
+        return button.is_disabled() or (button.get_attribute("aria-disabled") or "").lower() == "true"
+    except Exception:
+        return None
+
+
+def list_looks_empty(page: Page) -> bool:
+    """Non-waiting emptiness check, cheap enough to run before every delete."""
+    if count_rows(page) > 0:
+        return False
+    try:
+        if page.locator(EMPTY_STATE_SELECTOR).first.is_visible():
+            return True
+    except Exception:
+        pass
+    return _delete_button_disabled(page) is True
+
+
+def probe_list_state(page: Page, *, timeout_ms: int = 3000) -> str:
+    """Classify the open list within `timeout_ms`: 'ready', 'empty' or 'broken'.
+
+    Rows win over placeholders: 'empty' means no rows plus an empty-state
+    placeholder or a disabled Delete button; 'broken' means the list pane itself
+    did not render.
+    """
+    rows = page.locator(LIST_ROW_SELECTOR)
+    empty = page.locator(EMPTY_STATE_SELECTOR)
+    try:
+        rows.first.or_(empty.first).wait_for(state="visible", timeout=timeout_ms)
+    except Exception:
+        pass
+
+    if count_rows(page) > 0:
+        return "ready"
+    try:
+        if empty.first.is_visible():
+            return "empty"
+    except Exception:
+        pass
+
+    disabled = _delete_button_disabled(page)
+    if disabled is True:
+        return "empty"
+    if disabled is False:
+        # Rows use markup we can't count, but Delete is actionable.
+        return "ready"
+    return "broken"
+
+
+def count_rows(page: Page) -> int:
+    try:
+        return page.locator(LIST_ROW_SELECTOR).count()
+    except Exception:
+        return 0
+
+
+_ROW_KEY_JS = """
+r => r.getAttribute('data-item-id') || r.getAttribute('data-convid') || r.getAttribute('data-key')
+  || r.id || (r.getAttribute('aria-label') || '').trim()
+  || ((r.innerText || '').split('\\n').map(l => l.trim()).find(Boolean) || '')
+"""
+
+_PENDING_ROWS_JS = """
+els => {
+  const key = %s;
+  const picked = els.filter(e => e.getAttribute('aria-selected') === 'true'
+    || e.querySelector("[role='checkbox'][aria-checked='true'], input[type='checkbox']:checked"));
+  const targets = {};
+  for (const r of (picked.length ? picked : els.slice(0, 1))) {
+    const k = key(r);
+    if (!k) continue;
+    targets[k] = els.filter(e => key(e) === k).length;
+  }
+  const sizes = els.map(e => parseInt(e.getAttribute('aria-setsize') || '', 10)).filter(n => n > 0);
+  return {targets, setsize: sizes.length ? sizes[0] : null};
+}
+""" % _ROW_KEY_JS.strip()
+
+_LIST_UPDATED_JS = """
+([sel, snap]) => {
+  const key = %s;
+  const els = Array.from(document.querySelectorAll(sel));
+  const sizes = els.map(e => parseInt(e.getAttribute('aria-setsize') || '', 10)).filter(n => n > 0);
+  if (snap.setsize && sizes.length && sizes[0] < snap.setsize) return true;
+  return Object.entries(snap.targets).every(([k, n]) => els.filter(e => key(e) === k).length < n);
+}
+""" % _ROW_KEY_JS.strip()
+
+
+def pending_rows_snapshot(page: Page) -> dict | None:
+    """Identity of the rows the next Delete removes (selected rows, else the first one).
+
+    The list pane is virtualized, so its rendered row count says nothing about a
+    delete; instead each target row is keyed by its item id (or aria-label/text) and
+    the list's aria-setsize is noted. None when no row can be identified.
+    """
+    try:
+        snap = page.locator(LIST_ROW_SELECTOR).evaluate_all(_PENDING_ROWS_JS)
+    except Exception:
+        return None
+    return snap if snap and snap.get("targets") else None
+
+
+def wait_for_list_update(page: Page, *, snapshot: dict, timeout_ms: int) -> bool:
+    """Wait until the list pane reflects a delete instead of reloading the page.
+
+    True once the confirm dialog is gone and either every row in `snapshot`
+    (`pending_rows_snapshot`) left the pane or aria-setsize dropped; False means
+    the pane looks stale and needs a reload.
+    """
+    try:
+        page.locator(CONFIRM_DIALOG_SELECTOR).first.wait_for(state="hidden", timeout=timeout_ms)
+        # Polls on animation frames inside the page, so it resolves as soon as the row detaches.
+        page.wait_for_function(_LIST_UPDATED_JS, arg=[LIST_ROW_SELECTOR, snapshot], timeout=timeout_ms)
+        return True
+    except Exception:
+        return False
+
+
+def reload_page(page: Page) -> None:
+    try:
+        with span("reload"):
+            page.reload(wait_until="domcontentloaded")
+    except Exception:
+        pass
+
+
+def reload_list(page: Page, list_name: str, *, timeout_ms: int) -> None:
+    reload_page(page)
+    open_people(page, timeout_ms=timeout_ms)
+    open_contact_list(page, list_name, timeout_ms=timeout_ms)
 
 
 def delete_flow(page: Page, *, list_name: str, timeout_ms: int, max_attempts: int = 10) -> None:
@@ -416,12 +985,9 @@ def delete_flow(page: Page, *, list_name: str, timeout_ms: int, max_attempts: in
             return
         except Exception as exc:
             last_err = exc
-            log(f"DeleteFlow: failed attempt {attempt} ({type(exc).__name__}: {exc})")
-            try:
-                log("DeleteFlow: reload")
-                page.reload(wait_until="domcontentloaded")
-            except Exception:
-                pass
+            log(f"DeleteFlow: failed attempt {attempt} ({type(exc).__name__}: {exc})", level="WARNING")
+            log("DeleteFlow: reload")
+            reload_page(page)
             try:
                 open_people(page, timeout_ms=timeout_ms)
                 open_contact_list(page, list_name, timeout_ms=timeout_ms)
@@ -431,6 +997,93 @@ def delete_flow(page: Page, *, list_name: str, timeout_ms: int, max_attempts: in
     raise RuntimeError(f"Delete flow failed after {max_attempts} attempts") from last_err
 
 
+# Folder-level "empty" actions (toolbar button or folder context menu) and their confirm buttons.
+EMPTY_FOLDER_PATTERN = re.compile(r"^\s*(empty folder|empty deleted items|delete all)\s*$", re.I)
+EMPTY_CONFIRM_PATTERN = re.compile(r"^\s*(delete|delete all|empty|empty folder|ok|yes)\s*$", re.I)
+
+
+def _find_empty_folder_action(page: Page, list_name: str, *, timeout_ms: int) -> Locator | None:
+    """The visible 'Empty folder'-style control for the open folder, or None."""
+    selectors = [
+        "role=button[name=/^\\s*(empty folder|empty deleted items|delete all)\\s*$/i]",
+        "role=menuitem[name=/^\\s*(empty folder|empty deleted items|delete all)\\s*$/i]",
+        "xpath=//button[.//span[normalize-space(.)='Empty folder']]",
+    ]
+    try:
+        return _resolve_first_visible(
+            page, selectors, timeout_ms=min(timeout_ms, 3000), action=f"empty_folder:{list_name}"
+        )
+    except Exception:
+        pass
+
+    # Some variants only offer it from the folder's context menu in the left pane.
+    try:
+        page.get_by_role("treeitem", name=list_name).first.click(button="right", timeout=min(timeout_ms, 3000))
+        item = page.get_by_role("menuitem", name=EMPTY_FOLDER_PATTERN).first
+        item.wait_for(state="visible", timeout=min(timeout_ms, 3000))
+        return item
+    except Exception:
+        try:
+            page.keyboard.press("Escape")
+        except Exception:
+            pass
+    return None
+
+
+@timed("empty_folder")
+def empty_folder(page: Page, list_name: str, *, timeout_ms: int, known_count: int | None = None) -> int | None:
+    """Remove everything in `list_name` with the folder-level empty action.
+
+    Returns how many items went away (checked by re-probing the folder), or None when
+    the action isn't offered here and the caller should fall back to `delete_many`.
+    `known_count` (e.g. from the inventory scan) saves counting the folder again.
+    """
+    open_people(page, timeout_ms=timeout_ms)
+    open_contact_list(page, list_name, timeout_ms=timeout_ms)
+    if probe_list_state(page, timeout_ms=min(timeout_ms, 5000)) == "empty":
+        log(f"EmptyFolder: '{list_name}' already empty")
+        return 0
+
+    from inventory import count_list_items
+
+    before = known_count
+    if before is None:
+        try:
+            before, _complete, _source = count_list_items(page, timeout_ms=timeout_ms, max_seconds=20)
+        except Exception:
+            before = count_rows(page)
+
+    action = _find_empty_folder_action(page, list_name, timeout_ms=timeout_ms)
+    if action is None:
+        log(f"EmptyFolder: no folder-level empty action for '{list_name}'; falling back to per-item delete")
+        return None
+
+    log(f"EmptyFolder: empty '{list_name}' (~{before} items)")
+    with span("empty_folder_click"):
+        _robust_click(action, timeout_ms=min(timeout_ms, 8000), retries=3)
+    confirm = page.locator(CONFIRM_DIALOG_SELECTOR).get_by_role("button", name=EMPTY_CONFIRM_PATTERN).first
+    with span("confirm_click"):
+        _robust_click(confirm, timeout_ms=min(timeout_ms, 8000), retries=3)
+
+    # The server empties large folders asynchronously; wait for the pane, then re-probe from a fresh load.
+    try:
+        page.locator(EMPTY_STATE_SELECTOR).first.wait_for(state="visible", timeout=max(timeout_ms, 60000))
+    except Exception:
+        pass
+    reload_list(page, list_name, timeout_ms=timeout_ms)
+    if probe_list_state(page, timeout_ms=min(timeout_ms, 5000)) == "empty":
+        log(f"EmptyFolder: '{list_name}' is empty")
+        return before
+
+    try:
+        remaining, _complete, _source = count_list_items(page, timeout_ms=timeout_ms, max_seconds=20)
+    except Exception:
+        remaining = count_rows(page)
+    removed = max(0, before - remaining)
+    log(f"EmptyFolder: '{list_name}' still has {remaining} items after empty (removed ~{removed})")
+    return removed
+
+
 def delete_many(
     page: Page,
     *,
@@ -441,23 +1094,61 @@ def delete_many(
     max_failures: int = 100,
     confirm_variant: str = "default",
     on_deleted: callable | None = None,
+    bulk: bool = False,
+    reload_mode: str = "batch",
+    adaptive: bool = False,
+    on_item: callable | None = None,
+    delete_strategy: str = "click",
 ) -> int:
     """Delete repeatedly.
 
     Behavior: delete `batch_size` times, then reload and continue.
+    With `bulk`, each cycle selects many rows (`select_many`) and confirms one Delete
+    for the whole selection; the count comes from the rows actually selected.
+    With `reload_mode="event"`, each delete waits for the deleted rows to leave the list
+    pane (`wait_for_list_update`) and the page is reloaded only when the pane looks stale;
+    lists whose rows can't be identified keep the `batch_size` cadence.
+    With `adaptive`, an `AdaptiveController` replaces the fixed reload interval, step
+    timeout and Delete retries, starting from `batch_size`/`timeout_ms`.
+    `on_item` receives the label of each deleted row when it can be read (checkpoints).
+    `delete_strategy="keyboard"` deletes with Outlook's shortcuts
+    (`keyboard_delete_and_confirm`) instead of clicking the buttons.
     Stops when:
     - `max_total` reached (if provided), OR
-    - we fail `max_failures` times in a row (often means nothing left to delete).
-    Returns the number of successful deletes.
+    - the list is empty (`probe_list_state` / `list_looks_empty`).
+    Returns the number of successful deletes; `max_failures` failures in a row on a
+    list that isn't empty raise RuntimeError (the caller restarts the browser).
     """
     if batch_size <= 0:
         raise ValueError("batch_size must be >= 1")
 
-    log(f"DeleteMany: start list='{list_name}' batch_size={batch_size} max_total={max_total}")
+    if reload_mode not in {"batch", "event"}:
+        raise ValueError("reload_mode must be one of: batch, event")
+
+    if delete_strategy not in DELETE_STRATEGIES:
+        raise ValueError("delete_strategy must be one of: " + ", ".join(sorted(DELETE_STRATEGIES)))
+    delete_and_confirm = keyboard_delete_and_confirm if delete_strategy == "keyboard" else click_delete_and_confirm
+
+    log(
+        f"DeleteMany: start list='{list_name}' batch_size={batch_size} max_total={max_total} "
+        f"bulk={bulk} reload_mode={reload_mode} adaptive={adaptive} delete_strategy={delete_strategy}"
+    )
     open_people(page, timeout_ms=timeout_ms)
     open_contact_list(page, list_name, timeout_ms=timeout_ms)
 
+    state = probe_list_state(page, timeout_ms=min(timeout_ms, 5000))
+    if state == "empty":
+        log(f"DeleteMany: list '{list_name}' is empty; nothing to delete")
+        return 0
+
+    controller = None
+    if adaptive:
+        from adaptive import AdaptiveController
+
+        controller = AdaptiveController(batch_size=batch_size, timeout_ms=timeout_ms)
+
     total_deleted = 0
+    deleted_since_reload = 0
     consecutive_failures = 0
 
     while True:
@@ -465,45 +1156,95 @@ def delete_many(
             log(f"DeleteMany: reached max_total={max_total}")
             return total_deleted
 
+        stale = False
+        step_timeout_ms = controller.timeout_ms if controller else timeout_ms
+        delete_retries = controller.retries if controller else 6
+        started = time.perf_counter()
         try:
-            click_delete_and_confirm(page, timeout_ms=timeout_ms, confirm_variant=confirm_variant)
-            total_deleted += 1
+            deleted_now = 1
+            if bulk:
+                remaining = None if max_total is None else max_total - total_deleted
+                deleted_now = select_many(page, timeout_ms=step_timeout_ms, max_rows=remaining)
+                if deleted_now <= 0:
+                    raise RuntimeError("DeleteMany: nothing selected")
+            labels = selected_row_labels(page) if on_item is not None else []
+            snapshot = pending_rows_snapshot(page) if reload_mode == "event" else None
+            delete_and_confirm(
+                page, timeout_ms=step_timeout_ms, confirm_variant=confirm_variant, retries=delete_retries
+            )
+            if controller:
+                controller.record(True, time.perf_counter() - started)
+            total_deleted += deleted_now
+            if snapshot is not None:
+                stale = not wait_for_list_update(page, snapshot=snapshot, timeout_ms=min(timeout_ms, 10000))
+            else:
+                deleted_since_reload += deleted_now
             consecutive_failures = 0
-            log(f"DeleteMany: deleted {total_deleted}")
+            log(f"DeleteMany: deleted {total_deleted}", level="DEBUG")
             if on_deleted is not None:
-                try:
-                    on_deleted()
-                except Exception:
-                    # Never let progress hook break deletion.
-                    pass
+                for _ in range(deleted_now):
+                    try:
+                        on_deleted()
+                    except Exception:
+                        # Never let progress hook break deletion.
+                        pass
+            if on_item is not None:
+                for label in labels[:deleted_now]:
+                    try:
+                        on_item(label)
+                    except Exception:
+                        pass
         except Exception as exc:
             consecutive_failures += 1
-            log(f"DeleteMany: failure {consecutive_failures}/{max_failures} ({type(exc).__name__}: {exc})")
+            if controller:
+                controller.record(False)
+            log(
+                f"DeleteMany: failure {consecutive_failures}/{max_failures} ({type(exc).__name__}: {exc})",
+                level="WARNING",
+            )
+            dump_ring("delete failure")
             # Try to recover UI state.
-            try:
-                page.reload(wait_until="domcontentloaded")
-            except Exception:
-                pass
+            reload_page(page)
             try:
                 open_people(page, timeout_ms=timeout_ms)
                 open_contact_list(page, list_name, timeout_ms=timeout_ms)
             except Exception:
                 pass
 
+            # Tell "nothing left" apart from "UI broken" before burning more retries.
+            state = probe_list_state(page, timeout_ms=min(timeout_ms, 5000))
+            if state == "empty":
+                log(f"DeleteMany: list is empty after {total_deleted} deletes; stopping")
+                return total_deleted
+
             if consecutive_failures >= max_failures:
-                # If we've never deleted anything, likely nothing selectable/left -> stop gracefully.
-                if total_deleted == 0:
-                    log("DeleteMany: stopping (too many failures; likely nothing left)")
+                if state == "broken" and total_deleted == 0:
+                    # Nothing ever worked and the list can't even be read: a restart would
+                    # only repeat this. 0 stops the caller without marking the list done.
+                    log(
+                        f"DeleteMany: {max_failures} failures, no deletes and the list did not render; stopping",
+                        level="WARNING",
+                    )
                     return 0
-                # Otherwise, signal the caller to restart the browser/login.
-                raise RuntimeError("DeleteMany: too many consecutive failures; restart browser") from exc
+                # The list is not empty (that returned above), so 0 here would read as "done";
+                # signal the caller to restart the browser/login instead.
+                raise RuntimeError(
+                    f"DeleteMany: too many consecutive failures after {total_deleted} deletes "
+                    f"(list state={state}); restart browser"
+                ) from exc
+
+        if consecutive_failures == 0 and list_looks_empty(page):
+            log(f"DeleteMany: list is empty after {total_deleted} deletes; stopping")
+            return total_deleted
+
+        if stale:
+            log("DeleteMany: list pane did not update; reload", level="WARNING")
+            reload_list(page, list_name, timeout_ms=timeout_ms)
+            continue
 
         # After each batch, reload to refresh the list UI.
-        if total_deleted > 0 and (total_deleted % batch_size == 0):
-            log(f"DeleteMany: batch completed ({batch_size}); reload")
-            try:
-                page.reload(wait_until="domcontentloaded")
-            except Exception:
-                pass
-            open_people(page, timeout_ms=timeout_ms)
-            open_contact_list(page, list_name, timeout_ms=timeout_ms)
+        reload_every = controller.reload_interval if controller else batch_size
+        if deleted_since_reload >= reload_every:
+            deleted_since_reload = 0
+            log(f"DeleteMany: batch completed ({reload_every}); reload", level="DEBUG")
+            reload_list(page, list_name, timeout_ms=timeout_ms)
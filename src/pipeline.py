@@ -0,0 +1,362 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+from dataclasses import dataclass
+
+from dotenv import load_dotenv
+from playwright.sync_api import sync_playwright
+
+from browser_pool import StandbyPool
+from checkpoint import RunCheckpoint, open_checkpoint
+from graph_api import run_graph_delete
+from inventory import ProgressReporter, start_progress
+from launch_profile import launch_options
+from metrics import get_metrics, span
+from outlook_common import (
+    _env_flag,
+    append_excel_summary,
+    compact_excel_summary,
+    delete_many,
+    empty_folder,
+    flush_excel_summary,
+    load_config,
+    log,
+    probe_list_state,
+)
+from run_log import dump_ring
+from session_api import api_delete
+from session_store import open_session
+
+
+@dataclass(frozen=True)
+class Stage:
+    key: str
+    list_name: str
+    confirm_variant: str
+    batch_size: int
+    # Try the folder-level "Empty folder" action before the per-item loop.
+    empty_folder: bool = False
+
+
+# Same per-list settings as delete_outlook_contacts.py and deleted_bin.py, in drain order:
+# deleting contact lists fills the Deleted bin, so it goes second.
+STAGES = (
+    Stage("contacts", "Your contact lists", "contact_list", 5),
+    Stage("deleted", "Deleted", "default", 1000, empty_folder=True),
+)
+SCRIPT_NAME = "pipeline"
+
+
+def _select_stages(keys: tuple[str, ...]) -> list[Stage]:
+    unknown = set(keys) - {s.key for s in STAGES}
+    if unknown:
+        raise ValueError("unknown stage(s): " + ", ".join(sorted(unknown)))
+    return [s for s in STAGES if s.key in keys]
+
+
+def _run_overlapped(cfg, stages: list[Stage]) -> dict[str, int]:
+    """Every stage on its own tab of one async context (see outlook_async.run_pages)."""
+    from outlook_async import PageTask, run_pages
+
+    tasks = [PageTask(s.list_name, confirm_variant=s.confirm_variant, batch_size=s.batch_size) for s in stages]
+    progress = asyncio.run(run_pages(cfg, tasks, concurrency=len(tasks), script_name=SCRIPT_NAME))
+    totals = {s.key: progress.deleted.get(s.list_name, 0) for s in stages}
+
+    # The Deleted tab can run dry while contacts are still being moved into it.
+    if len(stages) > 1 and stages[-1].key == "deleted" and sum(totals.values()) > totals["deleted"]:
+        log("Pipeline: final Deleted sweep")
+        last = stages[-1]
+        sweep = asyncio.run(
+            run_pages(
+                cfg,
+                [PageTask(last.list_name, confirm_variant=last.confirm_variant, batch_size=last.batch_size)],
+                concurrency=1,
+                script_name=SCRIPT_NAME,
+            )
+        )
+        totals["deleted"] += sweep.deleted.get(last.list_name, 0)
+    return totals
+
+
+def run(
+    *,
+    headless: bool = False,
+    browser_name: str | None = None,
+    timeout_ms: int | None = None,
+    bulk: bool | None = None,
+    stages: tuple[str, ...] = ("contacts", "deleted"),
+    overlap: bool = False,
+    fresh: bool = False,
+    engine: str | None = None,
+) -> dict[str, int]:
+    """Drain contact lists and then the Deleted bin with one browser and one login.
+
+    Returns deletes per stage key. With `overlap`, the stages run side by side on
+    separate tabs of the same session instead of one after the other. Sequential runs
+    checkpoint each stage, so a rerun the same day resumes counters and skips finished
+    stages (`fresh` ignores today's checkpoint). `engine="session"` first gives each stage
+    one pass over the signed-in session's API (see session_api) before the UI loop;
+    `engine="graph"` (also read from OUTLOOK_DELETE_ENGINE) runs each stage through Graph.
+    """
+    load_dotenv()
+    selected = _select_stages(stages)
+    resolved_engine = (engine or os.getenv("OUTLOOK_DELETE_ENGINE") or "ui").strip().lower()
+    log(
+        f"Run: start pipeline stages={','.join(s.key for s in selected)} overlap={overlap} engine={resolved_engine}"
+    )
+
+    if resolved_engine == "graph":
+        # Same Graph runs the per-script entry points do, one per stage; no browser involved.
+        if overlap:
+            log("Pipeline: --overlap has no effect with the graph engine")
+        totals = {
+            s.key: run_graph_delete(script_name=SCRIPT_NAME, list_name=s.list_name, deleted_folder=s.key == "deleted")
+            for s in selected
+        }
+        compact_excel_summary()
+        get_metrics().dump()
+        log(f"Run: finished {' '.join(f'{k}={v}' for k, v in totals.items())} total={sum(totals.values())}")
+        return totals
+
+    if overlap and resolved_engine == "session":
+        raise ValueError("--overlap runs the UI engine only; drop --overlap to use the session engine")
+
+    cfg = load_config(browser_name=browser_name, headless=headless, timeout_ms=timeout_ms, bulk_select=bulk)
+
+    if overlap:
+        log("Pipeline: overlapped tabs do not checkpoint; a rerun starts these stages from zero")
+        try:
+            totals = _run_overlapped(cfg, selected)
+        except KeyboardInterrupt:
+            log("Run: interrupted by user")
+            totals = {}
+        compact_excel_summary()
+        get_metrics().dump()
+        log(f"Run: finished {' '.join(f'{k}={v}' for k, v in totals.items())}")
+        return totals
+
+    store = open_checkpoint()
+    checkpoints = {s.key: RunCheckpoint(store, cfg.email, SCRIPT_NAME, s.list_name) for s in selected}
+    if fresh and store is not None:
+        store.reset(cfg.email, SCRIPT_NAME)
+    resumed = {key: cp.load() for key, cp in checkpoints.items()}
+    totals = {s.key: resumed[s.key].total_deleted for s in selected}
+    flushed = {s.key: resumed[s.key].excel_total for s in selected}
+    # Rows known to be on disk; checkpoints never claim more than this.
+    saved = dict(flushed)
+    progress: dict[str, ProgressReporter] = {}
+    emptied_tried: set[str] = set() if _env_flag("OUTLOOK_EMPTY_FOLDER") is not False else {s.key for s in selected}
+    api_tried: set[str] = set() if resolved_engine == "session" else {s.key for s in selected}
+
+    def flush_excel_partial(stage: Stage) -> None:
+        if totals[stage.key] > flushed[stage.key]:
+            append_excel_summary(
+                script_name=SCRIPT_NAME,
+                list_name=stage.list_name,
+                deleted_this_session=(totals[stage.key] - flushed[stage.key]),
+                total_deleted=totals[stage.key],
+                browser_name=cfg.browser_name,
+                headless=cfg.headless,
+                email=cfg.email,
+            )
+            flushed[stage.key] = totals[stage.key]
+            if flush_excel_summary():
+                saved[stage.key] = flushed[stage.key]
+                checkpoints[stage.key].save(total_deleted=totals[stage.key], excel_total=saved[stage.key])
+
+    stage_idx = 0
+    while stage_idx < len(selected) and resumed[selected[stage_idx].key].done:
+        log(f"Pipeline: stage {selected[stage_idx].key} already finished today (checkpoint); skipping")
+        stage_idx += 1
+
+    with sync_playwright() as p:
+        browser_restarts = 0
+        max_browser_restarts = 1000
+        pool = StandbyPool(p, cfg) if cfg.warm_standby else None
+
+        while stage_idx < len(selected) and browser_restarts <= max_browser_restarts:
+            browser = None
+            context = None
+            stage = selected[stage_idx]
+            try:
+                log(f"Run: launch browser={cfg.browser_name} headless={cfg.headless} restart={browser_restarts}")
+                if pool is not None:
+                    with span("session_open"):
+                        browser, context, page = pool.acquire()
+                else:
+                    browser_type = getattr(p, cfg.browser_name)
+                    with span("browser_launch"):
+                        browser = browser_type.launch(**launch_options(cfg))
+
+                    with span("session_open"):
+                        context, page = open_session(browser, cfg)
+
+                # Every remaining stage reuses this page; only a failure relaunches.
+                while stage_idx < len(selected):
+                    stage = selected[stage_idx]
+                    if resumed[stage.key].done:
+                        log(f"Pipeline: stage {stage.key} already finished today (checkpoint); skipping")
+                        stage_idx += 1
+                        continue
+                    if stage.key not in progress:
+                        progress[stage.key] = start_progress(
+                            page, email=cfg.email, list_name=stage.list_name, timeout_ms=cfg.timeout_ms
+                        )
+
+                    if stage.empty_folder and stage.key not in emptied_tried:
+                        emptied_tried.add(stage.key)
+                        emptied = empty_folder(
+                            page, stage.list_name, timeout_ms=cfg.timeout_ms, known_count=progress[stage.key].total
+                        )
+                        if emptied:
+                            totals[stage.key] += emptied
+                            progress[stage.key](emptied)
+                            flush_excel_partial(stage)
+
+                    def on_deleted(stage: Stage = stage) -> None:
+                        totals[stage.key] += 1
+                        progress[stage.key]()
+                        checkpoints[stage.key].save(total_deleted=totals[stage.key], excel_total=saved[stage.key])
+                        if totals[stage.key] - flushed[stage.key] >= 5:
+                            flush_excel_partial(stage)
+
+                    if stage.key not in api_tried:
+                        api_tried.add(stage.key)
+                        api_deleted = api_delete(
+                            page,
+                            stage.list_name,
+                            timeout_ms=cfg.timeout_ms,
+                            on_deleted=on_deleted,
+                            on_item=checkpoints[stage.key].add_item if store is not None else None,
+                        )
+                        if api_deleted:
+                            flush_excel_partial(stage)
+
+                    log(f"Pipeline: stage {stage.key} list='{stage.list_name}'")
+                    deleted_this = delete_many(
+                        page,
+                        list_name=stage.list_name,
+                        timeout_ms=cfg.timeout_ms,
+                        batch_size=stage.batch_size,
+                        confirm_variant=stage.confirm_variant,
+                        on_deleted=on_deleted,
+                        bulk=cfg.bulk_select,
+                        reload_mode=cfg.reload_mode,
+                        adaptive=cfg.adaptive,
+                        delete_strategy=cfg.delete_strategy,
+                        on_item=checkpoints[stage.key].add_item if store is not None else None,
+                    )
+                    flush_excel_partial(stage)
+                    log(f"Pipeline: {stage.key} deleted_this_session={deleted_this} total={totals[stage.key]}")
+                    if deleted_this == 0:
+                        if probe_list_state(page, timeout_ms=min(cfg.timeout_ms, 5000)) == "empty":
+                            log(f"Pipeline: stage {stage.key} done")
+                            checkpoints[stage.key].save(
+                                total_deleted=totals[stage.key], excel_total=saved[stage.key], done=True
+                            )
+                        else:
+                            log(
+                                f"Pipeline: stage {stage.key} deleted nothing but '{stage.list_name}' is not empty; "
+                                "moving on without marking it done",
+                                level="WARNING",
+                            )
+                        stage_idx += 1
+
+            except KeyboardInterrupt:
+                log("Run: interrupted by user")
+                flush_excel_partial(stage)
+                break
+            except Exception as exc:
+                browser_restarts += 1
+                get_metrics().record_retry("browser_launch")
+                log(f"Run: restarting browser due to error ({type(exc).__name__}: {exc})", level="ERROR")
+                dump_ring("browser restart")
+                flush_excel_partial(stage)
+                continue
+            finally:
+                if context:
+                    try:
+                        context.close()
+                    except Exception:
+                        pass
+                if browser:
+                    try:
+                        browser.close()
+                    except Exception:
+                        pass
+
+        if pool is not None:
+            pool.close()
+
+    if store is not None:
+        store.close()
+
+    compact_excel_summary()
+    get_metrics().dump()
+    log(f"Run: finished {' '.join(f'{k}={v}' for k, v in totals.items())} total={sum(totals.values())}")
+    return totals
+
+
+if __name__ == "__main__":
+    # Minimal flags:
+    # --browser chromium|firefox|webkit
+    # --headless
+    # --timeout-ms 60000
+    # --bulk
+    # --stages contacts,deleted
+    # --overlap
+    # --fresh  (ignore today's checkpoint)
+    # --engine ui|graph|session
+    browser = None
+    headless = False
+    timeout_ms = None
+    bulk = None
+    stages = ("contacts", "deleted")
+    overlap = False
+    fresh = False
+    engine = None
+
+    if "--browser" in sys.argv:
+        idx = sys.argv.index("--browser")
+        if idx + 1 < len(sys.argv):
+            browser = sys.argv[idx + 1]
+
+    if "--headless" in sys.argv:
+        headless = True
+
+    if "--bulk" in sys.argv:
+        bulk = True
+
+    if "--overlap" in sys.argv:
+        overlap = True
+
+    if "--fresh" in sys.argv:
+        fresh = True
+
+    if "--timeout-ms" in sys.argv:
+        idx = sys.argv.index("--timeout-ms")
+        if idx + 1 < len(sys.argv):
+            timeout_ms = int(sys.argv[idx + 1])
+
+    if "--stages" in sys.argv:
+        idx = sys.argv.index("--stages")
+        if idx + 1 < len(sys.argv):
+            stages = tuple(s.strip() for s in sys.argv[idx + 1].split(",") if s.strip())
+
+    if "--engine" in sys.argv:
+        idx = sys.argv.index("--engine")
+        if idx + 1 < len(sys.argv):
+            engine = sys.argv[idx + 1]
+
+    run(
+        headless=headless,
+        browser_name=browser,
+        timeout_ms=timeout_ms,
+        bulk=bulk,
+        stages=stages,
+        overlap=overlap,
+        fresh=fresh,
+        engine=engine,
+    )
@@ -0,0 +1,300 @@
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+
+# A journal lock older than this belongs to a crashed process (holders keep it for milliseconds).
+STALE_LOCK_S = 30.0
+# A `.compacting` claim this old was left by a crashed compaction; its rows go back to the journal.
+STALE_CLAIM_S = 300.0
+
+
+@contextmanager
+def journal_lock(path: Path, *, timeout_s: float = 10.0):
+    """Cross-process lock on one journal: a `<journal>.lock` file created exclusively.
+
+    Writers hold it while appending and compaction holds it while renaming the journal,
+    so no process can write into a file that was just claimed. If the lock can't be
+    had within `timeout_s`, the body runs anyway: a rare race beats dropping rows.
+    """
+    lock = path.with_name(path.name + ".lock")
+    deadline = time.monotonic() + timeout_s
+    held = False
+    while True:
+        try:
+            lock.parent.mkdir(parents=True, exist_ok=True)
+            os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600))
+            held = True
+            break
+        except FileExistsError:
+            try:
+                if time.time() - lock.stat().st_mtime > STALE_LOCK_S:
+                    lock.unlink(missing_ok=True)
+                    continue
+            except OSError:
+                continue
+        except OSError:
+            break
+        if time.monotonic() >= deadline:
+            break
+        time.sleep(0.01)
+    try:
+        yield
+    finally:
+        if held:
+            try:
+                lock.unlink()
+            except OSError:
+                pass
+
+
+def _is_current(fh, path: Path) -> bool:
+    """Whether `fh` is still the file at `path` (not renamed away by another process's compaction)."""
+    try:
+        return os.fstat(fh.fileno()).st_ino == os.stat(path).st_ino
+    except OSError:
+        return False
+
+
+def stale_claims(path: Path) -> list[Path]:
+    """`.compacting` claims of `path` left behind by a compaction that never finished."""
+    now = time.time()
+    claims: list[Path] = []
+    for claim in sorted(path.parent.glob(f"{path.name}.*.compacting")):
+        try:
+            if now - claim.stat().st_mtime > STALE_CLAIM_S:
+                claims.append(claim)
+        except OSError:
+            continue
+    return claims
+
+
+def _reingest_stale(path: Path) -> None:
+    """Append stale claims back onto the journal. Call with `journal_lock(path)` held."""
+    for claim in stale_claims(path):
+        try:
+            with open(path, "a", encoding="utf-8") as dst, open(claim, encoding="utf-8") as src:
+                dst.write(src.read())
+                dst.flush()
+                os.fsync(dst.fileno())
+            claim.unlink()
+        except OSError:
+            continue
+
+
+class JournalWriter:
+    """Append-only JSONL writer running on a background thread.
+
+    `append` only enqueues, so callers pay O(1) per event. The thread writes whatever
+    is queued in one go and fsyncs every `fsync_every` records or `fsync_interval_s`.
+    """
+
+    def __init__(self, *, fsync_every: int = 50, fsync_interval_s: float = 2.0) -> None:
+        self.fsync_every = fsync_every
+        self.fsync_interval_s = fsync_interval_s
+        # Held while touching files, so compaction can rename a journal safely.
+        self.lock = threading.Lock()
+        self._queue: queue.Queue[tuple] = queue.Queue()
+        self._files: dict[Path, object] = {}
+        self._unsynced: dict[Path, int] = {}
+        self._last_sync = time.monotonic()
+        self._thread = threading.Thread(target=self._loop, name="run-journal", daemon=True)
+        self._thread.start()
+
+    def append(self, path: Path, record: dict) -> None:
+        self._queue.put(("write", path, json.dumps(record, ensure_ascii=False, default=str)))
+
+    def flush(self, timeout: float | None = 10.0) -> bool:
+        """Block until everything queued so far is written and fsynced."""
+        done = threading.Event()
+        self._queue.put(("flush", done))
+        return done.wait(timeout)
+
+    def close_file(self, path: Path) -> None:
+        """Drop the handle for `path`; the next append reopens it. Call with `lock` held."""
+        fh = self._files.pop(path, None)
+        if fh is not None:
+            try:
+                fh.flush()
+                os.fsync(fh.fileno())
+                fh.close()
+            except Exception:
+                pass
+        self._unsynced.pop(path, None)
+
+    def close(self) -> None:
+        if self._thread.is_alive():
+            self._queue.put(("stop",))
+            self._thread.join(timeout=10)
+
+    def _sync(self, *, force: bool) -> None:
+        due = force or (time.monotonic() - self._last_sync) >= self.fsync_interval_s
+        for path, pending in list(self._unsynced.items()):
+            if pending and (due or pending >= self.fsync_every):
+                fh = self._files.get(path)
+                if fh is None:
+                    continue
+                try:
+                    fh.flush()
+                    os.fsync(fh.fileno())
+                except Exception:
+                    pass
+                self._unsynced[path] = 0
+        if due:
+            self._last_sync = time.monotonic()
+
+    def _write(self, path: Path, lines: list[str]) -> None:
+        with journal_lock(path):
+            fh = self._files.get(path)
+            if fh is not None and not _is_current(fh, path):
+                # Another process claimed the journal for compaction; start the new one.
+                self.close_file(path)
+                fh = None
+            if fh is None:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                _reingest_stale(path)
+                fh = open(path, "a", encoding="utf-8")
+                self._files[path] = fh
+            fh.write("".join(line + "\n" for line in lines))
+            # Out of our buffer before the lock is released, so a claim right after sees it.
+            fh.flush()
+        self._unsynced[path] = self._unsynced.get(path, 0) + len(lines)
+
+    def _loop(self) -> None:
+        while True:
+            try:
+                batch = [self._queue.get(timeout=self.fsync_interval_s)]
+            except queue.Empty:
+                with self.lock:
+                    self._sync(force=True)
+                continue
+
+            # Drain whatever else is already waiting so one write covers many events.
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            waiters: list[threading.Event] = []
+            stop = False
+            pending: dict[Path, list[str]] = {}
+            for item in batch:
+                if item[0] == "write":
+                    pending.setdefault(item[1], []).append(item[2])
+                elif item[0] == "flush":
+                    waiters.append(item[1])
+                else:
+                    stop = True
+            with self.lock:
+                for path, lines in pending.items():
+                    try:
+                        self._write(path, lines)
+                    except Exception:
+                        # Keep the hot path alive even if the disk is unhappy.
+                        pass
+                self._sync(force=bool(waiters) or stop)
+                if stop:
+                    for path in list(self._files):
+                        self.close_file(path)
+
+            for done in waiters:
+                done.set()
+            if stop:
+                return
+
+
+_writer: JournalWriter | None = None
+_writer_lock = threading.Lock()
+
+
+def get_writer() -> JournalWriter:
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = JournalWriter()
+        return _writer
+
+
+def _close_at_exit() -> None:
+    if _writer is not None:
+        _writer.close()
+
+
+def _reset_after_fork() -> None:
+    # The writer thread doesn't survive fork(); the child builds its own writer.
+    global _writer, _writer_lock
+    _writer = None
+    _writer_lock = threading.Lock()
+
+
+atexit.register(_close_at_exit)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def read_journal(path: Path) -> list[dict]:
+    records: list[dict] = []
+    if not path.exists():
+        return records
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                # A torn last line from a crash; everything before it is intact.
+                continue
+    return records
+
+
+def claim_journal(path: Path) -> Path | None:
+    """Move the journal aside so new events start a fresh file while we compact it.
+
+    Safe against other processes appending to the same journal (`journal_lock`); rows
+    of a claim abandoned by a crashed compaction are folded into this one.
+    """
+    writer = get_writer()
+    writer.flush()
+    with writer.lock, journal_lock(path):
+        writer.close_file(path)
+        _reingest_stale(path)
+        if not path.exists():
+            return None
+        claimed = path.with_name(f"{path.name}.{os.getpid()}.compacting")
+        try:
+            os.replace(path, claimed)
+        except OSError:
+            return None
+    return claimed
+
+
+def release_claim(claimed: Path, path: Path) -> None:
+    """Compaction failed: put the claimed records back in front of the live journal."""
+    writer = get_writer()
+    writer.flush()
+    with writer.lock, journal_lock(path):
+        writer.close_file(path)
+        if path.exists():
+            with open(claimed, "a", encoding="utf-8") as dst, open(path, encoding="utf-8") as src:
+                dst.write(src.read())
+        os.replace(claimed, path)
+
+
+if __name__ == "__main__":
+    # Compact pending journals into their workbooks on demand:
+    #   python src/run_journal.py [path/to/summary.xlsx]
+    import sys
+
+    from outlook_common import compact_excel_summary
+
+    compact_excel_summary(sys.argv[1] if len(sys.argv) > 1 else None)
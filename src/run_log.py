@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+
+LEVELS = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40}
+_LEVEL_NAMES = {value: name for name, value in LEVELS.items()}
+
+
+def _level_no(level: str | int) -> int:
+    if isinstance(level, int):
+        return level
+    return LEVELS.get(level.strip().upper(), LEVELS["INFO"])
+
+
+class RunLogger:
+    """Leveled logger whose hot path is a deque append plus, above the threshold, a queue put.
+
+    Formatting and I/O happen on a background thread that writes whatever is queued in
+    one batch and flushes once per batch. Every event, including DEBUG ones below the
+    threshold, also lands in a fixed-size ring buffer that `dump_ring()` writes out
+    when something fails, so the console stays quiet but the context isn't lost.
+    Output is `[ts] message` text or JSON lines on stdout, plus optional JSON lines in
+    a file.
+    """
+
+    def __init__(
+        self,
+        *,
+        level: str | int = "INFO",
+        fmt: str = "text",
+        file_path: Path | None = None,
+        ring_size: int = 2000,
+        flush_interval_s: float = 0.5,
+    ) -> None:
+        self.level = _level_no(level)
+        self.fmt = fmt
+        self.file_path = file_path
+        self.flush_interval_s = flush_interval_s
+        self.ring: deque[tuple] = deque(maxlen=ring_size)
+        # Appends from other threads would break the copy in dump_ring mid-iteration.
+        self._ring_lock = threading.Lock()
+        self._queue: queue.SimpleQueue[tuple] = queue.SimpleQueue()
+        self._file = None
+        self._thread = threading.Thread(target=self._loop, name="run-log", daemon=True)
+        self._thread.start()
+
+    def emit(self, level: str | int, message: str, fields: dict | None = None) -> None:
+        event = (time.time(), _level_no(level), message, fields)
+        with self._ring_lock:
+            self.ring.append(event)
+        if event[1] >= self.level:
+            self._queue.put(("event", event))
+
+    def dump_ring(self, reason: str) -> None:
+        """Write the buffered events (oldest first) to every sink, then clear the buffer."""
+        with self._ring_lock:
+            events = list(self.ring)
+            self.ring.clear()
+        self._queue.put(("dump", reason, events))
+
+    def flush(self, timeout: float | None = 5.0) -> bool:
+        done = threading.Event()
+        self._queue.put(("flush", done))
+        return done.wait(timeout)
+
+    def _record(self, event: tuple, extra: dict | None = None) -> dict:
+        ts, level, message, fields = event
+        component, sep, _rest = message.partition(":")
+        record = {
+            "ts": datetime.fromtimestamp(ts).isoformat(timespec="milliseconds"),
+            "level": _LEVEL_NAMES.get(level, str(level)),
+            "component": component if sep and " " not in component else "",
+            "msg": message,
+            "pid": os.getpid(),
+        }
+        if fields:
+            record.update(fields)
+        if extra:
+            record.update(extra)
+        return record
+
+    def _text(self, event: tuple, prefix: str = "") -> str:
+        ts, level, message, fields = event
+        # Dumped context gets millisecond stamps; the live console keeps the old format.
+        stamp = datetime.fromtimestamp(ts).isoformat(timespec="milliseconds" if prefix else "seconds")
+        tag = "" if level == LEVELS["INFO"] else f"{_LEVEL_NAMES.get(level, level)} "
+        extra = "" if not fields else " " + " ".join(f"{k}={v}" for k, v in fields.items())
+        return f"{prefix}[{stamp}] {tag}{message}{extra}"
+
+    def _format(self, item: tuple) -> tuple[list[str], list[str]]:
+        """(stdout lines, file lines) for one queue item."""
+        if item[0] == "event":
+            record = self._record(item[1]) if (self.fmt == "json" or self.file_path) else None
+            out = json.dumps(record, ensure_ascii=False, default=str) if self.fmt == "json" else self._text(item[1])
+            return [out], ([json.dumps(record, ensure_ascii=False, default=str)] if self.file_path else [])
+
+        _kind, reason, events = item
+        header = (time.time(), LEVELS["ERROR"], f"Log: ring buffer dump ({reason}), {len(events)} events", None)
+        out_lines: list[str] = []
+        file_lines: list[str] = []
+        for idx, event in enumerate([header, *events]):
+            extra = {"dump": reason} if idx else None
+            if self.fmt == "json":
+                out_lines.append(json.dumps(self._record(event, extra), ensure_ascii=False, default=str))
+            else:
+                out_lines.append(self._text(event, prefix="" if idx == 0 else "  | "))
+            if self.file_path:
+                file_lines.append(json.dumps(self._record(event, extra), ensure_ascii=False, default=str))
+        return out_lines, file_lines
+
+    def _write(self, out_lines: list[str], file_lines: list[str]) -> None:
+        if out_lines:
+            try:
+                sys.stdout.write("\n".join(out_lines) + "\n")
+                sys.stdout.flush()
+            except Exception:
+                pass
+        if file_lines and self.file_path:
+            try:
+                if self._file is None:
+                    self.file_path.parent.mkdir(parents=True, exist_ok=True)
+                    self._file = open(self.file_path, "a", encoding="utf-8")
+                self._file.write("\n".join(file_lines) + "\n")
+                self._file.flush()
+            except Exception:
+                pass
+
+    def _loop(self) -> None:
+        while True:
+            item = self._queue.get()
+            # Batch: whatever else arrived within the flush interval goes out in one write.
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval_s
+            waiters: list[threading.Event] = []
+            while batch[-1][0] != "flush":
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            out_lines: list[str] = []
+            file_lines: list[str] = []
+            for entry in batch:
+                if entry[0] == "flush":
+                    waiters.append(entry[1])
+                    continue
+                try:
+                    out, to_file = self._format(entry)
+                except Exception:
+                    continue
+                out_lines.extend(out)
+                file_lines.extend(to_file)
+            self._write(out_lines, file_lines)
+            for done in waiters:
+                done.set()
+
+
+_logger: RunLogger | None = None
+_logger_lock = threading.Lock()
+
+
+def get_logger() -> RunLogger:
+    """Process-wide logger configured from OUTLOOK_LOG_LEVEL / _FORMAT / _FILE / _RING."""
+    global _logger
+    if _logger is None:
+        with _logger_lock:
+            if _logger is None:
+                env_file = (os.getenv("OUTLOOK_LOG_FILE") or "").strip()
+                try:
+                    ring_size = int((os.getenv("OUTLOOK_LOG_RING") or "").strip() or 2000)
+                except ValueError:
+                    ring_size = 2000
+                _logger = RunLogger(
+                    level=(os.getenv("OUTLOOK_LOG_LEVEL") or "INFO"),
+                    fmt="json" if (os.getenv("OUTLOOK_LOG_FORMAT") or "").strip().lower() == "json" else "text",
+                    # One file per process; multi_account workers share the directory.
+                    file_path=Path(env_file.replace("{pid}", str(os.getpid()))) if env_file else None,
+                    ring_size=max(1, ring_size),
+                )
+    return _logger
+
+
+def _flush_at_exit() -> None:
+    if _logger is not None:
+        _logger.flush()
+
+
+def _reset_after_fork() -> None:
+    # A forked child (multi_account workers) inherits the logger but not its writer
+    # thread; start over so the child's lines get written.
+    global _logger, _logger_lock
+    _logger = None
+    _logger_lock = threading.Lock()
+
+
+atexit.register(_flush_at_exit)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def dump_ring(reason: str) -> None:
+    get_logger().dump_ring(reason)
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+
+
+def _cache_path() -> Path:
+    env_path = (os.getenv("OUTLOOK_SELECTOR_CACHE") or "").strip()
+    if env_path:
+        return Path(env_path)
+    return Path(__file__).resolve().parent.parent / ".selector_cache.json"
+
+
+class SelectorCache:
+    """Remembers which selector candidate won per (action, UI variant).
+
+    Stored as a small JSON file so later runs try the winner first.
+    """
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = path or _cache_path()
+        self._lock = threading.Lock()
+        self._data: dict[str, dict] | None = None
+
+    def _load(self) -> dict[str, dict]:
+        if self._data is None:
+            try:
+                self._data = json.loads(self.path.read_text(encoding="utf-8"))
+            except Exception:
+                self._data = {}
+        return self._data
+
+    @staticmethod
+    def _key(action: str, variant: str) -> str:
+        return f"{action}|{variant}"
+
+    def order(self, action: str, variant: str, selectors: list[str]) -> list[str]:
+        """`selectors` with the remembered winner moved to the front."""
+        with self._lock:
+            winner = self._load().get(self._key(action, variant), {}).get("selector")
+        if winner in selectors:
+            return [winner] + [s for s in selectors if s != winner]
+        return list(selectors)
+
+    def record(self, action: str, variant: str, selector: str) -> None:
+        with self._lock:
+            data = self._load()
+            key = self._key(action, variant)
+            entry = data.get(key) or {}
+            if entry.get("selector") == selector:
+                entry["hits"] = int(entry.get("hits", 0)) + 1
+                data[key] = entry
+                # Same winner again: nothing new worth a disk write.
+                return
+            data[key] = {"selector": selector, "hits": 1}
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = self.path.with_suffix(".tmp")
+                tmp.write_text(json.dumps(data, indent=2, sort_keys=True), encoding="utf-8")
+                os.replace(tmp, self.path)
+            except Exception:
+                pass
+
+
+_cache: SelectorCache | None = None
+
+
+def get_cache() -> SelectorCache:
+    global _cache
+    if _cache is None:
+        _cache = SelectorCache()
+    return _cache
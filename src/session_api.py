@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from typing import Callable
+from urllib.parse import urlparse
+
+from playwright.sync_api import Page
+
+from metrics import span
+from outlook_common import log
+
+
+# People list -> (OWA distinguished folder, item classes shown there, DeleteType the UI uses).
+# Deleting a contact list moves it to Deleted; deleting from Deleted removes it for good.
+LIST_TARGETS = {
+    "Your contact lists": ("contacts", ("IPM.DistList",), "MoveToDeletedItems"),
+    "Deleted": ("deleteditems", ("IPM.Contact", "IPM.DistList"), "SoftDelete"),
+}
+DEFAULT_BATCH = 50
+_HEADER = {"__type": "JsonRequestHeaders:#Exchange", "RequestServerVersion": "Exchange2013"}
+
+
+class SessionApiError(RuntimeError):
+    pass
+
+
+def _batch_size() -> int:
+    env_value = (os.getenv("OUTLOOK_API_BATCH") or "").strip()
+    try:
+        return max(1, int(env_value)) if env_value else DEFAULT_BATCH
+    except ValueError:
+        return DEFAULT_BATCH
+
+
+class OwaSessionApi:
+    """Outlook web's own service endpoint (`service.svc`), called with the signed-in context's cookies.
+
+    Requests go through `context.request`, which shares the browser context's cookie jar,
+    so no token or app registration is needed; the X-OWA-CANARY cookie is echoed back as
+    the anti-CSRF header like the web app does.
+    """
+
+    def __init__(self, page: Page, *, timeout_ms: int) -> None:
+        parsed = urlparse(page.url)
+        if not parsed.scheme.startswith("http") or not parsed.netloc:
+            raise SessionApiError(f"page is not on Outlook ({page.url})")
+        self.context = page.context
+        self.origin = f"{parsed.scheme}://{parsed.netloc}"
+        default_path = "/owa/0/service.svc" if parsed.netloc.endswith("outlook.live.com") else "/owa/service.svc"
+        self.service_url = self.origin + ((os.getenv("OUTLOOK_OWA_SERVICE_PATH") or "").strip() or default_path)
+        self.timeout_ms = timeout_ms
+
+    def _canary(self) -> str:
+        for cookie in self.context.cookies(self.origin):
+            if cookie.get("name", "").upper() == "X-OWA-CANARY":
+                return cookie.get("value", "")
+        raise SessionApiError("no X-OWA-CANARY cookie in this session")
+
+    def call(self, action: str, body: dict) -> list[dict]:
+        """POST one service action; returns its ResponseMessages items."""
+        payload = {"__type": f"{action}JsonRequest:#Exchange", "Header": _HEADER, "Body": body}
+        resp = self.context.request.post(
+            f"{self.service_url}?action={action}&app=People",
+            headers={
+                "Action": action,
+                "Content-Type": "application/json; charset=utf-8",
+                "X-OWA-CANARY": self._canary(),
+                "X-Req-Source": "People",
+            },
+            data=json.dumps(payload),
+            timeout=self.timeout_ms,
+        )
+        if not resp.ok:
+            raise SessionApiError(f"{action} HTTP {resp.status}: {resp.text()[:200]}")
+        try:
+            data = resp.json()
+            return data["Body"]["ResponseMessages"]["Items"]
+        except Exception as exc:
+            raise SessionApiError(f"{action}: unexpected response ({type(exc).__name__}: {exc})") from exc
+
+    def find_items(self, folder: str, item_classes: tuple[str, ...], *, page_size: int = 200) -> list[dict]:
+        """Every item in a distinguished folder whose ItemClass starts with one of `item_classes`.
+
+        The ItemClass prefix is a server-side restriction, so a large Deleted Items
+        folder full of mail isn't paged through just to find its contacts.
+        """
+        conditions = [
+            {
+                "__type": "Contains:#Exchange",
+                "Item": {"__type": "PropertyUri:#Exchange", "FieldURI": "ItemClass"},
+                "Constant": {"__type": "Constant:#Exchange", "Value": item_class},
+                "ContainmentMode": "Prefixed",
+                "ContainmentComparison": "IgnoreCase",
+            }
+            for item_class in item_classes
+        ]
+        condition = conditions[0] if len(conditions) == 1 else {"__type": "Or:#Exchange", "Items": conditions}
+        items: list[dict] = []
+        offset = 0
+        while True:
+            body = {
+                "__type": "FindItemRequest:#Exchange",
+                "ItemShape": {
+                    "__type": "ItemResponseShape:#Exchange",
+                    "BaseShape": "IdOnly",
+                    "AdditionalProperties": [
+                        {"__type": "PropertyUri:#Exchange", "FieldURI": "ItemClass"},
+                        {"__type": "PropertyUri:#Exchange", "FieldURI": "Subject"},
+                    ],
+                },
+                "ParentFolderIds": [{"__type": "DistinguishedFolderId:#Exchange", "Id": folder}],
+                "Restriction": {"__type": "RestrictionType:#Exchange", "Item": condition},
+                "Traversal": "Shallow",
+                "Paging": {
+                    "__type": "IndexedPageView:#Exchange",
+                    "BasePoint": "Beginning",
+                    "Offset": offset,
+                    "MaxEntriesReturned": page_size,
+                },
+            }
+            message = self.call("FindItem", body)[0]
+            if message.get("ResponseClass") != "Success":
+                raise SessionApiError(f"FindItem {folder}: {message.get('ResponseCode')} {message.get('MessageText', '')}")
+            root = message.get("RootFolder") or {}
+            page_items = root.get("Items") or []
+            # Kept as a guard in case a server ignores part of the restriction.
+            items.extend(
+                item for item in page_items if str(item.get("ItemClass", "")).startswith(item_classes)
+            )
+            if root.get("IncludesLastItemInRange", True) or not page_items:
+                return items
+            offset = int(root.get("IndexedPagingOffset") or offset + len(page_items))
+
+    def delete_items(self, items: list[dict], delete_type: str) -> tuple[list[dict], list[dict]]:
+        """Delete one batch; returns (deleted, missing): the items deleted now, and those already gone."""
+        body = {
+            "__type": "DeleteItemRequest:#Exchange",
+            "ItemIds": [
+                {"__type": "ItemId:#Exchange", "Id": item["ItemId"]["Id"], "ChangeKey": item["ItemId"].get("ChangeKey")}
+                for item in items
+            ],
+            "DeleteType": delete_type,
+            "SendMeetingCancellations": "SendToNone",
+            "AffectedTaskOccurrences": "AllOccurrences",
+            "SuppressReadReceipts": True,
+        }
+        messages = self.call("DeleteItem", body)
+        deleted: list[dict] = []
+        missing: list[dict] = []
+        for item, message in zip(items, messages):
+            if message.get("ResponseClass") == "Success":
+                deleted.append(item)
+            elif message.get("ResponseCode") == "ErrorItemNotFound":
+                missing.append(item)
+            else:
+                log(f"SessionApi: delete failed {message.get('ResponseCode')} {message.get('MessageText', '')}")
+        return deleted, missing
+
+
+def api_delete(
+    page: Page,
+    list_name: str,
+    *,
+    timeout_ms: int,
+    on_deleted: Callable[[], None] | None = None,
+    on_item: Callable[[str], None] | None = None,
+) -> int | None:
+    """Delete everything in `list_name` over the signed-in session's API instead of the UI.
+
+    Returns how many items were deleted, or None when the API path isn't usable here
+    (unknown list, no canary, endpoint rejected the call) and the caller should fall
+    back to `delete_many`. A failure mid-way returns what was done so far; the UI loop
+    picks up whatever is left.
+    """
+    target = LIST_TARGETS.get(list_name)
+    if target is None:
+        log(f"SessionApi: no API mapping for '{list_name}'; using the UI")
+        return None
+    folder, item_classes, delete_type = target
+
+    try:
+        api = OwaSessionApi(page, timeout_ms=timeout_ms)
+        with span("api_find"):
+            items = api.find_items(folder, item_classes)
+    except Exception as exc:
+        log(f"SessionApi: unavailable ({type(exc).__name__}: {exc}); falling back to the UI", level="WARNING")
+        return None
+    log(f"SessionApi: {len(items)} items in '{list_name}' ({folder})")
+
+    deleted = 0
+    already_gone = 0
+    batch = _batch_size()
+    started = time.monotonic()
+    for start in range(0, len(items), batch):
+        chunk = items[start : start + batch]
+        try:
+            with span("api_delete"):
+                removed, missing = api.delete_items(chunk, delete_type)
+        except Exception as exc:
+            log(
+                f"SessionApi: batch failed after {deleted} deletes ({type(exc).__name__}: {exc}); "
+                "falling back to the UI",
+                level="WARNING",
+            )
+            return deleted or None
+        already_gone += len(missing)
+        for item in removed:
+            deleted += 1
+            if on_item is not None and item.get("Subject"):
+                try:
+                    on_item(str(item["Subject"]))
+                except Exception:
+                    pass
+            if on_deleted is not None:
+                try:
+                    on_deleted()
+                except Exception:
+                    # Never let progress hook break deletion.
+                    pass
+        log(f"SessionApi: deleted {deleted}/{len(items)}", level="DEBUG")
+
+    elapsed = max(time.monotonic() - started, 1e-6)
+    log(
+        f"SessionApi: deleted {deleted}/{len(items)} from '{list_name}' rate={deleted / elapsed:.1f}/s"
+        + (f" ({already_gone} already gone)" if already_gone else "")
+    )
+    return deleted
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from playwright.sync_api import Browser, BrowserContext, Page, sync_playwright
+
+from launch_profile import apply_context_profile, context_options, launch_options
+from network_profile import install_route_profile
+from outlook_common import OUTLOOK_MAIL_URL, OutlookConfig, _mask_email, log, login
+
+
+# Markers that only render once Outlook has finished booting for a signed-in user.
+SIGNED_IN_SELECTOR = "xpath=//button[@aria-label='People'] | //button[@aria-label='Mail']"
+LOGIN_HOSTS = ("login.microsoftonline.com", "login.live.com", "login.microsoft.com")
+
+
+def _session_dir() -> Path:
+    env_dir = (os.getenv("OUTLOOK_SESSION_DIR") or "").strip()
+    if env_dir:
+        return Path(env_dir)
+    return Path(__file__).resolve().parent.parent / ".sessions"
+
+
+def session_state_path(email: str) -> Path:
+    """One state file per account; the name is a hash so the address is not on disk."""
+    digest = hashlib.sha256(email.strip().lower().encode("utf-8")).hexdigest()[:16]
+    return _session_dir() / f"storage_state_{digest}.json"
+
+
+def _fernet():
+    """Fernet cipher from OUTLOOK_SESSION_KEY, or None to store plaintext (0600).
+
+    A key without `cryptography` installed raises instead of quietly writing plaintext;
+    the state/token cache readers and writers log it and skip the file.
+    """
+    secret = (os.getenv("OUTLOOK_SESSION_KEY") or "").strip()
+    if not secret:
+        return None
+    try:
+        from cryptography.fernet import Fernet
+    except ImportError as exc:
+        raise RuntimeError(
+            "OUTLOOK_SESSION_KEY is set but the cryptography package is missing "
+            "(pip install cryptography); refusing to store sessions unencrypted"
+        ) from exc
+    key = base64.urlsafe_b64encode(hashlib.sha256(secret.encode("utf-8")).digest())
+    return Fernet(key)
+
+
+def load_session_state(email: str) -> dict | None:
+    path = session_state_path(email)
+    if not path.exists():
+        return None
+    try:
+        raw = path.read_bytes()
+        cipher = _fernet()
+        if cipher is not None:
+            raw = cipher.decrypt(raw)
+        return json.loads(raw.decode("utf-8"))
+    except Exception as exc:
+        log(f"Session: cannot read saved state ({type(exc).__name__}: {exc}); ignoring")
+        return None
+
+
+def save_session_state(context: BrowserContext, email: str) -> None:
+    try:
+        state = context.storage_state()
+    except Exception as exc:
+        log(f"Session: failed to read context state ({type(exc).__name__}: {exc})")
+        return
+    write_session_state(email, state)
+
+
+def write_session_state(email: str, state: dict) -> None:
+    path = session_state_path(email)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.chmod(path.parent, 0o700)
+        except OSError:
+            pass
+
+        raw = json.dumps(state).encode("utf-8")
+        cipher = _fernet()
+        if cipher is not None:
+            raw = cipher.encrypt(raw)
+
+        # Create with 0600 from the start, then atomically replace the old state.
+        tmp = path.with_suffix(".tmp")
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(raw)
+        os.replace(tmp, path)
+        log(f"Session: saved state for {_mask_email(email)} (encrypted={cipher is not None})")
+    except Exception as exc:
+        log(f"Session: failed to save state ({type(exc).__name__}: {exc})")
+
+
+def session_is_valid(page: Page, *, timeout_ms: int, navigate: bool = True) -> bool:
+    """Quick probe: does Outlook boot straight into the mailbox without a login redirect?
+
+    `navigate=False` checks a page that is already loading Outlook (warm standby).
+    """
+    try:
+        if navigate:
+            page.goto(OUTLOOK_MAIL_URL, wait_until="domcontentloaded")
+        page.locator(SIGNED_IN_SELECTOR).first.wait_for(state="visible", timeout=min(timeout_ms, 15000))
+    except Exception:
+        return False
+    return not any(host in page.url for host in LOGIN_HOSTS)
+
+
+def new_session_context(browser: Browser, cfg: OutlookConfig) -> tuple[BrowserContext, Page, bool]:
+    """Context + page seeded with the saved storage_state; the bool says whether one existed."""
+    state = load_session_state(cfg.email)
+    context = browser.new_context(storage_state=state, **context_options(cfg))
+    try:
+        apply_context_profile(context, cfg)
+        install_route_profile(context, cfg.network_profile)
+        page = context.new_page()
+        page.set_default_timeout(cfg.timeout_ms)
+    except BaseException:
+        try:
+            context.close()
+        except Exception:
+            pass
+        raise
+    return context, page, state is not None
+
+
+def ensure_signed_in(
+    context: BrowserContext,
+    page: Page,
+    cfg: OutlookConfig,
+    *,
+    has_state: bool,
+    navigate: bool = True,
+) -> None:
+    """Reuse the saved state when it is still valid, otherwise login() and save the new state."""
+    if has_state:
+        if session_is_valid(page, timeout_ms=cfg.timeout_ms, navigate=navigate):
+            log("Session: reused saved state (login skipped)")
+            return
+        log("Session: saved state expired; login")
+
+    login(page, cfg.email, cfg.password, timeout_ms=cfg.timeout_ms)
+    save_session_state(context, cfg.email)
+
+
+def open_session(browser: Browser, cfg: OutlookConfig) -> tuple[BrowserContext, Page]:
+    """New context + page, reusing the saved storage_state and logging in only if it expired."""
+    context, page, has_state = new_session_context(browser, cfg)
+    try:
+        ensure_signed_in(context, page, cfg, has_state=has_state)
+        return context, page
+    except BaseException:
+        try:
+            context.close()
+        except Exception:
+            pass
+        raise
+
+
+def refresh_session_state(cfg: OutlookConfig) -> None:
+    """Sign in once in a short-lived browser and save the state (for callers without a sync browser).
+
+    outlook_async runs this in a worker thread when the saved state is missing or
+    expired, so there is a single login flow to maintain.
+    """
+    with sync_playwright() as p:
+        browser = getattr(p, cfg.browser_name).launch(**launch_options(cfg))
+        try:
+            context, _page = open_session(browser, cfg)
+            context.close()
+        finally:
+            browser.close()
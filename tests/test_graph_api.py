@@ -0,0 +1,184 @@
+"""Graph engine against a local mock Graph server (plain http, static token).
+
+Run with `python -m pytest tests`. The mock keeps one mailbox in memory: contacts in
+the default folder and in user folders, answers /$batch deletes (404 once an item is
+gone) and the delta queries the contact index uses.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import graph_api  # noqa: E402
+from graph_scheduler import GraphScheduler  # noqa: E402
+from outlook_common import flush_excel_summary  # noqa: E402
+
+ROOT_FOLDER = "root-folder"
+
+
+class MockGraph:
+    """Just enough of /v1.0/me for listing, delta sync and $batch deletes."""
+
+    def __init__(self, *, root_contacts: int, folders: dict[str, int]) -> None:
+        self.lock = threading.Lock()
+        self.folders = {fid: {"id": fid, "displayName": fid.title(), "parentFolderId": ROOT_FOLDER} for fid in folders}
+        self.contacts: dict[str, str] = {}
+        for n in range(root_contacts):
+            self.contacts[f"c-root-{n}"] = ROOT_FOLDER
+        for fid, count in folders.items():
+            for n in range(count):
+                self.contacts[f"c-{fid}-{n}"] = fid
+        self.batch_calls = 0
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args) -> None:
+                pass
+
+            def _send(self, body: dict, status: int = 200) -> None:
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self) -> None:
+                status, body = mock.get(urlparse(self.path).path)
+                self._send(body, status)
+
+            def do_POST(self) -> None:
+                if urlparse(self.path).path != "/v1.0/$batch":
+                    return self._send({"error": "not_found"}, 404)
+                payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)))
+                self._send({"responses": mock.batch(payload["requests"])})
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def _contacts_in(self, folder_id: str) -> list[dict]:
+        return [
+            {"id": cid, "displayName": cid, "parentFolderId": fid}
+            for cid, fid in sorted(self.contacts.items())
+            if fid == folder_id
+        ]
+
+    def get(self, path: str) -> tuple[int, dict]:
+        path = path.removeprefix("/v1.0/me")
+        delta_link = {"@odata.deltaLink": f"{self.base}/v1.0/me{path}?state=next"}
+        with self.lock:
+            if path == "/contacts":
+                return 200, {"value": self._contacts_in(ROOT_FOLDER)}
+            if path == "/contactFolders":
+                return 200, {"value": list(self.folders.values())}
+            if path == "/contactFolders/delta":
+                return 200, {"value": list(self.folders.values()), **delta_link}
+            match = re.fullmatch(r"/contactFolders/([^/]+)/(childFolders|contacts|contacts/delta)", path)
+            if match:
+                folder_id, what = match.groups()
+                if what == "childFolders":
+                    return 200, {"value": []}
+                body = {"value": self._contacts_in(folder_id)}
+                return 200, ({**body, **delta_link} if what == "contacts/delta" else body)
+        return 404, {"error": {"code": "ResourceNotFound"}}
+
+    def batch(self, requests: list[dict]) -> list[dict]:
+        responses = []
+        with self.lock:
+            self.batch_calls += 1
+            for req in requests:
+                kind, _, item_id = req["url"].removeprefix("/me/").partition("/")
+                if req["method"] != "DELETE":
+                    status = 400
+                elif kind == "contacts" and item_id in self.contacts:
+                    del self.contacts[item_id]
+                    status = 204
+                elif kind == "contactFolders" and item_id in self.folders:
+                    del self.folders[item_id]
+                    for cid in [cid for cid, fid in self.contacts.items() if fid == item_id]:
+                        del self.contacts[cid]
+                    status = 204
+                else:
+                    status = 404
+                responses.append({"id": req["id"], "status": status, "headers": {}, "body": None})
+        return responses
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def graph_env(tmp_path, monkeypatch):
+    def start(**mailbox) -> MockGraph:
+        mock = MockGraph(**mailbox)
+        monkeypatch.setenv("GRAPH_BASE_URL", mock.base)
+        monkeypatch.setenv("GRAPH_ACCESS_TOKEN", "mock-token")
+        monkeypatch.setenv("GRAPH_DELETE_ALL_CONTACTS", "true")
+        # The default pacing (16 sub-requests/s) would only slow the test down.
+        monkeypatch.setenv("GRAPH_RATE_PER_S", "1000")
+        monkeypatch.setenv("GRAPH_INDEX_PATH", str(tmp_path / "index.sqlite3"))
+        monkeypatch.setenv("OUTLOOK_EXCEL_PATH", str(tmp_path / "summary.xlsx"))
+        monkeypatch.setenv("OUTLOOK_INVENTORY_PATH", str(tmp_path / "inventory.json"))
+        for name in ("GRAPH_USER_ID", "GRAPH_CLIENT_SECRET", "GRAPH_DRY_RUN", "GRAPH_INDEX"):
+            monkeypatch.delenv(name, raising=False)
+        started.append(mock)
+        return mock
+
+    started: list[MockGraph] = []
+    yield start
+    for mock in started:
+        mock.close()
+
+
+def _summary_rows(tmp_path: Path) -> list[dict]:
+    assert flush_excel_summary()
+    journal = tmp_path / "summary.jsonl"
+    return [json.loads(line) for line in journal.read_text("utf-8").splitlines() if line.strip()]
+
+
+def test_batch_delete_counts_404_as_gone_not_deleted(graph_env):
+    mock = graph_env(root_contacts=25, folders={})
+    cfg = graph_api.load_graph_config()
+    session = GraphScheduler("mock-token", max_concurrency=2)
+    deleted_hook = []
+    seen: list[str] = []
+    try:
+        ids = [f"c-root-{n}" for n in range(25)] + ["c-missing-1", "c-missing-2"]
+        deleted = graph_api.batch_delete(
+            session, cfg, "contacts", ids, on_deleted=lambda: deleted_hook.append(1), on_items=seen.extend
+        )
+    finally:
+        session.close()
+    assert deleted == 25
+    assert len(deleted_hook) == 25
+    # Gone either way, so the index drops the missing ones too.
+    assert sorted(seen) == sorted(ids)
+    assert mock.batch_calls == 2
+    assert mock.contacts == {}
+
+
+@pytest.mark.parametrize("use_index", [False, True], ids=["listing", "index"])
+def test_run_graph_delete_counts_contacts_not_folders(graph_env, tmp_path, monkeypatch, use_index):
+    mock = graph_env(root_contacts=30, folders={"friends": 20})
+    if not use_index:
+        monkeypatch.setenv("GRAPH_INDEX", "false")
+
+    total = graph_api.run_graph_delete(script_name="test", list_name="Your contact lists")
+
+    assert total == 50
+    assert mock.contacts == {} and mock.folders == {}
+    rows = _summary_rows(tmp_path)
+    assert sum(row["deleted_this_session"] for row in rows) == 50
+    assert rows[-1]["total_deleted"] == 50
@@ -0,0 +1,216 @@
+"""TokenProvider against a local mock identity endpoint (https, self-signed).
+
+Run with `python -m pytest tests`. The second "run" builds a fresh TokenProvider over
+the same cache directory, like a new process would, and must not reach the token
+endpoint at all.
+"""
+
+from __future__ import annotations
+
+import base64
+import datetime as dt
+import ipaddress
+import json
+import ssl
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import graph_auth  # noqa: E402
+
+TENANT = "mock-tenant"
+CLIENT_ID = "00000000-0000-0000-0000-0000000000aa"
+ACCOUNT = "user@example.com"
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _self_signed(tmp_path: Path) -> tuple[Path, Path]:
+    x509 = pytest.importorskip("cryptography.x509")
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "127.0.0.1")])
+    now = dt.datetime.now(dt.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - dt.timedelta(minutes=5))
+        .not_valid_after(now + dt.timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]), False)
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), True)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path = tmp_path / "cert.pem"
+    key_path = tmp_path / "key.pem"
+    cert_path.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    key_path.write_bytes(
+        key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        )
+    )
+    return cert_path, key_path
+
+
+class MockIdentity:
+    """Just enough of the v2.0 endpoints for MSAL: discovery, device code, token grants."""
+
+    def __init__(self, cert_path: Path, key_path: Path) -> None:
+        self.grants: list[str] = []
+        self._issued = 0
+        # The device code grant doesn't resend the scopes asked for at /devicecode.
+        self._device_scope = ""
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args) -> None:
+                pass
+
+            def _send(self, body: dict, status: int = 200) -> None:
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self) -> None:
+                if self.path.endswith("/.well-known/openid-configuration"):
+                    base = f"{mock.host}/{TENANT}"
+                    return self._send(
+                        {
+                            "issuer": f"{base}/v2.0",
+                            "authorization_endpoint": f"{base}/oauth2/v2.0/authorize",
+                            "token_endpoint": f"{base}/oauth2/v2.0/token",
+                            "device_authorization_endpoint": f"{base}/oauth2/v2.0/devicecode",
+                        }
+                    )
+                self._send({"error": "not_found"}, 404)
+
+            def do_POST(self) -> None:
+                form = parse_qs(self.rfile.read(int(self.headers.get("Content-Length") or 0)).decode("utf-8"))
+                path = urlparse(self.path).path
+                if path.endswith("/devicecode"):
+                    mock._device_scope = form.get("scope", [""])[0]
+                    return self._send(
+                        {
+                            "device_code": "mock-device-code",
+                            "user_code": "MOCK123",
+                            "verification_uri": f"{mock.host}/device",
+                            "expires_in": 300,
+                            "interval": 0,
+                            "message": "Mock: sign in with code MOCK123",
+                        }
+                    )
+                if path.endswith("/token"):
+                    # "urn:ietf:params:oauth:grant-type:device_code" -> "device_code"
+                    grant = form.get("grant_type", [""])[0].rsplit(":", 1)[-1]
+                    mock.grants.append(grant)
+                    scope = form.get("scope", [mock._device_scope])[0]
+                    return self._send(mock.token_response(grant, scope))
+                self._send({"error": "not_found"}, 404)
+
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(str(cert_path), str(key_path))
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.socket = context.wrap_socket(self.server.socket, server_side=True)
+        self.host = f"https://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def token_response(self, grant: str, scope: str) -> dict:
+        self._issued += 1
+        # Echo the requested resource scopes, as the real endpoint does; MSAL keys its cache on them.
+        granted = " ".join(s for s in scope.split() if s not in {"openid", "profile", "offline_access"})
+        body = {
+            "token_type": "Bearer",
+            "scope": granted,
+            "expires_in": 3600,
+            "access_token": f"at-{grant}-{self._issued}",
+        }
+        if grant == "client_credentials":
+            return body
+        now = int(time.time())
+        claims = {
+            "iss": f"{self.host}/{TENANT}/v2.0",
+            "aud": CLIENT_ID,
+            "sub": "mock-sub",
+            "oid": "mock-oid",
+            "tid": TENANT,
+            "preferred_username": ACCOUNT,
+            "iat": now,
+            "exp": now + 3600,
+        }
+        body["id_token"] = ".".join([_b64(b'{"alg":"none"}'), _b64(json.dumps(claims).encode()), ""])
+        body["client_info"] = _b64(json.dumps({"uid": "mock-oid", "utid": TENANT}).encode())
+        body["refresh_token"] = f"rt-{self._issued}"
+        return body
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def identity(tmp_path, monkeypatch):
+    cert_path, key_path = _self_signed(tmp_path)
+    mock = MockIdentity(cert_path, key_path)
+    monkeypatch.setenv("GRAPH_AUTHORITY_HOST", mock.host)
+    monkeypatch.setenv("GRAPH_AUTH_CA_BUNDLE", str(cert_path))
+    monkeypatch.setenv("GRAPH_TOKEN_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.delenv("OUTLOOK_SESSION_KEY", raising=False)
+    yield mock
+    mock.close()
+
+
+def _provider(**kwargs) -> graph_auth.TokenProvider:
+    return graph_auth.TokenProvider(tenant_id=TENANT, client_id=CLIENT_ID, account=ACCOUNT, **kwargs)
+
+
+def test_client_credentials_second_run_uses_cache(identity):
+    first = _provider(client_secret="mock-secret").token()
+    assert identity.grants == ["client_credentials"]
+
+    # New provider over the same cache directory: a second run of the script.
+    second = _provider(client_secret="mock-secret").token()
+    assert second == first
+    assert identity.grants == ["client_credentials"]
+
+
+def test_client_credentials_force_refresh_gets_new_token(identity):
+    provider = _provider(client_secret="mock-secret")
+    first = provider.token()
+    renewed = provider.token(force_refresh=True)
+    assert renewed != first
+    assert identity.grants == ["client_credentials", "client_credentials"]
+
+
+def test_device_code_second_run_is_silent(identity, monkeypatch):
+    first = _provider().token()
+    assert identity.grants == ["device_code"]
+
+    # Any interactive step on the second run fails the test.
+    def no_device_flow(self):
+        raise AssertionError("second run asked for a device code sign-in")
+
+    monkeypatch.setattr(graph_auth.TokenProvider, "_interactive", no_device_flow)
+    second = _provider()
+    assert second.token() == first
+    assert identity.grants == ["device_code"]
+
+    # After a 401 the cached access token is skipped and the refresh token is used.
+    assert second.token(force_refresh=True) != first
+    assert identity.grants == ["device_code", "refresh_token"]